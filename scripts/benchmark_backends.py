@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput of the model-serving backends across batch sizes.
+Compares the sklearn pickle, the NumPy ``.npz`` serving pipeline and the ONNX model on
+onnxruntime, checks that their probabilities agree, and prints per-batch latency
+percentiles and rows/sec so the faster backend can be picked per deployment.
+
+Usage:
+    python scripts/benchmark_backends.py --model-path models/sentiment_model.pkl
+    python scripts/benchmark_backends.py --batch-sizes 1 32 1024 --intra-op-threads 4
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from serving_pipeline import ServingPipeline
+from train_model import SentimentModel
+
+
+def time_batches(
+    predict_proba: Callable[[list[str]], np.ndarray], texts: list[str], duration: float
+) -> list[float]:
+    """Score `texts` repeatedly for about `duration` seconds; return per-call seconds."""
+    predict_proba(texts)  # warm-up
+    timings: list[float] = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline or len(timings) < 3:
+        start = time.perf_counter()
+        predict_proba(texts)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def load_backends(model_path: str, workdir: str, intra_op_threads: int) -> dict[str, object]:
+    """Load the sklearn pipeline and its npz and ONNX exports."""
+    model = SentimentModel.load(model_path)
+    npz_path = os.path.join(workdir, "model.npz")
+    model.save_serving(npz_path)
+    backends: dict[str, object] = {
+        "sklearn": model.pipeline,
+        "numpy": ServingPipeline.load(npz_path),
+    }
+
+    if importlib.util.find_spec("onnx") is None or importlib.util.find_spec("onnxruntime") is None:
+        print("⚠️  onnx/onnxruntime not installed, skipping the ONNX backend")
+        return backends
+
+    from onnx_pipeline import OnnxPipeline
+
+    onnx_path = os.path.join(workdir, "model.onnx")
+    model.export_onnx(onnx_path)
+    backends["onnx"] = OnnxPipeline.load(onnx_path, intra_op_threads=intra_op_threads)
+    return backends
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-path", default="models/sentiment_model.pkl")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512, 4096])
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per measurement")
+    parser.add_argument("--intra-op-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    if not Path(args.model_path).exists():
+        parser.error(f"Model not found: {args.model_path} (run `make train` first)")
+
+    samples = SentimentDataGenerator(num_samples=max(args.batch_sizes), seed=123)
+    texts = [text for text, _ in samples.generate_samples()]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        backends = load_backends(args.model_path, workdir, args.intra_op_threads)
+
+        reference = backends["sklearn"].predict_proba(texts)  # type: ignore[attr-defined]
+        print("\n🔎 Max |probability difference| vs sklearn:")
+        for name, backend in backends.items():
+            difference = np.abs(backend.predict_proba(texts) - reference).max()  # type: ignore
+            print(f"  {name:<10}{difference:.2e}")
+
+        print("\n🏁 Backend Benchmark")
+        print("=" * 72)
+        print(
+            f"{'backend':<10}{'batch':>7}{'p50 ms':>11}{'p99 ms':>11}"
+            f"{'rows/sec':>14}{'speedup':>10}"
+        )
+        for batch_size in args.batch_sizes:
+            batch = texts[:batch_size]
+            baseline = None
+            for name, backend in backends.items():
+                timings = time_batches(backend.predict_proba, batch, args.duration)  # type: ignore
+                median = statistics.median(timings)
+                baseline = baseline or median
+                print(
+                    f"{name:<10}{batch_size:>7}{median * 1000:>11.3f}"
+                    f"{percentile(timings, 99) * 1000:>11.3f}{batch_size / median:>14,.0f}"
+                    f"{baseline / median:>9.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
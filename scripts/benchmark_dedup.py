@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Effect of training-data deduplication on fit time, memory and held-out accuracy.
+Splits the data once, then fits SentimentModel on the full training split and on its
+deduplicated version, and scores both on the same test split.
+
+Usage:
+    python scripts/benchmark_dedup.py --samples 20000
+    python scripts/benchmark_dedup.py --data-path data/raw/sentiment_data.csv --threshold 0.7
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from train_model import SentimentModel, deduplicate
+
+
+def fit(model: SentimentModel, X: pd.Series, y: pd.Series) -> tuple[float, float]:
+    """Fit the model; return (seconds, peak traced MiB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.pipeline.fit(X, y)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-path", help="CSV with text and sentiment columns")
+    parser.add_argument("--samples", type=int, default=20000, help="Generated rows if no CSV")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.data_path:
+        df = pd.read_csv(args.data_path)
+    else:
+        samples = SentimentDataGenerator(num_samples=args.samples, seed=42).generate_samples()
+        df = pd.DataFrame(samples, columns=["text", "sentiment"])
+    train, test = train_test_split(
+        df, test_size=args.test_size, random_state=42, stratify=df["sentiment"]
+    )
+
+    start = time.perf_counter()
+    deduplicated = deduplicate(train, SentimentModel(), args.threshold)
+    dedup_seconds = time.perf_counter() - start
+
+    print("\n🏁 Deduplication Benchmark")
+    print("=" * 64)
+    print(f"Dedup pass: {dedup_seconds:.2f}s for {len(train)} training rows")
+    print(f"{'training set':<14}{'rows':>8}{'fit s':>9}{'peak MiB':>11}{'test accuracy':>16}")
+    for name, rows in [("full", train), ("deduplicated", deduplicated)]:
+        model = SentimentModel()
+        seconds, peak = fit(model, rows["text"], rows["sentiment"])
+        accuracy = accuracy_score(test["sentiment"], model.predict(test["text"]))
+        print(f"{name:<14}{len(rows):>8}{seconds:>9.2f}{peak:>11.1f}{accuracy:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Memory, latency and probability parity of float64 vs float32 models.
+Trains SentimentModel in both precisions on the same split and reports fit time, peak
+memory and the size of the TF-IDF training matrix and exported ``.npz``. It then prints
+how far the float32 probabilities drift from float64, and per-batch scoring latency with
+and without the scorer's reused buffers.
+
+Usage:
+    python scripts/benchmark_precision.py --samples 20000
+    python scripts/benchmark_precision.py --batch-sizes 1 32 512 --duration 1
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from benchmark_backends import percentile, time_batches
+
+from generate_data import SentimentDataGenerator
+from serving_pipeline import BufferPool, ServingPipeline
+from train_model import PRECISIONS, SentimentModel
+
+
+def fit(precision: str, texts: list[str], labels: list[str]) -> tuple[SentimentModel, float, float]:
+    """Fit a model; return (model, seconds, peak traced MiB)."""
+    model = SentimentModel(precision=precision)
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.pipeline.fit(texts, labels)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return model, elapsed, peak / 2**20
+
+
+def matrix_mib(model: SentimentModel, texts: list[str]) -> float:
+    """Size of the sparse TF-IDF matrix of `texts`."""
+    matrix = model.pipeline.named_steps["tfidf"].transform(texts)
+    return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2**20
+
+
+def time_scorer(pipeline: ServingPipeline, batch: list[str], duration: float) -> list[float]:
+    """Time the scorer alone on the featurized batch, as the graph's MODEL node runs it."""
+    rows = pipeline.featurizer.transform(batch)
+    return time_batches(lambda _: pipeline.scorer.predict_proba(rows), batch, duration)
+
+
+def parity(reference: np.ndarray, probabilities: np.ndarray) -> str:
+    """Summarize the absolute probability deltas and label agreement vs the reference."""
+    delta = np.abs(probabilities.astype(np.float64) - reference)
+    agreement = (probabilities.argmax(axis=1) == reference.argmax(axis=1)).mean()
+    return (
+        f"{delta.max():>11.2e}{delta.mean():>11.2e}{np.percentile(delta, 99):>11.2e}"
+        f"{agreement:>11.2%}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=20000, help="Generated training rows")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 512, 4096])
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds per measurement")
+    args = parser.parse_args()
+
+    samples = SentimentDataGenerator(num_samples=args.samples, seed=42).generate_samples()
+    train_texts = [text for text, _ in samples]
+    train_labels = [label for _, label in samples]
+    held_out = SentimentDataGenerator(num_samples=max(args.batch_sizes), seed=123)
+    texts = [text for text, _ in held_out.generate_samples()]
+
+    print("\n🏁 Precision Benchmark: training")
+    print("=" * 64)
+    print(f"{'precision':<11}{'fit s':>9}{'peak MiB':>11}{'matrix MiB':>12}{'npz KiB':>10}")
+    pipelines: dict[str, ServingPipeline] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for precision in PRECISIONS:
+            model, seconds, peak = fit(precision, train_texts, train_labels)
+            path = os.path.join(workdir, f"{precision}.npz")
+            model.save_serving(path)
+            pipelines[precision] = ServingPipeline.load(path)
+            print(
+                f"{precision:<11}{seconds:>9.2f}{peak:>11.1f}"
+                f"{matrix_mib(model, train_texts):>12.1f}{os.path.getsize(path) / 1024:>10.0f}"
+            )
+
+    reference = pipelines["float64"].predict_proba(texts)
+    print(f"\n🔎 Probability parity vs float64 on {len(texts)} held-out texts")
+    print("=" * 64)
+    print(f"{'model':<20}{'max Δ':>11}{'mean Δ':>11}{'p99 Δ':>11}{'agreement':>11}")
+    print(
+        f"{'float32 end-to-end':<20}{parity(reference, pipelines['float32'].predict_proba(texts))}"
+    )
+    cast = pipelines["float64"].astype("float32")
+    print(f"{'float64 cast at load':<20}{parity(reference, cast.predict_proba(texts))}")
+
+    print("\n⏱️  Scoring latency (featurize + score, and score only with/without reused buffers)")
+    print("=" * 64)
+    print(
+        f"{'precision':<11}{'batch':>7}{'full p50':>11}{'full p99':>11}"
+        f"{'score p50':>11}{'no reuse':>11}"
+    )
+    for batch_size in args.batch_sizes:
+        batch = texts[:batch_size]
+        for precision, pipeline in pipelines.items():
+            full = time_batches(pipeline.predict_proba, batch, args.duration)
+            pooled = time_scorer(pipeline, batch, args.duration)
+            pipeline.scorer.buffers = BufferPool(max_elements=0)
+            fresh = time_scorer(pipeline, batch, args.duration)
+            pipeline.scorer.buffers = BufferPool()
+            print(
+                f"{precision:<11}{batch_size:>7}{statistics.median(full) * 1000:>11.3f}"
+                f"{percentile(full, 99) * 1000:>11.3f}{statistics.median(pooled) * 1000:>11.3f}"
+                f"{statistics.median(fresh) * 1000:>11.3f}"
+            )
+    print("(milliseconds)")
+
+
+if __name__ == "__main__":
+    main()
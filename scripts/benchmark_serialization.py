@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cost of each Seldon response encoding: string labels, int32 class ids and probabilities.
+Builds each response the way the Seldon Core v1 wrapper does (an ndarray through
+tolist(), a tensor as its shape and flattened values, then JSON), and decodes it as the
+UI does with decode_seldon_response(). Prints the server encode time, the response
+size and the client decode time per batch size.
+
+Usage:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --rows 1 1000 100000 --repeat 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from seldon_payload import CLASSES_TAG, encode_output
+from sentiment_app_server import decode_seldon_response
+
+CLASSES = np.array(["negative", "neutral", "positive"], dtype=object)
+
+# (output encoding, request data type) per configuration
+CONFIGS = {
+    "labels ndarray": ("labels", "ndarray"),
+    "ids tensor": ("ids", "tensor"),
+    "proba ndarray": ("proba", "ndarray"),
+    "proba tensor": ("proba", "tensor"),
+}
+
+
+def seldon_response(probabilities: np.ndarray, encoding: str, data_type: str) -> str:
+    """Encode predict()'s output and serialize it as Seldon's wrapper would."""
+    if encoding == "labels":
+        output, tags = CLASSES[probabilities.argmax(axis=1)], {}
+    else:
+        output, tags = encode_output(probabilities, encoding), {CLASSES_TAG: CLASSES.tolist()}
+    if data_type == "tensor":
+        data = {"tensor": {"shape": list(output.shape), "values": output.ravel().tolist()}}
+    else:
+        data = {"ndarray": output.tolist()}
+    return json.dumps({"data": data, "meta": {"tags": tags}})
+
+
+def best_ms(func: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """Return the fastest of `repeat` runs of func in ms, and its result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n🏁 Seldon Response Encoding Benchmark")
+    print("=" * 58)
+    print(f"{'rows':>7}  {'encoding':<16}{'encode ms':>11}{'bytes':>13}{'decode ms':>11}")
+    for rows in args.rows:
+        probabilities = np.random.default_rng(0).dirichlet(np.ones(len(CLASSES)), size=rows)
+        for name, (encoding, data_type) in CONFIGS.items():
+            encode_ms, body = best_ms(
+                partial(seldon_response, probabilities, encoding, data_type), args.repeat
+            )
+            decode_ms, _ = best_ms(
+                lambda body=body: decode_seldon_response(json.loads(body)), args.repeat
+            )
+            print(f"{rows:>7}  {name:<16}{encode_ms:>11.2f}{len(body):>13,}{decode_ms:>11.2f}")
+    print("(decode includes building the UI's per-row sentiment/confidence dicts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fit time, memory and convergence of the classifier across data sizes, solvers and n_jobs.
+For each data size, vectorizes a generated training split once, then fits every solver
+on the same features. liblinear fits one binary model per class, once per --n-jobs
+value; lbfgs and saga fit one multinomial model and ignore n_jobs. Each size ends with
+the solver SentimentModel(solver="auto") would pick, and how long picking took.
+
+Usage:
+    python scripts/benchmark_training.py --samples 2000 20000 100000
+    python scripts/benchmark_training.py --samples 50000 --n-jobs 1 2 4 --tolerance 0.01
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from batching import available_cpus
+from generate_data import SentimentDataGenerator
+from train_model import SOLVERS, SentimentModel, SolverTrial, choose_solver, time_solver
+
+
+def traced_trial(
+    solver: str, n_jobs: int | None, data: tuple[Any, ...]
+) -> tuple[SolverTrial, float]:
+    """Fit one configuration; return (trial, peak traced MiB in this process)."""
+    tracemalloc.start()
+    trial = time_solver(solver, *data, n_jobs=n_jobs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return trial, peak / 2**20
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument(
+        "--n-jobs", type=int, nargs="+", default=sorted({1, available_cpus()}), help="liblinear"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.005, help="Accuracy for auto")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print("\n🏁 Training Benchmark")
+    print("=" * 78)
+    print(
+        f"{'rows':>8}  {'solver':<10}{'n_jobs':>7}{'fit s':>9}{'peak MiB':>10}"
+        f"{'iters':>7}{'converged':>11}{'test acc':>10}"
+    )
+    for n_samples in args.samples:
+        samples = SentimentDataGenerator(num_samples=n_samples, seed=42).generate_samples()
+        texts = [text for text, _ in samples]
+        labels = [label for _, label in samples]
+        X_train, X_test, y_train, y_test = train_test_split(
+            texts, labels, test_size=args.test_size, random_state=42, stratify=labels
+        )
+        vectorizer = SentimentModel().pipeline.named_steps["tfidf"]
+        start = time.perf_counter()
+        features = vectorizer.fit_transform(X_train)
+        vectorize_seconds = time.perf_counter() - start
+        data = (features, y_train, vectorizer.transform(X_test), y_test)
+
+        for solver in SOLVERS:
+            for n_jobs in args.n_jobs if solver == "liblinear" else [None]:
+                trial, peak = traced_trial(solver, n_jobs, data)
+                print(
+                    f"{len(X_train):>8}  {solver:<10}{n_jobs or '-':>7}{trial.seconds:>9.3f}"
+                    f"{peak:>10.1f}{trial.n_iter:>7}{'yes' if trial.converged else 'NO':>11}"
+                    f"{trial.accuracy:>10.4f}"
+                )
+
+        start = time.perf_counter()
+        chosen, _ = choose_solver(features, y_train, args.tolerance, n_jobs=max(args.n_jobs))
+        print(
+            f"{'':>8}  auto: {chosen} (picked in {time.perf_counter() - start:.2f}s; "
+            f"TF-IDF fit {vectorize_seconds:.2f}s, {features.shape[1]} features)"
+        )
+    print("(peak MiB counts Python/NumPy allocations in this process, not liblinear's own)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Throughput comparison of the UI server in single-process and production modes.
+Starts src/sentiment_app_server.py in each mode, drives it with concurrent clients,
+and prints requests/sec and latency percentiles.
+
+Usage:
+    python scripts/benchmark_ui.py --duration 10 --path /
+    python scripts/benchmark_ui.py --path /analyze --text "Great product!"  # needs Seldon
+    python scripts/benchmark_ui.py --path /analyze --replay logs/requests  # logged texts
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from request_log import read_records
+
+SERVER_SCRIPT = Path(__file__).parent.parent / "src" / "sentiment_app_server.py"
+
+
+def free_port() -> int:
+    """Find a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def start_server(mode: str, port: int, workers: int) -> subprocess.Popen:
+    """Start the UI server in the given mode and wait until /health responds."""
+    env = {
+        **os.environ,
+        "FASTAPI_MODE": mode,
+        "FASTAPI_HOST": "127.0.0.1",
+        "FASTAPI_PORT": str(port),
+        "FASTAPI_WORKERS": str(workers),
+        "LOG_LEVEL": "WARNING",
+    }
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server in {mode} mode did not become healthy")
+
+
+async def drive_load(
+    url: str, texts: list[str] | None, concurrency: int, duration: float
+) -> list[float]:
+    """
+    Send requests from `concurrency` tasks for `duration` seconds; return latencies.
+    With `texts`, each request POSTs the next one, cycling through the list.
+    """
+    latencies: list[float] = []
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+
+        async def worker(offset: int) -> None:
+            sent = offset
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                if not texts:
+                    response = await client.get(url)
+                else:
+                    response = await client.post(
+                        url,
+                        data={"text": texts[sent % len(texts)]},
+                        headers={"Accept": "application/json"},
+                    )
+                    sent += concurrency
+                if response.status_code < 500:
+                    latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies
+
+
+def client_process(args: tuple[str, list[str] | None, int, float]) -> list[float]:
+    """Run one load-generating client process."""
+    return asyncio.run(drive_load(*args))
+
+
+def run_benchmark(
+    mode: str, workers: int, path: str, texts: list[str] | None, args: argparse.Namespace
+) -> dict[str, float]:
+    """Benchmark one server mode and return throughput and latency stats."""
+    port = free_port()
+    process = start_server(mode, port, workers)
+    url = f"http://127.0.0.1:{port}{path}"
+    try:
+        client_args = (url, texts, args.concurrency, args.duration)
+        with Pool(args.clients) as pool:
+            results = pool.map(client_process, [client_args] * args.clients)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    latencies = sorted(latency for result in results for latency in result)
+    if not latencies:
+        raise RuntimeError(f"No successful requests in {mode} mode")
+    return {
+        "rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    """Run the comparison and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", default="/", help="Endpoint to benchmark")
+    parser.add_argument("--text", default=None, help="POST this text (JSON /analyze variant)")
+    parser.add_argument(
+        "--replay", nargs="+", help="POST the texts of these request logs (REQUEST_LOG_DIR)"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode")
+    parser.add_argument("--clients", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Connections per client")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    texts = [args.text] if args.text is not None else None
+    if args.replay:
+        texts = [record["text"] for record in read_records(args.replay)]
+        if not texts:
+            parser.error("no records found to replay")
+
+    print("🏁 UI Server Throughput Benchmark")
+    print("=" * 60)
+    print(f"Endpoint: {args.path}  Duration: {args.duration}s  ", end="")
+    print(f"Connections: {args.clients * args.concurrency}")
+    print(f"\n{'Mode':<28}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    modes = [("development", 1), ("production", args.workers)]
+    for mode, workers in modes:
+        stats = run_benchmark(mode, workers, args.path, texts, args)
+        label = f"{mode} ({workers} worker{'s' if workers > 1 else ''})"
+        print(f"{label:<28}{stats['rps']:>10.0f}{stats['p50_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,9 +21,13 @@ docker build -t sentiment-seldon:latest -f Dockerfile.seldon .
 # Copy model file to minikube
 echo "📦 Copying model file to minikube..."
 minikube ssh "sudo mkdir -p /tmp/models"
-if [ -f models/sentiment_model.pkl ]; then
+if [ -f models/sentiment_model.npz ]; then
+    minikube cp models/sentiment_model.npz /tmp/models/sentiment_model.npz
     minikube cp models/sentiment_model.pkl /tmp/models/sentiment_model.pkl
-    echo "✅ Model file copied"
+    if [ -f models/sentiment_model.onnx ]; then
+        minikube cp models/sentiment_model.onnx /tmp/models/sentiment_model.onnx
+    fi
+    echo "✅ Model files copied"
 else
     echo "⚠️  Model file not found. Please run 'make train' first."
     exit 1
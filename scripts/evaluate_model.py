@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Evaluate a trained model on a labeled CSV of any size, in chunks across worker processes.
+Reports accuracy, per-class precision/recall/F1, the confusion matrix, log loss, Brier
+score, calibration (ECE and per-confidence-bin accuracy) and scoring throughput. Memory
+is bounded by --chunk-rows x --max-pending, not by the size of the CSV.
+
+Usage:
+    python scripts/evaluate_model.py --data data/raw/sentiment_data.csv
+    python scripts/evaluate_model.py --model models/sentiment_model.npz --data eval.csv \
+        --workers 8 --chunk-rows 20000 --json models/eval_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from batching import available_cpus
+from evaluation import evaluate_stream, read_chunks
+from serving_pipeline import load_model
+
+
+def main() -> None:
+    """Run the evaluation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--model", default=os.getenv("SERVING_MODEL_PATH", "models/sentiment_model.npz")
+    )
+    parser.add_argument("--data", required=True, help="CSV with text and sentiment columns")
+    parser.add_argument("--workers", type=int, default=available_cpus())
+    parser.add_argument("--chunk-rows", type=int, default=10000)
+    parser.add_argument("--max-pending", type=int, help="Chunks in flight (default 2/worker)")
+    parser.add_argument("--bins", type=int, default=10, help="Calibration bins")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    print(f"\n📏 Evaluating {args.model} on {args.data} ({args.workers} workers)")
+    print("=" * 60)
+    metrics = evaluate_stream(
+        read_chunks(args.data, args.chunk_rows),
+        load_model(args.model),
+        load_model=partial(load_model, args.model),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        n_bins=args.bins,
+    )
+    print(metrics.format())
+
+    print("\nCalibration (confidence bin: rows, mean confidence, accuracy):")
+    report = metrics.report()
+    for row in report["calibration"]:
+        print(
+            f"  {row['low']:.1f}-{row['high']:.1f}: {row['rows']:>9}  "
+            f"{row['confidence']:.4f}  {row['accuracy']:.4f}"
+        )
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
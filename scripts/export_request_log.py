@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Export logged production requests (REQUEST_LOG_DIR) as training data or replay texts.
+Reads the rotating gzip JSONL files written by src/request_log.py, oldest first, and
+keeps the first record of each distinct text.
+
+--format csv writes text,sentiment,confidence rows, the layout train_model.py reads. The
+sentiment is the served model's prediction, so keep only confident rows
+(--min-confidence) or relabel them before training on them. --format texts writes one
+JSON-encoded text per line, which POST /jobs accepts as a .jsonl upload.
+
+Usage:
+    python scripts/export_request_log.py logs/requests -o data/raw/logged.csv --min-confidence 0.9
+    python scripts/export_request_log.py logs/requests --service ui --format texts -o replay.jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from request_log import read_records
+
+
+def main() -> None:
+    """Run the export."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+", help="Log files or directories")
+    parser.add_argument("-o", "--output", required=True, help="File to write")
+    parser.add_argument("--format", choices=["csv", "texts"], default="csv")
+    parser.add_argument("--service", help="Only records of this service (ui or model)")
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    args = parser.parse_args()
+
+    seen: set[str] = set()
+    rows = []
+    n_records = 0
+    for record in read_records(args.paths):
+        n_records += 1
+        if args.service and record.get("service") != args.service:
+            continue
+        if record.get("confidence", 1.0) < args.min_confidence or record["text"] in seen:
+            continue
+        seen.add(record["text"])
+        rows.append(record)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        if args.format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["text", "sentiment", "confidence"])
+            writer.writerows(
+                [record["text"], record["sentiment"], record.get("confidence", "")]
+                for record in rows
+            )
+        else:
+            f.writelines(json.dumps(record["text"]) + "\n" for record in rows)
+    print(f"Exported {len(rows)} distinct texts of {n_records} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Run the two-node inference graph locally as two seldon-core-microservice processes.
+Starts the SentimentFeaturizer TRANSFORMER and the SentimentClassifier MODEL, then does
+what Seldon's executor does in the cluster: sends each request to the transformer's
+/transform-input and forwards its response to the model's /predict.
+
+Usage:
+    python scripts/run_graph_local.py --text "Great product!" --text "Awful support."
+    python scripts/run_graph_local.py --keep-running   # leave both nodes up for curl
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# (interface name, service type, http port, grpc port, metrics port)
+NODES = {
+    "featurizer": ("seldon_featurizer.SentimentFeaturizer", "TRANSFORMER", 9001, 5001, 6001),
+    "classifier": ("seldon_model.SentimentClassifier", "MODEL", 9002, 5002, 6002),
+}
+
+
+def start_node(name: str, model_path: str) -> subprocess.Popen:
+    """Start one graph node and wait until its health endpoint responds."""
+    interface, service_type, http_port, grpc_port, metrics_port = NODES[name]
+    env = {**os.environ, "MODEL_PATH": model_path, "PYTHONPATH": str(SRC_DIR)}
+    process = subprocess.Popen(
+        [
+            "seldon-core-microservice",
+            interface,
+            "--service-type",
+            service_type,
+            "--http-port",
+            str(http_port),
+            "--grpc-port",
+            str(grpc_port),
+            "--metrics-port",
+            str(metrics_port),
+        ],
+        cwd=SRC_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Own process group, so stopping it also stops the gunicorn and gRPC children
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{http_port}/health/ping").status_code == 200:
+                print(f"✅ {name} ({service_type}) listening on :{http_port}")
+                return process
+        except httpx.TransportError:
+            time.sleep(0.5)
+    stop_node(process)
+    raise RuntimeError(f"{name} did not become healthy")
+
+
+def stop_node(process: subprocess.Popen) -> None:
+    """Stop a node and all of its worker processes."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def predict(client: httpx.Client, texts: list[str]) -> dict:
+    """Send texts through featurizer then classifier, as the Seldon executor would."""
+    featurizer_port, classifier_port = NODES["featurizer"][2], NODES["classifier"][2]
+    request = {"data": {"ndarray": [[text] for text in texts]}}
+
+    features = client.post(f"http://127.0.0.1:{featurizer_port}/transform-input", json=request)
+    features.raise_for_status()
+    response = client.post(f"http://127.0.0.1:{classifier_port}/predict", json=features.json())
+    response.raise_for_status()
+    return response.json()
+
+
+def main() -> None:
+    """Start both nodes, send the requests and shut down."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-path", default="models/sentiment_model.npz")
+    parser.add_argument("--text", action="append", help="Text to classify (repeatable)")
+    parser.add_argument("--keep-running", action="store_true", help="Wait for Ctrl+C")
+    args = parser.parse_args()
+
+    if shutil.which("seldon-core-microservice") is None:
+        sys.exit("seldon-core-microservice not found; install seldon-core==1.17.1")
+    model_path = str(Path(args.model_path).resolve())
+    if not Path(model_path).exists():
+        sys.exit(f"Model not found: {model_path} (run `make train` first)")
+
+    processes = []
+    try:
+        for name in NODES:
+            processes.append(start_node(name, model_path))
+
+        texts = args.text or ["I absolutely love this laptop!", "Terrible camera."]
+        with httpx.Client(timeout=30.0) as client:
+            print(json.dumps(predict(client, texts), indent=2))
+
+        if args.keep_running:
+            print("Nodes running; press Ctrl+C to stop")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            stop_node(process)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Startup-time audit for the model server, UI server and training script.
+Measures process time-to-ready and breaks import time down by package
+using ``python -X importtime``.
+
+Usage:
+    python scripts/startup_audit.py model --model-path models/sentiment_model.npz
+    python scripts/startup_audit.py model --compare models/sentiment_model.pkl \
+        models/sentiment_model.npz
+    python scripts/startup_audit.py ui
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Code run in a fresh interpreter for each target; it prints READY once usable
+TARGETS = {
+    "model": (
+        "from seldon_model import SentimentClassifier\n"
+        "SentimentClassifier()\n"
+        "print('READY', flush=True)\n"
+    ),
+    "ui": "import sentiment_app_server\nprint('READY', flush=True)\n",
+    "train": "import train_model\nprint('READY', flush=True)\n",
+}
+
+
+def run_target(target: str, model_path: str | None, importtime: bool) -> tuple[float, str]:
+    """
+    Start a fresh interpreter for the target and time it until it prints READY.
+
+    Returns:
+        Tuple of (seconds to ready, stderr output)
+    """
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR), "LOG_LEVEL": "WARNING"}
+    if model_path:
+        env["MODEL_PATH"] = model_path
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c"]
+
+    # stderr goes to a file: -X importtime output can fill a pipe and block the child
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [*command, TARGETS[target]],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+        )
+        assert process.stdout is not None
+        for line in process.stdout:
+            if line.strip() == "READY":
+                break
+        elapsed = time.perf_counter() - start
+        process.communicate()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"{target} failed to start:\n{stderr}")
+    return elapsed, stderr
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) tuples."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def time_to_ready(target: str, model_path: str | None, repeat: int) -> float:
+    """Median seconds to ready over `repeat` cold starts."""
+    return statistics.median(run_target(target, model_path, False)[0] for _ in range(repeat))
+
+
+def print_breakdown(target: str, model_path: str | None, top: int) -> None:
+    """Print import time per top-level package and the slowest modules."""
+    _, stderr = run_target(target, model_path, True)
+    modules = parse_importtime(stderr)
+
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    total_us = sum(by_package.values())
+
+    print(f"\nImport time by package (total {total_us / 1000:.0f} ms):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<28}{self_us / 1000:>9.1f} ms{100 * self_us / total_us:>7.1f}%")
+
+    print("\nSlowest modules (cumulative):")
+    for name, _, cumulative_us in sorted(modules, key=lambda m: -m[2])[:top]:
+        print(f"  {name:<48}{cumulative_us / 1000:>9.1f} ms")
+
+
+def main() -> None:
+    """Run the audit."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("target", choices=sorted(TARGETS), help="Process to audit")
+    parser.add_argument("--model-path", help="MODEL_PATH for the model target")
+    parser.add_argument("--compare", nargs=2, metavar="PATH", help="Compare two model files")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Rows per breakdown table")
+    args = parser.parse_args()
+
+    print(f"🔍 Startup Audit: {args.target}")
+    print("=" * 60)
+
+    if args.compare:
+        for path in args.compare:
+            seconds = time_to_ready(args.target, path, args.repeat)
+            print(f"{path:<44}{seconds * 1000:>9.0f} ms to ready")
+        for path in args.compare:
+            print(f"\n--- {path} ---")
+            print_breakdown(args.target, path, args.top)
+        return
+
+    seconds = time_to_ready(args.target, args.model_path, args.repeat)
+    print(f"Time to ready (median of {args.repeat}): {seconds * 1000:.0f} ms")
+    print_breakdown(args.target, args.model_path, args.top)
+
+
+if __name__ == "__main__":
+    main()
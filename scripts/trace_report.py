@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Aggregate per-stage latency from span files written by src/tracing.py.
+Pass the UI server's and the model wrapper's TRACE_EXPORT_PATH files together so
+spans from both sides are joined by trace ID.
+
+Usage:
+    python scripts/trace_report.py traces/ui.jsonl traces/model.jsonl
+"""
+
+import argparse
+import json
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+# Time between sending the request to Seldon and the model wrapper starting work:
+# network, Seldon's executor, and the Python wrapper's (de)serialization
+SELDON_HOP = "seldon.hop (executor + network)"
+
+
+def load_spans(paths: list[str]) -> dict[str, list[dict]]:
+    """Read span records and group them by trace ID."""
+    traces: dict[str, list[dict]] = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    span = json.loads(line)
+                    traces[span["traceId"]].append(span)
+    return traces
+
+
+def duration_ms(span: dict) -> float:
+    """Span duration in milliseconds."""
+    return (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e6
+
+
+def stage_durations(traces: dict[str, list[dict]]) -> dict[str, list[float]]:
+    """Collect durations per stage name, adding the derived Seldon hop stage."""
+    stages: dict[str, list[float]] = defaultdict(list)
+    for spans in traces.values():
+        by_name: dict[str, float] = {}
+        for span in spans:
+            elapsed = duration_ms(span)
+            stages[span["name"]].append(elapsed)
+            by_name[span["name"]] = elapsed
+
+        model_time = by_name.get("model.predict", by_name.get("model.predict_proba"))
+        if "ui.seldon_call" in by_name and model_time is not None:
+            stages[SELDON_HOP].append(max(by_name["ui.seldon_call"] - model_time, 0.0))
+    return stages
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def main() -> None:
+    """Print the per-stage latency breakdown."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+", help="Span JSON-lines files")
+    args = parser.parse_args()
+
+    missing = [path for path in args.paths if not Path(path).exists()]
+    if missing:
+        parser.error(f"Span file(s) not found: {', '.join(missing)}")
+
+    traces = load_spans(args.paths)
+    stages = stage_durations(traces)
+    root_total = sum(stages.get("ui.analyze", [])) or None
+
+    print("⏱️  Per-Stage Latency Breakdown")
+    print("=" * 86)
+    print(f"Traces: {len(traces)}")
+    print(
+        f"\n{'Stage':<34}{'count':>7}{'mean ms':>10}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'% total':>9}"
+    )
+    for name in sorted(stages, key=lambda stage: -sum(stages[stage])):
+        values = stages[name]
+        share = f"{100 * sum(values) / root_total:8.1f}%" if root_total else f"{'-':>9}"
+        print(
+            f"{name:<34}{len(values):>7}{statistics.fmean(values):>10.2f}"
+            f"{percentile(values, 50):>10.2f}{percentile(values, 95):>10.2f}"
+            f"{percentile(values, 99):>10.2f}{share}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+"""
+Asynchronous batch scoring jobs for the UI server.
+
+A client submits many texts at once and gets a job id back. BatchJobRunner splits the job
+into chunks and scores each chunk with one batched Seldon call, keeping at most
+`concurrency` calls in flight across all jobs of the process.
+
+Jobs live in a JobStore directory, one subdirectory per job:
+
+- ``job.json``: status and progress, replaced atomically on every update
+- ``texts.jsonl``: the submitted texts, one JSON string per line
+- ``results.jsonl``: one line per scored chunk, appended as chunks finish
+- ``lock``: flock held by the process running the job
+- ``cancel``: marker asking whichever process runs the job to stop
+
+Because everything is on disk, a restarted server resumes unfinished jobs from their
+first missing chunk. Any worker process can report a job's progress or stream its results,
+whichever process runs it.
+"""
+
+import asyncio
+import contextlib
+import csv
+import fcntl
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+# Job states; only queued and running jobs are resumed after a restart
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobNotFoundError(KeyError):
+    """Raised for a job id that is not in the store."""
+
+
+def parse_texts(filename: str, data: bytes) -> list[str]:
+    """
+    Read the texts of an uploaded file.
+
+    Args:
+        filename: Upload name; the extension selects the format: ``.csv`` (a "text"
+            column), ``.json`` (an array of strings), ``.jsonl``/``.ndjson`` (one string
+            or {"text": ...} object per line), anything else one text per line
+        data: File contents, UTF-8 encoded
+
+    Returns:
+        Texts in file order
+
+    Raises:
+        ValueError: If the file does not match its format
+    """
+    content = data.decode("utf-8-sig")
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        reader = csv.DictReader(io.StringIO(content))
+        if "text" not in (reader.fieldnames or []):
+            raise ValueError("CSV uploads need a 'text' column")
+        return [row["text"] for row in reader]
+    if suffix == ".json":
+        texts = json.loads(content)
+        if not isinstance(texts, list):
+            raise ValueError("JSON uploads must hold an array of strings")
+        return texts
+    lines = [line for line in content.splitlines() if line.strip()]
+    if suffix in (".jsonl", ".ndjson"):
+        records = [json.loads(line) for line in lines]
+        return [record.get("text") if isinstance(record, dict) else record for record in records]
+    return lines
+
+
+class JobStore:
+    """File-backed store of batch jobs and their results."""
+
+    def __init__(self, root: str) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding one subdirectory per job (created with the first job)
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _dir(self, job_id: str) -> Path:
+        """Directory of a job, refusing ids that could point outside the store."""
+        if not job_id.isalnum():
+            raise JobNotFoundError(job_id)
+        return self.root / job_id
+
+    def create(self, texts: Sequence[str], chunk_size: int) -> dict[str, Any]:
+        """
+        Persist a new queued job.
+
+        Args:
+            texts: Texts to score
+            chunk_size: Texts per Seldon call
+
+        Returns:
+            Job record
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True)
+        with open(job_dir / "texts.jsonl", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(text) + "\n" for text in texts)
+        (job_dir / "results.jsonl").touch()
+        now = time.time()
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "n_texts": len(texts),
+            "n_done": 0,
+            "chunk_size": chunk_size,
+            "n_chunks": -(-len(texts) // chunk_size),
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+        }
+        self._write_job(job)
+        return job
+
+    def load(self, job_id: str) -> dict[str, Any]:
+        """
+        Read a job record.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Job record
+
+        Raises:
+            JobNotFoundError: If the job does not exist
+        """
+        try:
+            return json.loads((self._dir(job_id) / "job.json").read_text())
+        except FileNotFoundError:
+            raise JobNotFoundError(job_id) from None
+
+    def update(self, job_id: str, **fields: Any) -> dict[str, Any]:
+        """
+        Change fields of a job record.
+
+        Args:
+            job_id: Job id
+            **fields: New values, e.g. status="running"
+
+        Returns:
+            Updated job record
+        """
+        with self._lock:
+            job = self.load(job_id)
+            job.update(fields, updated_at=time.time())
+            self._write_job(job)
+        return job
+
+    def _write_job(self, job: dict[str, Any]) -> None:
+        """Replace job.json atomically, so readers never see a partial record."""
+        path = self.root / job["job_id"] / "job.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(job))
+        os.replace(tmp, path)
+
+    def jobs(self) -> list[dict[str, Any]]:
+        """Return all job records, oldest first."""
+        records = []
+        for path in self.root.glob("*/job.json"):
+            with contextlib.suppress(FileNotFoundError, json.JSONDecodeError):
+                records.append(json.loads(path.read_text()))
+        return sorted(records, key=lambda job: job["created_at"])
+
+    def texts(self, job_id: str) -> list[str]:
+        """Read the submitted texts of a job."""
+        with open(self._dir(job_id) / "texts.jsonl", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def append_chunk(self, job_id: str, chunk: int, start: int, results: list[Any]) -> None:
+        """
+        Append the results of one chunk as a single line.
+
+        Args:
+            job_id: Job id
+            chunk: Chunk number
+            start: Index of the chunk's first text
+            results: One result per text of the chunk
+        """
+        line = json.dumps({"chunk": chunk, "start": start, "results": results}) + "\n"
+        with self._lock:
+            try:
+                f = open(self._dir(job_id) / "results.jsonl", "a", encoding="utf-8")
+            except FileNotFoundError:
+                raise JobNotFoundError(job_id) from None
+            with f:
+                f.write(line)
+
+    def read_chunks(self, job_id: str, offset: int = 0) -> tuple[list[dict[str, Any]], int]:
+        """
+        Read chunk lines appended since `offset`.
+
+        Args:
+            job_id: Job id
+            offset: Byte offset returned by the previous call
+
+        Returns:
+            Tuple of (complete chunk records, offset to continue from); a line still
+            being written is left for the next call
+        """
+        with open(self._dir(job_id) / "results.jsonl", "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        chunks = [json.loads(line) for line in data[:end].splitlines()]
+        return chunks, offset + end
+
+    def completed_chunks(self, job_id: str) -> set[int]:
+        """
+        Find the chunks already scored, dropping a line torn by a crash mid-write.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Numbers of the completed chunks
+        """
+        chunks, end = self.read_chunks(job_id)
+        with open(self._dir(job_id) / "results.jsonl", "r+b") as f:
+            f.truncate(end)
+        return {chunk["chunk"] for chunk in chunks}
+
+    def try_lock(self, job_id: str) -> IO[str] | None:
+        """
+        Take the job's lock without blocking.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Open lock file to keep (closing it releases the lock), or None if another
+            process runs the job
+        """
+        handle = open(self._dir(job_id) / "lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return None
+        return handle
+
+    def request_cancel(self, job_id: str) -> None:
+        """
+        Ask the process running a job to stop after its chunks in flight.
+
+        Args:
+            job_id: Job id
+
+        Raises:
+            JobNotFoundError: If the job does not exist
+        """
+        try:
+            (self._dir(job_id) / "cancel").touch()
+        except FileNotFoundError:
+            raise JobNotFoundError(job_id) from None
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Return whether a job was cancelled or deleted."""
+        job_dir = self._dir(job_id)
+        return (job_dir / "cancel").exists() or not (job_dir / "job.json").exists()
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job and its results."""
+        job_dir = self._dir(job_id)
+        if not job_dir.exists():
+            raise JobNotFoundError(job_id)
+        shutil.rmtree(job_dir)
+
+
+class BatchJobRunner:
+    """Runs stored jobs as chunked, concurrency-bounded batch calls."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        score_batch: Callable[[list[str]], Awaitable[list[Any]]],
+        concurrency: int = 4,
+        chunk_size: int = 256,
+        retries: int = 2,
+        retry_delay: float = 1.0,
+    ) -> None:
+        """
+        Initialize the runner.
+
+        Args:
+            store: Job store
+            score_batch: Coroutine scoring a list of texts, one result per text
+            concurrency: Batch calls in flight at once, across all jobs of this process
+            chunk_size: Texts per batch call for new jobs
+            retries: Extra attempts for a failing chunk before the job fails
+            retry_delay: Seconds before the first retry, doubled for each further one
+        """
+        self.store = store
+        self.score_batch = score_batch
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = max(1, chunk_size)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls, score_batch: Callable[[list[str]], Awaitable[list[Any]]]) -> "BatchJobRunner":
+        """
+        Create a runner configured by the BATCH_JOB_* environment variables.
+
+        Args:
+            score_batch: Coroutine scoring a list of texts
+
+        Returns:
+            Configured BatchJobRunner
+        """
+        return cls(
+            JobStore(os.getenv("BATCH_JOB_DIR", "data/jobs")),
+            score_batch,
+            concurrency=int(os.getenv("BATCH_JOB_CONCURRENCY", "4")),
+            chunk_size=int(os.getenv("BATCH_JOB_CHUNK_SIZE", "256")),
+            retries=int(os.getenv("BATCH_JOB_RETRIES", "2")),
+        )
+
+    async def submit(self, texts: Sequence[str]) -> dict[str, Any]:
+        """
+        Store a job and start running it in the background.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            Job record
+        """
+        job = await asyncio.to_thread(self.store.create, texts, self.chunk_size)
+        lock = self.store.try_lock(job["job_id"])
+        if lock is not None:
+            self._start(job["job_id"], lock)
+        return job
+
+    def resume(self) -> list[str]:
+        """
+        Restart the queued and running jobs that no other process holds.
+
+        Returns:
+            Ids of the resumed jobs
+        """
+        resumed = []
+        for job in self.store.jobs():
+            if job["status"] in FINISHED or job["job_id"] in self._tasks:
+                continue
+            if self.store.cancel_requested(job["job_id"]):
+                continue
+            lock = self.store.try_lock(job["job_id"])
+            if lock is not None:
+                self._start(job["job_id"], lock)
+                resumed.append(job["job_id"])
+        if resumed:
+            logger.info(f"Resumed {len(resumed)} batch job(s)")
+        return resumed
+
+    async def cancel(self, job_id: str, timeout: float = 10.0) -> bool:
+        """
+        Stop a job and wait for it to stop; its status is left as is.
+
+        A job running in this process is cancelled at once. One running in another
+        process sees the store's cancel marker and stops after its chunks in flight.
+
+        Args:
+            job_id: Job id
+            timeout: Seconds to wait for another process to stop the job
+
+        Returns:
+            True if the job was running and has stopped
+        """
+        try:
+            await asyncio.to_thread(self.store.request_cancel, job_id)
+        except JobNotFoundError:
+            return False
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return True
+        # The process running the job releases its lock once it has stopped
+        deadline = time.monotonic() + timeout
+        lock = self.store.try_lock(job_id)
+        running = lock is None
+        while lock is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            lock = self.store.try_lock(job_id)
+        if lock is None:
+            logger.warning(f"Batch job {job_id} still running {timeout:.0f}s after cancel")
+            return False
+        lock.close()
+        return running
+
+    async def shutdown(self) -> None:
+        """Stop all jobs without changing their status, so the next start resumes them."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job_id: str, lock: IO[str]) -> None:
+        """Run a job in a background task that owns its lock."""
+        task = asyncio.get_running_loop().create_task(self._run(job_id, lock))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str, lock: IO[str]) -> None:
+        """Score the missing chunks of a job and record its final status."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        try:
+            if self.store.cancel_requested(job_id):
+                return
+            job = self.store.update(job_id, status=RUNNING)
+            texts = await asyncio.to_thread(self.store.texts, job_id)
+            done = await asyncio.to_thread(self.store.completed_chunks, job_id)
+            size = job["chunk_size"]
+            pending = deque(chunk for chunk in range(job["n_chunks"]) if chunk not in done)
+            progress = {"n_done": sum(len(texts[c * size : (c + 1) * size]) for c in done)}
+
+            async def cancelled() -> bool:
+                return await asyncio.to_thread(self.store.cancel_requested, job_id)
+
+            async def work() -> None:
+                while not await cancelled() and pending:
+                    chunk = pending.popleft()
+                    start = chunk * size
+                    results = await self._score_chunk(texts[start : start + size])
+                    await asyncio.to_thread(self.store.append_chunk, job_id, chunk, start, results)
+                    progress["n_done"] += len(results)
+                    await asyncio.to_thread(self.store.update, job_id, n_done=progress["n_done"])
+
+            workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+            if await cancelled():
+                logger.info(f"Batch job {job_id} cancelled")
+                return
+            # Chunk updates run on threads and can land out of order; settle the final count
+            self.store.update(job_id, status=SUCCEEDED, n_done=progress["n_done"])
+        except JobNotFoundError:
+            logger.info(f"Batch job {job_id} was deleted while running")
+        except Exception as e:
+            logger.error(f"Batch job {job_id} failed: {e}")
+            # The job may have been deleted while it ran
+            with contextlib.suppress(JobNotFoundError):
+                self.store.update(job_id, status=FAILED, error=str(e))
+        finally:
+            lock.close()
+
+    async def _score_chunk(self, texts: list[str]) -> list[Any]:
+        """Score one chunk within the concurrency bound, retrying failed calls."""
+        assert self._slots is not None
+        attempt = 0
+        while True:
+            try:
+                async with self._slots:
+                    results = await self.score_batch(texts)
+                if len(results) != len(texts):
+                    raise ValueError(f"Got {len(results)} results for {len(texts)} texts")
+                return results
+            except Exception as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self.retry_delay * 2**attempt
+                attempt += 1
+                logger.warning(f"Batch call failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+async def follow_job(
+    store: JobStore, job_id: str, poll_interval: float = 0.25, follow: bool = True
+) -> AsyncIterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """
+    Yield a job's results as its chunks finish.
+
+    Reads only the store, so it works in any process, including one that does not run
+    the job. The results end early if the job is deleted while it is followed.
+
+    Args:
+        store: Job store
+        job_id: Job id
+        poll_interval: Seconds between checks for new chunks
+        follow: Keep waiting until the job finishes (False: stop after what is stored)
+
+    Yields:
+        Tuples of (job record, chunk records that are new since the last yield); the
+        last tuple carries the final job record
+
+    Raises:
+        JobNotFoundError: If the job does not exist when following starts
+    """
+    offset = 0
+    store.load(job_id)
+    while True:
+        # Load the record before reading results, so a finished status implies all
+        # chunks were already written
+        try:
+            job = store.load(job_id)
+            chunks, offset = await asyncio.to_thread(store.read_chunks, job_id, offset)
+        except (JobNotFoundError, FileNotFoundError):
+            return
+        finished = job["status"] in FINISHED or not follow
+        if chunks or finished:
+            yield job, chunks
+        if finished:
+            return
+        await asyncio.sleep(poll_interval)
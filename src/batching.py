@@ -0,0 +1,231 @@
+"""
+Intra-request parallelism for large prediction batches.
+
+BatchRunner splits a batch above a size threshold into chunks, scores them on a bounded
+pool and concatenates the results in input order. Two pool types are available:
+
+- ``thread``: cheap to start and shares the loaded model; only pays off when the backend
+  releases the GIL for most of its work (onnxruntime does)
+- ``process``: worker processes load their own copy of the model, so the Python-bound
+  tokenization of the NumPy and sklearn backends runs on several cores
+
+The worker count defaults to the CPUs this container may actually use (cgroup quota and
+CPU affinity, not the host's core count), divided among the server's worker processes.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+# Model loaded by each worker of a process pool
+_worker_model: Any = None
+
+
+def available_cpus(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """
+    Count the CPUs this process may use, honouring CPU affinity and cgroup quotas.
+    Platforms without affinity masks (macOS) count all CPUs.
+
+    Args:
+        cgroup_root: Mount point of the cgroup filesystem
+
+    Returns:
+        Usable CPUs, rounded down and at least 1
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = float(len(os.sched_getaffinity(0)))
+    else:
+        cpus = float(os.cpu_count() or 1)
+    root = Path(cgroup_root)
+
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" when unlimited
+        quota, period = (root / "cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota is -1 when unlimited
+            quota_us = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+            period_us = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+            if quota_us > 0 and period_us > 0:
+                cpus = min(cpus, quota_us / period_us)
+        except (OSError, ValueError):
+            pass
+
+    return max(1, math.floor(cpus))
+
+
+def _init_worker(load_model: Callable[[], Any]) -> None:
+    """Load the model once per worker process."""
+    global _worker_model
+    _worker_model = load_model()
+
+
+def _score_chunk(method: str, texts: Sequence[str]) -> NDArray:
+    """Run `method` of the worker's model on one chunk."""
+    return getattr(_worker_model, method)(texts)
+
+
+class BatchRunner:
+    """Scores large batches in parallel chunks; small batches run inline."""
+
+    def __init__(
+        self,
+        model: Any,
+        load_model: Callable[[], Any],
+        min_rows: int = 2048,
+        chunk_rows: int = 512,
+        workers: int | None = None,
+        executor: str = "auto",
+    ) -> None:
+        """
+        Initialize the runner.
+
+        Args:
+            model: Loaded model with predict() and predict_proba() over raw texts
+            load_model: Picklable zero-argument callable that loads the model again;
+                each process worker calls it once
+            min_rows: Smallest batch that is split; smaller batches run inline
+            chunk_rows: Rows per chunk
+            workers: Pool size (default: usable CPUs per server worker process)
+            executor: "thread", "process", or "auto" to use threads only for backends
+                that release the GIL
+        """
+        if executor not in ("auto", "thread", "process"):
+            raise ValueError(f"Unknown executor {executor!r}, expected auto, thread or process")
+        if executor == "auto":
+            executor = "thread" if getattr(model, "releases_gil", False) else "process"
+
+        self.model = model
+        self.load_model = load_model
+        self.min_rows = min_rows
+        self.chunk_rows = max(1, chunk_rows)
+        self.workers = workers or default_workers()
+        self.executor_kind = executor
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, model: Any, load_model: Callable[[], Any]) -> "BatchRunner":
+        """
+        Create a runner configured by the BATCH_* environment variables.
+
+        Args:
+            model: Loaded model
+            load_model: Picklable zero-argument callable that loads the model again
+
+        Returns:
+            Configured BatchRunner
+        """
+        return cls(
+            model,
+            load_model,
+            min_rows=int(os.getenv("BATCH_PARALLEL_MIN_ROWS", "2048")),
+            chunk_rows=int(os.getenv("BATCH_CHUNK_ROWS", "512")),
+            workers=int(os.getenv("BATCH_WORKERS", "0")) or None,
+            executor=os.getenv("BATCH_EXECUTOR", "auto"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether batches can be split at all."""
+        return self.workers > 1
+
+    def should_split(self, n_rows: int) -> bool:
+        """
+        Decide whether a batch is worth splitting.
+
+        Args:
+            n_rows: Rows in the batch
+
+        Returns:
+            True if the batch spans several chunks and a pool is available
+        """
+        return self.enabled and n_rows >= self.min_rows and n_rows > self.chunk_rows
+
+    def run(self, method: str, texts: Sequence[str]) -> NDArray:
+        """
+        Run `method` ("predict" or "predict_proba") over the texts, in chunks if large.
+
+        Args:
+            method: Model method to call
+            texts: Decoded input texts
+
+        Returns:
+            Model output for all rows, in input order
+        """
+        if not self.should_split(len(texts)):
+            return getattr(self.model, method)(texts)
+
+        chunks = [texts[i : i + self.chunk_rows] for i in range(0, len(texts), self.chunk_rows)]
+        score: Callable[[Sequence[str]], NDArray]
+        if self.executor_kind == "thread":
+            score = getattr(self.model, method)
+        else:
+            score = partial(_score_chunk, method)
+        executor = self._get_executor()
+        try:
+            # map() yields results in submission order, so rows stay aligned with the input
+            return np.concatenate(list(executor.map(score, chunks)))
+        except BrokenExecutor:
+            # A worker died, e.g. killed for memory; this batch fails, the next gets a new pool
+            logger.warning("Batch pool is broken, starting a new one for the next batch")
+            self._discard(executor)
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the pool, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard(self, executor: Executor) -> None:
+        """Stop a broken pool, unless another request already replaced it."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        """Start the pool on first use, once however many requests arrive together."""
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.workers}-worker {self.executor_kind} pool for batches")
+                if self.executor_kind == "thread":
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="batch")
+                else:
+                    # forkserver children start clean instead of forking a threaded server
+                    self._executor = ProcessPoolExecutor(
+                        self.workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                        initializer=_init_worker,
+                        initargs=(self.load_model,),
+                    )
+            return self._executor
+
+
+def default_workers() -> int:
+    """
+    Pool size when BATCH_WORKERS is unset: usable CPUs shared among the server's
+    worker processes (GUNICORN_WORKERS in the Seldon Python wrapper).
+
+    Returns:
+        Number of pool workers, at least 1
+    """
+    server_workers = max(1, int(os.getenv("GUNICORN_WORKERS", "1")))
+    return max(1, available_cpus() // server_workers)
@@ -0,0 +1,282 @@
+"""
+Shadow scoring of challenger models next to the served champion.
+
+A retrained model is usually evaluated by deploying it as a second SeldonDeployment,
+which doubles the resources and featurizes every text twice. Challengers trained on the
+champion's fitted vectorizer (``SHARED_VECTORIZER_PATH`` in train_model.py) produce
+the same TF-IDF rows, so the model server can score them on the rows it already built
+for the champion. Only the champion's answer is returned. The rows and that answer are
+queued to a background thread, which runs each challenger's dot product and keeps
+agreement stats. Only these aggregates are kept; per-text challenger labels are not
+written to the request log, whose records are queued before the challengers run.
+
+The request thread only pays for a non-blocking queue put. When the queue is full, the
+batch is dropped from the comparison rather than slowing down the request. The thread is
+started by the first submit() in each process, so gunicorn workers forked from the master
+that built the scorer each run their own.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from serving_pipeline import LinearScorer, ServingPipeline, SparseRows
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengerStats:
+    """Running agreement of one challenger with the champion."""
+
+    def __init__(self) -> None:
+        """Initialize empty counts."""
+        self.rows = 0
+        self.agree = 0
+        self.flips: Counter[tuple[str, str]] = Counter()
+        self.errors = 0
+
+    def add(self, champion: NDArray, challenger: NDArray) -> None:
+        """
+        Count one batch of labels.
+
+        Args:
+            champion: Labels returned to the caller
+            challenger: Labels the challenger predicted for the same rows
+        """
+        same = champion == challenger
+        self.rows += len(champion)
+        self.agree += int(np.count_nonzero(same))
+        changed = ~same
+        self.flips.update(
+            zip(champion[changed].astype(str), challenger[changed].astype(str), strict=True)
+        )
+
+    @property
+    def agreement(self) -> float:
+        """Fraction of rows labeled the same as the champion."""
+        return self.agree / self.rows if self.rows else 1.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Counts as a JSON-serializable dict, flips keyed "champion->challenger"."""
+        return {
+            "rows": self.rows,
+            "agreement": round(self.agreement, 6),
+            "flips": {f"{old}->{new}": n for (old, new), n in sorted(self.flips.items())},
+            "errors": self.errors,
+        }
+
+
+class ShadowScorer:
+    """Score challengers on the champion's feature rows in a background thread."""
+
+    def __init__(
+        self,
+        challengers: dict[str, LinearScorer],
+        classes: NDArray,
+        queue_size: int = 64,
+        log_interval: float = 60.0,
+    ) -> None:
+        """
+        Initialize the scorer; its thread starts on the first submit() in this process.
+
+        Args:
+            challengers: Scorer per challenger name, all over the champion's features
+            classes: Champion's class labels, in probability column order
+            queue_size: Batches waiting to be scored before new ones are dropped
+            log_interval: Seconds between agreement summaries in the log
+        """
+        self.challengers = challengers
+        self.classes = np.asarray(classes)
+        self.queue_size = queue_size
+        self.log_interval = log_interval
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._closed = False
+        self._reset()
+
+    @classmethod
+    def from_env(cls, champion: Any) -> "ShadowScorer | None":
+        """
+        Load the challengers listed in CHALLENGER_MODEL_PATHS.
+
+        CHALLENGER_MODEL_PATHS is a comma-separated list of ``.npz`` serving models; each
+        is named after its file. CHALLENGER_QUEUE_SIZE and CHALLENGER_LOG_SECONDS tune
+        the queue and log interval.
+
+        Args:
+            champion: Served model
+
+        Returns:
+            ShadowScorer, or None when no challengers are configured
+
+        Raises:
+            ValueError: If the champion or a challenger is not a ``.npz`` model, or a
+                challenger was trained on another vectorizer
+        """
+        paths = [path.strip() for path in os.getenv("CHALLENGER_MODEL_PATHS", "").split(",")]
+        paths = [path for path in paths if path]
+        if not paths:
+            return None
+        if not isinstance(champion, ServingPipeline):
+            raise ValueError("Challengers require a .npz champion model (MODEL_PATH)")
+
+        fingerprint = champion.featurizer.fingerprint()
+        challengers = {}
+        for path in paths:
+            if not path.endswith(".npz"):
+                raise ValueError(f"Challenger {path} is not a .npz serving model")
+            challenger = ServingPipeline.load(path)
+            if challenger.featurizer.fingerprint() != fingerprint:
+                raise ValueError(
+                    f"Challenger {path} was trained on another vectorizer than the champion; "
+                    "retrain it with SHARED_VECTORIZER_PATH"
+                )
+            name = os.path.splitext(os.path.basename(path))[0]
+            challengers[name] = challenger.scorer
+        logger.info(f"Shadow scoring {len(challengers)} challengers: {', '.join(challengers)}")
+        return cls(
+            challengers,
+            champion.classes_,
+            queue_size=int(os.getenv("CHALLENGER_QUEUE_SIZE", "64")),
+            log_interval=float(os.getenv("CHALLENGER_LOG_SECONDS", "60")),
+        )
+
+    def submit(self, rows: SparseRows, output: NDArray) -> bool:
+        """
+        Queue a scored batch for comparison, without waiting.
+
+        Args:
+            rows: Feature rows the champion scored (not modified afterwards)
+            output: Champion labels, or probabilities in `classes` order
+
+        Returns:
+            True if queued, False if the queue was full and the batch was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((rows, output))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def skip(self, n_rows: int) -> None:
+        """
+        Count a batch whose feature rows never existed in this process, e.g. one scored in
+        a worker pool, so the comparison's coverage can be judged.
+
+        Args:
+            n_rows: Rows in the skipped batch
+        """
+        with self._lock:
+            self.skipped_batches += 1
+            self.skipped_rows += n_rows
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Agreement of every challenger with the champion so far, in this process.
+
+        Returns:
+            {"challengers": {name: {"rows", "agreement", "flips", "errors"}},
+            "dropped_batches": n, "skipped_batches": n, "skipped_rows": n}
+        """
+        with self._lock:
+            return {
+                "challengers": {name: stats.to_dict() for name, stats in self._stats.items()},
+                "dropped_batches": self.dropped,
+                "skipped_batches": self.skipped_batches,
+                "skipped_rows": self.skipped_rows,
+            }
+
+    def join(self) -> None:
+        """Wait until every queued batch has been scored."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Score the queued batches, stop the thread and log the final stats."""
+        with self._start_lock:
+            self._closed = True
+            running = self._thread is not None and self._pid == os.getpid()
+        if running:
+            assert self._thread is not None
+            self._queue.put(None)
+            self._thread.join()
+        self._log_stats()
+
+    def _reset(self) -> None:
+        """Create the queue, lock and counters owned by the current process."""
+        self.dropped = 0
+        self.skipped_batches = 0
+        self.skipped_rows = 0
+        self._stats = {name: ChallengerStats() for name in self.challengers}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[SparseRows, NDArray] | None] = queue.Queue(self.queue_size)
+        self._last_log = time.monotonic()
+
+    def _ensure_started(self) -> None:
+        """Start the thread on first use in this process, after a fork included."""
+        if self._pid == os.getpid() or self._closed:
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() or self._closed:
+                return
+            if self._pid is not None:
+                # Forked after the parent started: its thread did not survive, and its
+                # queue and lock may have been mid-use
+                self._reset()
+            self._thread = threading.Thread(target=self._work, name="shadow-scorer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _work(self) -> None:
+        """Score queued batches until close()."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._compare(*item)
+                if time.monotonic() - self._last_log >= self.log_interval:
+                    self._log_stats()
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, rows: SparseRows, output: NDArray) -> None:
+        """Score one batch with every challenger and count agreements."""
+        champion = output if output.ndim == 1 else self.classes[output.argmax(axis=1)]
+        for name, scorer in self.challengers.items():
+            try:
+                labels = scorer.predict(rows)
+            except Exception as e:
+                logger.warning(f"Challenger {name} failed on {rows.n_rows} rows: {e}")
+                with self._lock:
+                    self._stats[name].errors += 1
+                continue
+            with self._lock:
+                self._stats[name].add(champion, labels)
+
+    def _log_stats(self) -> None:
+        """Log each challenger's agreement."""
+        self._last_log = time.monotonic()
+        stats = self.stats()
+        for name, challenger in stats["challengers"].items():
+            logger.info(
+                f"Challenger {name}: agreement {challenger['agreement']:.4f} over "
+                f"{challenger['rows']} rows, flips {challenger['flips']}"
+            )
+        if stats["dropped_batches"]:
+            logger.info(f"Challengers skipped {stats['dropped_batches']} batches (queue full)")
+        if stats["skipped_batches"]:
+            logger.info(
+                f"Challengers skipped {stats['skipped_rows']} rows in "
+                f"{stats['skipped_batches']} batches scored by the worker pool"
+            )
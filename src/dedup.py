@@ -0,0 +1,270 @@
+"""
+Exact and near-duplicate removal for training data.
+
+Generated and scraped reviews repeat the same template sentences, and every repeat adds
+fit time and memory without adding information. Deduplicator drops them in two passes
+over the vectorizer's own tokens:
+
+1. Exact: texts with the same token sequence (and so the same TF-IDF row) are grouped by
+   a hash of that sequence.
+2. Near: MinHash signatures of word shingles are split into LSH bands. A text is dropped
+   when a kept text shares a band and their signatures estimate a Jaccard similarity at or
+   above the threshold.
+
+The first text of each group is kept, so the result only depends on the input order.
+"""
+
+import hashlib
+import math
+from collections.abc import Callable, Iterable
+from itertools import chain
+from typing import Any, NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# MinHash permutations are multiply-shift hashes: the top 32 bits of (a * x + b) mod 2**64
+_SHIFT = np.uint64(32)
+# Odd constant combining the token ids of a shingle into one id
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+class DedupResult(NamedTuple):
+    """Rows kept by `Deduplicator.deduplicate` and what was removed."""
+
+    keep: list[int]
+    n_input: int
+    n_exact: int
+    n_near: int
+
+    @property
+    def n_kept(self) -> int:
+        """Number of rows kept."""
+        return len(self.keep)
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of rows removed."""
+        return 1.0 - self.n_kept / self.n_input if self.n_input else 0.0
+
+    def summary(self) -> str:
+        """One-line report of the dedup ratio."""
+        return (
+            f"Dedup: kept {self.n_kept} of {self.n_input} rows ({self.ratio:.1%} removed: "
+            f"{self.n_exact} exact, {self.n_near} near duplicates)"
+        )
+
+
+def vectorizer_tokenizer(vectorizer: Any | None = None) -> Callable[[str], list[str]]:
+    """
+    Build a tokenizer with a vectorizer's preprocessing, token pattern and stop words.
+
+    Args:
+        vectorizer: sklearn TfidfVectorizer/CountVectorizer; defaults to the settings
+            SentimentModel uses
+
+    Returns:
+        Function from text to its unigram tokens
+    """
+    from sklearn.base import clone
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if vectorizer is None:
+        vectorizer = TfidfVectorizer(stop_words="english")
+    analyzer: Callable[[str], list[str]] = (
+        clone(vectorizer).set_params(ngram_range=(1, 1)).build_analyzer()
+    )
+    return analyzer
+
+
+def lsh_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    Choose how to split signatures into LSH bands.
+
+    Picks the split whose S-curve midpoint ``(1 / bands) ** (1 / rows)`` is the highest one
+    not above the threshold. Pairs at the threshold then almost always share a band, and
+    the extra candidates are filtered by comparing signatures.
+
+    Args:
+        threshold: Jaccard similarity at which texts count as duplicates
+        num_perm: Signature length
+
+    Returns:
+        Tuple of (bands, rows per band)
+    """
+    splits = [(bands, num_perm // bands) for bands in range(1, num_perm + 1)]
+    splits = [(bands, rows) for bands, rows in splits if bands * rows == num_perm]
+    below = [split for split in splits if (1 / split[0]) ** (1 / split[1]) <= threshold]
+    return max(below or splits[-1:], key=lambda split: (1 / split[0]) ** (1 / split[1]))
+
+
+class Deduplicator:
+    """Remove exact and near-duplicate texts with hashing and MinHash LSH."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 2,
+        tokenize: Callable[[str], list[str]] | None = None,
+        seed: int = 1,
+        block_tokens: int = 1 << 10,
+    ) -> None:
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Estimated Jaccard similarity of shingle sets at which a text is a
+                near duplicate (1.0 disables the near-duplicate pass)
+            num_perm: MinHash signature length
+            shingle_size: Tokens per shingle
+            tokenize: Text to tokens; defaults to `vectorizer_tokenizer()`
+            seed: Seed of the MinHash permutations
+            block_tokens: Tokens hashed together, which bounds the hashing memory to about
+                ``block_tokens * num_perm * 8`` bytes
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.tokenize = tokenize or vectorizer_tokenizer()
+        self.block_tokens = block_tokens
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.min_agree = math.ceil(threshold * num_perm)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: list[list[int]]) -> NDArray[np.uint32]:
+        """
+        Compute MinHash signatures of the word shingles of tokenized texts.
+
+        Shingles are never built as strings: each one is identified by mixing the ids of
+        its tokens, which is vectorized over the whole block.
+
+        Args:
+            texts: Token ids per text, each non-empty
+
+        Returns:
+            Signatures of shape (n_texts, num_perm)
+        """
+        size = self.shingle_size
+        lengths = np.array([len(tokens) for tokens in texts], dtype=np.int64)
+        tokens = np.fromiter(chain.from_iterable(texts), dtype=np.uint64, count=lengths.sum())
+        text_lengths = np.repeat(lengths, lengths)
+        text_ends = np.repeat(np.cumsum(lengths), lengths)
+        positions = np.arange(len(tokens))
+
+        # uint64 arithmetic wraps around, which is the mod 2**64 of the hash family
+        shingles = tokens.copy()
+        for offset in range(1, size):
+            inside = positions + offset < text_ends
+            shingles[inside] = shingles[inside] * _MIX + tokens[positions[inside] + offset]
+        # A shingle starts wherever `size` tokens of the text remain; a text shorter than
+        # one shingle is a single shingle starting at its first token
+        first = positions == text_ends - text_lengths
+        valid = (positions + size <= text_ends) | (first & (text_lengths < size))
+
+        hashes = np.multiply.outer(shingles[valid], self._a)
+        hashes += self._b
+        hashes >>= _SHIFT
+        counts = np.maximum(lengths - size + 1, 1)
+        starts = np.zeros(len(texts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        return np.minimum.reduceat(hashes, starts, axis=0).astype(np.uint32)
+
+    def deduplicate(self, texts: Iterable[str]) -> DedupResult:
+        """
+        Find the texts to keep.
+
+        Args:
+            texts: Texts in priority order; the first of each duplicate group is kept
+
+        Returns:
+            DedupResult with the kept indices in input order
+        """
+        seen: set[bytes] = set()
+        token_ids: dict[str, int] = {}
+        buckets: list[dict[bytes, list[int]]] = [{} for _ in range(self.bands)]
+        kept_signatures: dict[int, NDArray[np.uint32]] = {}
+        keep: list[int] = []
+        n_input = n_exact = n_near = 0
+
+        block: list[tuple[int, list[int]]] = []
+        block_size = 0
+        for i, text in enumerate(texts):
+            n_input += 1
+            tokens = self.tokenize(text)
+            digest = hashlib.blake2b("\x1f".join(tokens).encode(), digest_size=16).digest()
+            if digest in seen:
+                n_exact += 1
+                continue
+            seen.add(digest)
+
+            if self.threshold >= 1.0 or not tokens:
+                keep.append(i)
+                continue
+            block.append((i, [token_ids.setdefault(token, len(token_ids)) for token in tokens]))
+            block_size += len(tokens)
+            if block_size >= self.block_tokens:
+                n_near += self._filter_near(block, buckets, kept_signatures, keep)
+                block, block_size = [], 0
+        if block:
+            n_near += self._filter_near(block, buckets, kept_signatures, keep)
+
+        keep.sort()
+        return DedupResult(keep=keep, n_input=n_input, n_exact=n_exact, n_near=n_near)
+
+    def _filter_near(
+        self,
+        block: list[tuple[int, list[int]]],
+        buckets: list[dict[bytes, list[int]]],
+        kept_signatures: dict[int, NDArray[np.uint32]],
+        keep: list[int],
+    ) -> int:
+        """
+        Keep the texts of a block that have no near duplicate among the kept texts.
+
+        Args:
+            block: (index, token ids) of texts that passed the exact pass
+            buckets: Kept indices per band value, one dict per band (updated)
+            kept_signatures: Signature of every kept text (updated)
+            keep: Kept indices (appended to)
+
+        Returns:
+            Number of near duplicates dropped
+        """
+        signatures = self.signatures([tokens for _, tokens in block])
+        rows = self.rows
+        band_slices = [slice(band * rows, (band + 1) * rows) for band in range(self.bands)]
+        n_near = 0
+        for (i, _), signature in zip(block, signatures, strict=True):
+            keys = [signature[band_slice].tobytes() for band_slice in band_slices]
+            if self._has_near_duplicate(signature, keys, buckets, kept_signatures):
+                n_near += 1
+                continue
+            keep.append(i)
+            kept_signatures[i] = signature
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(i)
+        return n_near
+
+    def _has_near_duplicate(
+        self,
+        signature: NDArray[np.uint32],
+        keys: list[bytes],
+        buckets: list[dict[bytes, list[int]]],
+        kept_signatures: dict[int, NDArray[np.uint32]],
+    ) -> bool:
+        """Check the kept texts sharing a band with `signature` for a close enough match."""
+        checked: set[int] = set()
+        for band, key in enumerate(keys):
+            for j in buckets[band].get(key, ()):
+                if j in checked:
+                    continue
+                checked.add(j)
+                if np.count_nonzero(kept_signatures[j] == signature) >= self.min_agree:
+                    return True
+        return False
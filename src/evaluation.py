@@ -0,0 +1,336 @@
+"""
+Streaming evaluation of a model over arbitrarily large labeled datasets.
+
+Rows are scored in chunks and each chunk is folded into a StreamingMetrics, which
+reports the same accuracy, per-class precision/recall/F1 and calibration as sklearn's
+metrics on the full arrays. That object holds only fixed-size counters:
+
+- a classes x classes confusion matrix
+- summed log loss and Brier score
+- per-bin calibration counts over the predicted class's confidence
+
+Memory stays the same however many rows are evaluated. Chunks can be scored in worker
+processes: each worker loads the model once and returns a partial StreamingMetrics for
+its chunk rather than the probabilities. The caller merges these and only keeps a
+bounded number of chunks in flight, so a CSV far larger than memory can be evaluated
+on all cores (scripts/evaluate_model.py). ``SentimentModel.evaluate`` scores its test
+split through the same code, inline.
+"""
+
+import multiprocessing
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Model loaded by each worker of the evaluation pool
+_worker_model: Any = None
+
+# Probabilities are clipped away from 0 before taking the log, as sklearn's log_loss does
+_EPS = 1e-15
+
+
+class StreamingMetrics:
+    """Classification metrics accumulated chunk by chunk in constant memory."""
+
+    def __init__(self, classes: Sequence[Any], n_bins: int = 10) -> None:
+        """
+        Initialize empty counters.
+
+        Args:
+            classes: Class labels, in the model's probability column order
+            n_bins: Equal-width confidence bins for calibration
+        """
+        self.classes = np.asarray(classes)
+        self.n_bins = n_bins
+        self._index = {str(label): i for i, label in enumerate(self.classes.tolist())}
+        n_classes = len(self.classes)
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.bin_rows = np.zeros(n_bins, dtype=np.int64)
+        self.bin_confidence = np.zeros(n_bins)
+        self.bin_correct = np.zeros(n_bins)
+        self.score_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    @property
+    def rows(self) -> int:
+        """Rows evaluated so far."""
+        return int(self.confusion.sum())
+
+    def update(
+        self, y_true: Sequence[Any], proba: NDArray[np.floating], seconds: float = 0.0
+    ) -> None:
+        """
+        Fold one scored chunk into the counters.
+
+        Args:
+            y_true: True labels of the chunk
+            proba: Predicted probabilities, shape (n_rows, n_classes) in `classes` order
+            seconds: Time spent scoring the chunk
+
+        Raises:
+            ValueError: If a label is not one of the model's classes
+        """
+        try:
+            true = np.fromiter((self._index[str(label)] for label in y_true), dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Label {e.args[0]!r} is not one of {self.classes.tolist()}") from e
+        proba = np.asarray(proba, dtype=np.float64)
+        n_classes = len(self.classes)
+        rows = np.arange(len(true))
+        pred = proba.argmax(axis=1)
+
+        self.confusion += np.bincount(true * n_classes + pred, minlength=n_classes**2).reshape(
+            n_classes, n_classes
+        )
+        self.log_loss_sum -= float(np.log(np.clip(proba[rows, true], _EPS, 1.0)).sum())
+        squared = np.square(proba).sum(axis=1) - 2 * proba[rows, true] + 1
+        self.brier_sum += float(squared.sum())
+
+        confidence = proba[rows, pred]
+        bins = np.minimum((confidence * self.n_bins).astype(np.int64), self.n_bins - 1)
+        self.bin_rows += np.bincount(bins, minlength=self.n_bins)
+        self.bin_confidence += np.bincount(bins, weights=confidence, minlength=self.n_bins)
+        self.bin_correct += np.bincount(bins, weights=pred == true, minlength=self.n_bins)
+        self.score_seconds += seconds
+
+    def merge(self, other: "StreamingMetrics") -> None:
+        """
+        Add another chunk's or worker's counters to these.
+
+        Args:
+            other: Metrics over the same classes and bins
+        """
+        self.confusion += other.confusion
+        self.log_loss_sum += other.log_loss_sum
+        self.brier_sum += other.brier_sum
+        self.bin_rows += other.bin_rows
+        self.bin_confidence += other.bin_confidence
+        self.bin_correct += other.bin_correct
+        self.score_seconds += other.score_seconds
+
+    def report(self) -> dict[str, Any]:
+        """
+        Compute the metrics from the counters.
+
+        Returns:
+            JSON-serializable dict with accuracy, log_loss, brier, ece (expected
+            calibration error), per-class precision/recall/f1/support, macro and weighted
+            averages, the confusion matrix (rows are true classes), calibration bins and
+            throughput
+        """
+        rows = max(self.rows, 1)
+        true_counts = self.confusion.sum(axis=1)
+        pred_counts = self.confusion.sum(axis=0)
+        hits = np.diag(self.confusion)
+        precision = _ratio(hits, pred_counts)
+        recall = _ratio(hits, true_counts)
+        f1 = _ratio(2 * precision * recall, precision + recall)
+        per_class = {
+            str(label): {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1": float(f1[i]),
+                "support": int(true_counts[i]),
+            }
+            for i, label in enumerate(self.classes.tolist())
+        }
+        weights = true_counts / rows
+
+        bins = []
+        for i in np.flatnonzero(self.bin_rows):
+            bins.append(
+                {
+                    "low": i / self.n_bins,
+                    "high": (i + 1) / self.n_bins,
+                    "rows": int(self.bin_rows[i]),
+                    "confidence": float(self.bin_confidence[i] / self.bin_rows[i]),
+                    "accuracy": float(self.bin_correct[i] / self.bin_rows[i]),
+                }
+            )
+        ece = float(np.abs(self.bin_correct - self.bin_confidence).sum() / rows)
+
+        return {
+            "rows": self.rows,
+            "accuracy": float(hits.sum() / rows),
+            "log_loss": self.log_loss_sum / rows,
+            "brier": self.brier_sum / rows,
+            "ece": ece,
+            "classes": per_class,
+            "macro_avg": {
+                "precision": float(precision.mean()),
+                "recall": float(recall.mean()),
+                "f1": float(f1.mean()),
+            },
+            "weighted_avg": {
+                "precision": float(precision @ weights),
+                "recall": float(recall @ weights),
+                "f1": float(f1 @ weights),
+            },
+            "confusion_matrix": self.confusion.tolist(),
+            "calibration": bins,
+            "throughput": {
+                "wall_seconds": self.wall_seconds,
+                "score_seconds": self.score_seconds,
+                "rows_per_second": self.rows / self.wall_seconds if self.wall_seconds else None,
+            },
+        }
+
+    def format(self) -> str:
+        """
+        Render the report as text, laid out like sklearn's classification_report.
+
+        Returns:
+            Multi-line report
+        """
+        report = self.report()
+        width = max(len("weighted avg"), *(len(label) for label in report["classes"]))
+        lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"]
+        for label, stats in report["classes"].items():
+            lines.append(
+                f"{label:>{width}} {stats['precision']:>9.4f} {stats['recall']:>9.4f} "
+                f"{stats['f1']:>9.4f} {stats['support']:>9}"
+            )
+        lines.append("")
+        lines.append(
+            f"{'accuracy':>{width}} {'':>9} {'':>9} {report['accuracy']:>9.4f} "
+            f"{report['rows']:>9}"
+        )
+        for name in ("macro_avg", "weighted_avg"):
+            stats = report[name]
+            lines.append(
+                f"{name.replace('_', ' '):>{width}} {stats['precision']:>9.4f} "
+                f"{stats['recall']:>9.4f} {stats['f1']:>9.4f} {report['rows']:>9}"
+            )
+        lines.append("")
+        lines.append(
+            f"Log loss: {report['log_loss']:.4f}  Brier: {report['brier']:.4f}  "
+            f"ECE: {report['ece']:.4f}"
+        )
+        lines.append("\nConfusion Matrix (rows: true, columns: predicted):")
+        lines.append(str(self.confusion))
+        throughput = report["throughput"]
+        if throughput["rows_per_second"] is not None:
+            lines.append(
+                f"\nScored {report['rows']} rows in {throughput['wall_seconds']:.2f}s "
+                f"({throughput['rows_per_second']:,.0f} rows/s, "
+                f"{throughput['score_seconds']:.2f}s scoring)"
+            )
+        return "\n".join(lines)
+
+
+def read_chunks(
+    path: str, chunk_rows: int = 65536, text_column: str = "text", label_column: str = "sentiment"
+) -> Iterator[tuple[list[str], list[str]]]:
+    """
+    Read a labeled CSV a chunk at a time.
+
+    Args:
+        path: CSV with text and label columns
+        chunk_rows: Rows per chunk
+        text_column: Column holding the texts
+        label_column: Column holding the true labels
+
+    Returns:
+        Iterator over (texts, labels) chunks
+    """
+    import pandas as pd
+
+    for chunk in pd.read_csv(
+        path, usecols=[text_column, label_column], chunksize=chunk_rows, dtype=str
+    ):
+        chunk = chunk.fillna("")
+        yield chunk[text_column].tolist(), chunk[label_column].tolist()
+
+
+def _init_worker(load_model: Callable[[], Any]) -> None:
+    """Load the model once per worker process."""
+    global _worker_model
+    _worker_model = load_model()
+
+
+def _score_chunk(
+    classes: NDArray, n_bins: int, chunk: tuple[Sequence[str], Sequence[str]]
+) -> StreamingMetrics:
+    """Score one chunk with the worker's model and return its metrics."""
+    metrics = StreamingMetrics(classes, n_bins)
+    texts, labels = chunk
+    start = time.perf_counter()
+    proba = _worker_model.predict_proba(texts)
+    metrics.update(labels, proba, time.perf_counter() - start)
+    return metrics
+
+
+def evaluate_stream(
+    chunks: Iterable[tuple[Sequence[str], Sequence[str]]],
+    model: Any,
+    load_model: Callable[[], Any] | None = None,
+    workers: int = 1,
+    max_pending: int | None = None,
+    n_bins: int = 10,
+) -> StreamingMetrics:
+    """
+    Score labeled chunks and accumulate their metrics.
+
+    Args:
+        chunks: (texts, labels) chunks, e.g. from `read_chunks`
+        model: Loaded model with predict_proba() over raw texts and classes_
+        load_model: Picklable zero-argument callable that loads the model again; each
+            worker process calls it once. Required when workers > 1
+        workers: Worker processes; 1 scores inline with `model`
+        max_pending: Chunks read ahead of the slowest worker (default 2 per worker)
+        n_bins: Calibration bins
+
+    Returns:
+        Metrics over all chunks, with wall-clock time for throughput
+
+    Raises:
+        ValueError: If workers > 1 without load_model
+    """
+    classes = np.asarray(model.classes_)
+    metrics = StreamingMetrics(classes, n_bins)
+    start = time.perf_counter()
+
+    if workers <= 1:
+        for texts, labels in chunks:
+            chunk_start = time.perf_counter()
+            proba = model.predict_proba(texts)
+            metrics.update(labels, proba, time.perf_counter() - chunk_start)
+    else:
+        if load_model is None:
+            raise ValueError("Parallel evaluation requires load_model")
+        max_pending = max_pending or 2 * workers
+        score = partial(_score_chunk, classes, n_bins)
+        pending: set[Future[StreamingMetrics]] = set()
+        # forkserver children start clean instead of forking the caller's threads
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(load_model,),
+        ) as executor:
+            for chunk in chunks:
+                # Stop reading ahead until a worker finishes, so memory stays bounded
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        metrics.merge(future.result())
+                pending.add(executor.submit(score, chunk))
+            for future in pending:
+                metrics.merge(future.result())
+
+    metrics.wall_seconds = time.perf_counter() - start
+    return metrics
+
+
+def _ratio(numerator: NDArray, denominator: NDArray) -> NDArray[np.floating]:
+    """Divide elementwise, with 0 where the denominator is 0 (sklearn's zero_division)."""
+    out = np.zeros(len(numerator))
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
@@ -11,6 +11,8 @@ from pathlib import Path
 import pandas as pd
 from dotenv import load_dotenv
 
+from stage_cache import StageCache, code_digest
+
 # Load environment variables
 load_dotenv()
 
@@ -18,15 +20,20 @@ load_dotenv()
 class SentimentDataGenerator:
     """Generate labeled sentiment data for training."""
 
-    def __init__(self, num_samples: int = 1000, seed: int = 42) -> None:
+    def __init__(
+        self, num_samples: int = 1000, seed: int = 42, dedup_threshold: float | None = None
+    ) -> None:
         """
         Initialize the data generator.
 
         Args:
             num_samples: Number of samples to generate
             seed: Random seed for reproducibility
+            dedup_threshold: If set, drop exact and near-duplicate samples at this Jaccard
+                similarity (see dedup.py), so fewer than num_samples may be returned
         """
         self.num_samples = num_samples
+        self.dedup_threshold = dedup_threshold
         random.seed(seed)
 
         # Sample positive and negative phrases
@@ -151,16 +158,27 @@ class SentimentDataGenerator:
         # Shuffle samples
         random.shuffle(samples)
 
+        if self.dedup_threshold is not None:
+            from dedup import Deduplicator
+
+            result = Deduplicator(threshold=self.dedup_threshold).deduplicate(
+                text for text, _ in samples
+            )
+            print(result.summary())
+            samples = [samples[i] for i in result.keep]
+
         return samples
 
-    def save_to_csv(self, output_path: str) -> None:
+    def save_to_csv(self, output_path: str, samples: list[tuple[str, str]] | None = None) -> None:
         """
         Generate and save samples to CSV file.
 
         Args:
             output_path: Path to save the CSV file
+            samples: Samples to save instead of generating new ones
         """
-        samples = self.generate_samples()
+        if samples is None:
+            samples = self.generate_samples()
         df = pd.DataFrame(samples, columns=["text", "sentiment"])
 
         # Create directory if it doesn't exist
@@ -173,14 +191,16 @@ class SentimentDataGenerator:
         print(f"Neutral samples: {len(df[df['sentiment'] == 'neutral'])}")
         print(f"Negative samples: {len(df[df['sentiment'] == 'negative'])}")
 
-    def save_to_json(self, output_path: str) -> None:
+    def save_to_json(self, output_path: str, samples: list[tuple[str, str]] | None = None) -> None:
         """
         Generate and save samples to JSON file.
 
         Args:
             output_path: Path to save the JSON file
+            samples: Samples to save instead of generating new ones
         """
-        samples = self.generate_samples()
+        if samples is None:
+            samples = self.generate_samples()
         data = [{"text": text, "sentiment": label} for text, label in samples]
 
         # Create directory if it doesn't exist
@@ -197,18 +217,36 @@ def main() -> None:
     """Main function to generate training data."""
     # Get configuration from environment
     raw_data_path = os.getenv("RAW_DATA_PATH", "data/raw")
-    num_samples = 1000
+    num_samples = int(os.getenv("NUM_SAMPLES", "1000"))
     seed = int(os.getenv("RANDOM_SEED", "42"))
+    dedup = os.getenv("DEDUP_GENERATED_DATA", "false").lower() == "true"
+    dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.8")) if dedup else None
 
     # Initialize generator
-    generator = SentimentDataGenerator(num_samples=num_samples, seed=seed)
-
-    # Generate and save data
+    generator = SentimentDataGenerator(
+        num_samples=num_samples, seed=seed, dedup_threshold=dedup_threshold
+    )
+
+    # Generate once, so the CSV and JSON hold the same samples, reusing a cached run
+    cache = StageCache.from_env()
+    src = Path(__file__).parent
+    key = cache.key(
+        "generate",
+        {
+            "num_samples": num_samples,
+            "seed": seed,
+            "dedup_threshold": dedup_threshold,
+            "code": code_digest([str(src / "generate_data.py"), str(src / "dedup.py")]),
+        },
+    )
+    samples = cache.get_or_compute("generate", key, generator.generate_samples)
+
+    # Save data
     csv_path = f"{raw_data_path}/sentiment_data.csv"
     json_path = f"{raw_data_path}/sentiment_data.json"
 
-    generator.save_to_csv(csv_path)
-    generator.save_to_json(json_path)
+    generator.save_to_csv(csv_path, samples)
+    generator.save_to_json(json_path, samples)
 
 
 if __name__ == "__main__":
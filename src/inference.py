@@ -1,60 +1,406 @@
 """
 Local inference script for testing without Seldon.
 Provides a simple CLI for testing the model.
+
+Loading the model dominates a single prediction, so the script can also run as a warm
+daemon that keeps the model in memory and answers over a Unix domain socket:
+
+    python src/inference.py --serve &      # start the daemon
+    python src/inference.py "Great laptop!" # reuses it automatically
+    python src/inference.py --stop         # shut it down
+
+`predict_texts` (and so `predict_sentiment`) uses the daemon when one is serving the
+requested model, and loads the model in-process otherwise.
+
+Line protocol, one request and one response per line (texts are JSON-encoded, so newlines
+inside them are escaped):
+
+    PING                  -> PONG {"model_path": ..., "classes": [...]}
+    PREDICT ["text", ...] -> OK {"labels": [...], "probabilities": [[...], ...]}
+    SHUTDOWN              -> BYE
+    (on failure)          -> ERR <message>
 """
 
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
 import sys
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
-
-import joblib
+from typing import Any
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+DEFAULT_MODEL_PATH = "models/sentiment_model.pkl"
+
+
+def default_socket_path() -> str:
+    """
+    Socket the daemon listens on: INFERENCE_SOCKET, else a per-user path in
+    XDG_RUNTIME_DIR or the temp directory.
+
+    Returns:
+        Filesystem path of the Unix socket
+    """
+    configured = os.getenv("INFERENCE_SOCKET")
+    if configured:
+        return configured
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"sentiment-inference-{os.getuid()}.sock")
+
+
+def load_model(model_path: str) -> Any:
+    """
+    Load a model file (``.pkl``, ``.npz`` or ``.onnx``) the way the model server does.
+
+    Args:
+        model_path: Path to the model file
+
+    Returns:
+        Object with predict() and predict_proba() over raw texts
+    """
+    from serving_pipeline import load_model as load_serving_model
+
+    return load_serving_model(model_path)
+
+
+@lru_cache(maxsize=4)
+def _load_cached(model_path: str, mtime: float) -> Any:
+    """Load a model once per path and modification time."""
+    return load_model(model_path)
+
+
+def predict_local(texts: list[str], model_path: str) -> dict[str, Any]:
+    """
+    Predict in this process, loading the model on first use.
+
+    Args:
+        texts: Texts to classify
+        model_path: Path to the model file
+
+    Returns:
+        Dictionary with classes, labels and probabilities
+    """
+    model = _load_cached(model_path, os.path.getmtime(model_path))
+    return _predict(model, texts)
+
+
+def _predict(model: Any, texts: list[str]) -> dict[str, Any]:
+    """Run a model and convert its outputs to JSON-serializable lists."""
+    probabilities = model.predict_proba(texts)
+    classes = [str(label) for label in model.classes_]
+    return {
+        "classes": classes,
+        "labels": [classes[i] for i in probabilities.argmax(axis=1)] if len(texts) else [],
+        "probabilities": probabilities.tolist(),
+    }
+
+
+class InferenceDaemon(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server that keeps a model loaded between requests."""
+
+    daemon_threads = True
+
+    def __init__(self, model_path: str, socket_path: str) -> None:
+        """
+        Load the model and bind the socket.
+
+        Args:
+            model_path: Path to the model file
+            socket_path: Unix socket to listen on
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket
+        """
+        self.model_path = str(Path(model_path).resolve())
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        self._mtime = os.path.getmtime(self.model_path)
+        self.model = load_model(self.model_path)
+
+        if os.path.exists(socket_path):
+            with InferenceClient(socket_path) as client:
+                running = client.ping() is not None
+            if running:
+                raise RuntimeError(f"An inference daemon is already running on {socket_path}")
+            os.unlink(socket_path)  # left behind by a daemon that did not exit cleanly
+        old_umask = os.umask(0o177)  # socket readable and writable by this user only
+        try:
+            super().__init__(socket_path, _DaemonHandler)
+        finally:
+            os.umask(old_umask)
+
+    def current_model(self) -> Any:
+        """
+        Return the model, reloading it first if the file changed since it was loaded.
+
+        Returns:
+            Loaded model
+        """
+        mtime = os.path.getmtime(self.model_path)
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self.model = load_model(self.model_path)
+                    self._mtime = mtime
+        return self.model
+
+    def server_close(self) -> None:
+        """Close the socket and remove its file."""
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """Answer line-protocol requests on one client connection."""
 
-def predict_sentiment(text: str, model_path: str = "models/sentiment_model.pkl") -> None:
+    server: InferenceDaemon
+
+    def handle(self) -> None:
+        """Serve requests until the client disconnects."""
+        for raw in self.rfile:
+            command, _, argument = raw.decode("utf-8").rstrip("\n").partition(" ")
+            try:
+                if command == "PREDICT":
+                    texts = json.loads(argument)
+                    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                        raise ValueError("PREDICT expects a JSON array of strings")
+                    result = _predict(self.server.current_model(), texts)
+                    response = "OK " + json.dumps(result, separators=(",", ":"))
+                elif command == "PING":
+                    info = {
+                        "model_path": self.server.model_path,
+                        "classes": [str(label) for label in self.server.model.classes_],
+                    }
+                    response = "PONG " + json.dumps(info, separators=(",", ":"))
+                elif command == "SHUTDOWN":
+                    self.wfile.write(b"BYE\n")
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+                else:
+                    response = f"ERR unknown command {command!r}"
+            except Exception as e:
+                response = f"ERR {e}".replace("\n", " ")
+            self.wfile.write(response.encode("utf-8") + b"\n")
+
+
+class InferenceClient:
+    """Thin client for a running InferenceDaemon."""
+
+    def __init__(self, socket_path: str | None = None, timeout: float = 30.0) -> None:
+        """
+        Initialize the client; the connection is opened on first use.
+
+        Args:
+            socket_path: Daemon socket (defaults to `default_socket_path()`)
+            timeout: Seconds to wait for a response
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._socket: socket.socket | None = None
+        self._file: Any = None
+
+    def __enter__(self) -> "InferenceClient":
+        """Use the client as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the connection."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection if one is open."""
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def ping(self) -> dict[str, Any] | None:
+        """
+        Check for a daemon.
+
+        Returns:
+            The daemon's model path and classes, or None if no daemon answers
+        """
+        try:
+            reply = self._request("PING")
+        except OSError:
+            return None
+        info: dict[str, Any] = json.loads(reply.removeprefix("PONG "))
+        return info
+
+    def predict(self, texts: list[str]) -> dict[str, Any]:
+        """
+        Classify texts on the daemon.
+
+        Args:
+            texts: Texts to classify
+
+        Returns:
+            Dictionary with classes, labels and probabilities
+
+        Raises:
+            RuntimeError: If the daemon reports an error
+        """
+        reply = self._request("PREDICT " + json.dumps(texts))
+        if not reply.startswith("OK "):
+            raise RuntimeError(f"Inference daemon error: {reply.removeprefix('ERR ')}")
+        result: dict[str, Any] = json.loads(reply[3:])
+        return result
+
+    def shutdown(self) -> bool:
+        """
+        Ask the daemon to exit.
+
+        Returns:
+            True if a daemon acknowledged the request
+        """
+        try:
+            return self._request("SHUTDOWN") == "BYE"
+        except OSError:
+            return False
+        finally:
+            self.close()
+
+    def _request(self, line: str) -> str:
+        """Send one request line and read the response line."""
+        if self._socket is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._socket, self._file = sock, sock.makefile("rwb")
+        self._file.write(line.encode("utf-8") + b"\n")
+        self._file.flush()
+        reply = self._file.readline()
+        if not reply:
+            self.close()
+            raise ConnectionError("Inference daemon closed the connection")
+        return str(reply.decode("utf-8").rstrip("\n"))
+
+
+def predict_texts(
+    texts: list[str], model_path: str = DEFAULT_MODEL_PATH, socket_path: str | None = None
+) -> dict[str, Any]:
+    """
+    Classify texts on the warm daemon if it serves this model, else in-process.
+
+    A daemon that stops answering, or closes the connection, mid-request is treated as
+    absent, so the texts are classified in-process instead.
+
+    Args:
+        texts: Texts to classify
+        model_path: Path to the trained model
+        socket_path: Daemon socket (defaults to `default_socket_path()`)
+
+    Returns:
+        Dictionary with classes, labels and probabilities
+    """
+    with InferenceClient(socket_path) as client:
+        info = client.ping()
+        if info is not None and info["model_path"] == str(Path(model_path).resolve()):
+            try:
+                return client.predict(texts)
+            except OSError:
+                pass
+    return predict_local(texts, model_path)
+
+
+def predict_sentiment(
+    text: str, model_path: str = DEFAULT_MODEL_PATH, socket_path: str | None = None
+) -> None:
     """
     Predict sentiment for a given text.
 
     Args:
         text: Text to analyze
         model_path: Path to the trained model
+        socket_path: Daemon socket (defaults to `default_socket_path()`)
     """
-    # Load model
+    # Predict on the daemon, or load the model here
     try:
-        model = joblib.load(model_path)
+        result = predict_texts([text], model_path, socket_path)
     except FileNotFoundError:
         print(f"❌ Model not found at {model_path}")
         print("Please train the model first: python src/train_model.py")
         return
 
-    # Make prediction
-    prediction = model.predict([text])[0]
-    probabilities = model.predict_proba([text])[0]
+    prediction = result["labels"][0]
+    probabilities = result["probabilities"][0]
     confidence = max(probabilities) * 100
 
     # Display results
-    emoji = "😊" if prediction == "positive" else "😞"
+    emoji = {"positive": "😊", "negative": "😞"}.get(prediction, "😐")
 
     print("\n" + "=" * 80)
     print(f"Text: {text}")
     print(f"\n{emoji} Sentiment: {prediction.upper()}")
     print(f"Confidence: {confidence:.1f}%")
     print("\nProbabilities:")
-    print(f"  Negative: {probabilities[0]:.1%}")
-    print(f"  Positive: {probabilities[1]:.1%}")
+    for label, probability in zip(result["classes"], probabilities, strict=True):
+        print(f"  {label.capitalize()}: {probability:.1%}")
     print("=" * 80 + "\n")
 
 
+def serve(model_path: str, socket_path: str) -> None:
+    """
+    Run the daemon until SHUTDOWN, SIGTERM or Ctrl+C.
+
+    Args:
+        model_path: Path to the trained model
+        socket_path: Unix socket to listen on
+    """
+    try:
+        daemon = InferenceDaemon(model_path, socket_path)
+    except (FileNotFoundError, RuntimeError) as e:
+        sys.exit(f"❌ {e}")
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=daemon.shutdown).start())
+    print(f"🔥 Serving {daemon.model_path} on {socket_path} (Ctrl+C to stop)")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+    print("Inference daemon stopped")
+
+
 def main() -> None:
     """Main function for CLI."""
+    parser = argparse.ArgumentParser(description="Sentiment Analyzer - Local Inference")
+    parser.add_argument("text", nargs="*", help="Text to analyze (interactive if omitted)")
+    parser.add_argument("--model-path", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--socket", default=None, help="Daemon socket path")
+    parser.add_argument("--serve", action="store_true", help="Run the warm inference daemon")
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path()
+
+    if args.serve:
+        serve(args.model_path, socket_path)
+        return
+    if args.stop:
+        stopped = InferenceClient(socket_path).shutdown()
+        print("Inference daemon stopped" if stopped else "No inference daemon running")
+        return
+
     print("🎭 Sentiment Analyzer - Local Inference")
     print("=" * 80)
 
-    if len(sys.argv) > 1:
+    if args.text:
         # Use text from command line argument
-        text = " ".join(sys.argv[1:])
-        predict_sentiment(text)
+        predict_sentiment(" ".join(args.text), args.model_path, socket_path)
     else:
         # Interactive mode
         print("\nEnter text to analyze (or 'quit' to exit):")
@@ -67,7 +413,7 @@ def main() -> None:
                 break
 
             if text:
-                predict_sentiment(text)
+                predict_sentiment(text, args.model_path, socket_path)
             else:
                 print("Please enter some text.")
 
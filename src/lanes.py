@@ -0,0 +1,454 @@
+"""
+Length-bucketed scheduling of texts into lanes with per-lane latency SLOs.
+
+Featurizing a text costs more than linearly in its length (more tokens, and more
+distinct n-grams to look up), and a batch only returns once its longest text is done.
+When concurrent requests are scored together, a few long reviews turn every short
+request's latency into theirs.
+
+LaneScheduler splits each request's texts by character length into lanes, e.g.
+``short`` (up to 256 chars), ``medium`` (up to 2048) and ``long`` (the rest). Every
+lane has its own queue and worker thread, so short texts never queue behind long ones.
+Each worker takes whatever is queued in its lane, up to a row cap, as one batch:
+concurrent requests share a batch instead of being scored one by one, and no request
+waits for a batch to fill. The cap is set so a batch is expected to take at most half
+the lane's SLO, based on the lane's measured seconds per row. A request waits for all
+of its lanes and gets its rows back in input order, so a request that mixes lengths
+still waits for its longest text.
+
+A lane part that has already waited past its SLO when it is dequeued is still scored
+and counted as a violation. With ``shed`` set, it fails with LaneTimeoutError instead,
+so an overloaded lane sheds load rather than queueing without bound. Per-lane rows,
+batches, wait and latency percentiles, violations and sheds are reported by ``stats()``.
+The timings of each request are returned to the caller, which reports them as Seldon
+metrics.
+
+The worker threads start with the first request in each process, so server workers
+forked from the process that built the scheduler each run their own. A request that
+gets no answer within ``timeout`` seconds fails with LaneTimeoutError rather than
+hanging its server thread.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a lane's SLO one batch is expected to take; the rest is left for queueing
+BATCH_BUDGET = 0.5
+
+
+class LaneTimeoutError(RuntimeError):
+    """A request's texts waited longer than their lane's SLO and were shed."""
+
+
+class LaneTiming(NamedTuple):
+    """How one request's texts fared in one lane."""
+
+    lane: str
+    rows: int
+    wait_ms: float
+    latency_ms: float
+    violated: bool
+
+
+class LaneStats:
+    """Running counters and recent latencies of one lane."""
+
+    def __init__(self, window: int = 2048) -> None:
+        """
+        Initialize empty counters.
+
+        Args:
+            window: Recent requests kept for the latency percentiles
+        """
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.violations = 0
+        self.shed = 0
+        self.wait_ms: deque[float] = deque(maxlen=window)
+        self.latency_ms: deque[float] = deque(maxlen=window)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Counters and p50/p95/p99 of recent wait and latency, as a JSON-serializable dict."""
+        stats: dict[str, Any] = {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "violations": self.violations,
+            "shed": self.shed,
+        }
+        for name, values in (("wait_ms", self.wait_ms), ("latency_ms", self.latency_ms)):
+            if values:
+                p50, p95, p99 = np.percentile(np.fromiter(values, float), [50, 95, 99])
+                stats[name] = {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)}
+        return stats
+
+
+class Lane:
+    """A length bucket with its own queue, worker thread and SLO."""
+
+    def __init__(self, name: str, max_chars: float, slo_ms: float, max_rows: int = 512) -> None:
+        """
+        Initialize the lane (its thread is started by LaneScheduler).
+
+        Args:
+            name: Lane name, used in stats and metric tags
+            max_chars: Longest text, in characters, this lane takes
+            slo_ms: Latency objective of the lane's requests, queueing included
+            max_rows: Largest batch, whatever the measured cost
+        """
+        self.name = name
+        self.max_chars = max_chars
+        self.slo_ms = slo_ms
+        self.max_rows = max_rows
+        self.row_seconds: float | None = None
+        self.stats = LaneStats()
+        self.queue: queue.Queue[_LaneItem | None] = queue.Queue()
+
+    def row_cap(self) -> int:
+        """Rows one batch may hold to finish within BATCH_BUDGET of the SLO."""
+        if not self.row_seconds:
+            return self.max_rows
+        budget = self.slo_ms / 1000 * BATCH_BUDGET
+        return max(1, min(self.max_rows, int(budget / self.row_seconds)))
+
+    def observe(self, rows: int, seconds: float) -> None:
+        """Update the seconds-per-row estimate with a finished batch."""
+        per_row = seconds / max(rows, 1)
+        self.row_seconds = (
+            per_row if self.row_seconds is None else 0.8 * self.row_seconds + 0.2 * per_row
+        )
+
+
+class _LaneItem(NamedTuple):
+    """One request's texts queued in one lane."""
+
+    texts: list[str]
+    enqueued: float
+    future: Future
+
+
+class LaneScheduler:
+    """Score texts in per-length-bucket lanes, batching concurrent requests per lane."""
+
+    def __init__(
+        self,
+        score: Callable[[list[str]], NDArray],
+        classes: Sequence[Any],
+        lanes: list[Lane],
+        shed: bool = False,
+        timeout: float | None = 30.0,
+    ) -> None:
+        """
+        Initialize the scheduler; its worker threads start with the first request in
+        this process.
+
+        Args:
+            score: Returns probabilities, in `classes` order, for a list of texts
+            classes: Class labels
+            lanes: Lanes in increasing max_chars order; the last one should take any length
+            shed: Fail texts that waited past their lane's SLO instead of scoring them late
+            timeout: Longest a request waits for its lanes, in seconds (None waits forever)
+        """
+        self.score = score
+        self.classes = np.asarray(classes)
+        self.lanes = lanes
+        self.shed = shed
+        self.timeout = timeout
+        self._bounds = np.array([lane.max_chars for lane in lanes[:-1]])
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._pid: int | None = None
+
+    @classmethod
+    def from_env(
+        cls, score: Callable[[list[str]], NDArray], classes: Sequence[Any]
+    ) -> "LaneScheduler | None":
+        """
+        Create a scheduler configured by the LANE_* environment variables.
+
+        LANE_BOUNDS is a comma-separated list of increasing character lengths, one per lane
+        but the last, e.g. "256,2048" for short, medium and long lanes. LANE_SLO_MS gives
+        each lane's SLO (one value per lane). LANE_MAX_ROWS caps batches, LANE_SHED=true
+        sheds late texts and LANE_TIMEOUT_MS bounds how long a request waits.
+
+        Args:
+            score: Returns probabilities for a list of texts
+            classes: Class labels
+
+        Returns:
+            LaneScheduler, or None when LANE_BOUNDS is not set
+
+        Raises:
+            ValueError: If the bounds are not increasing or the SLOs do not match them
+        """
+        bounds = [
+            float(bound) for bound in os.getenv("LANE_BOUNDS", "").split(",") if bound.strip()
+        ]
+        if not bounds:
+            return None
+        slos = [float(slo) for slo in os.getenv("LANE_SLO_MS", "").split(",") if slo.strip()]
+        lanes = make_lanes(bounds, slos, max_rows=int(os.getenv("LANE_MAX_ROWS", "512")))
+        logger.info(
+            "Lane scheduling: "
+            + ", ".join(
+                f"{lane.name} <= {lane.max_chars:g} chars ({lane.slo_ms:g} ms)" for lane in lanes
+            )
+        )
+        return cls(
+            score,
+            classes,
+            lanes,
+            shed=os.getenv("LANE_SHED", "false").lower() == "true",
+            timeout=float(os.getenv("LANE_TIMEOUT_MS", "30000")) / 1000,
+        )
+
+    def run(self, method: str, texts: Sequence[str]) -> tuple[NDArray, list[LaneTiming]]:
+        """
+        Score texts through their lanes and wait for all of them.
+
+        Args:
+            method: "predict" for labels or "predict_proba" for probabilities
+            texts: Decoded input texts
+
+        Returns:
+            Tuple of (output for all rows in input order, timing per lane used)
+
+        Raises:
+            LaneTimeoutError: If shedding is on and a lane was past its SLO, or the lanes
+                did not answer within the timeout
+        """
+        self._ensure_started()
+        texts = list(texts)
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        lane_of = np.searchsorted(self._bounds, lengths, side="left")
+
+        parts = []
+        for i, lane in enumerate(self.lanes):
+            rows = np.flatnonzero(lane_of == i)
+            if len(rows):
+                future: Future = Future()
+                lane.queue.put(_LaneItem([texts[row] for row in rows], time.perf_counter(), future))
+                parts.append((rows, future))
+
+        proba = np.zeros((len(texts), len(self.classes)))
+        timings = []
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        for rows, future in parts:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                part, timing = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # Parts not yet picked up are dropped by their lane instead of scored
+                for _, pending in parts:
+                    pending.cancel()
+                raise LaneTimeoutError(
+                    f"Lanes did not answer within {self.timeout:g}s ({len(texts)} texts)"
+                ) from None
+            proba[rows] = part
+            timings.append(timing)
+        if method == "predict":
+            return self.classes[proba.argmax(axis=1)], timings
+        return proba, timings
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Counters and recent latency percentiles of every lane.
+
+        Returns:
+            {"lanes": {name: {"max_chars", "slo_ms", "row_cap", "requests", "rows", ...}}}
+        """
+        with self._lock:
+            return {
+                "lanes": {
+                    lane.name: {
+                        "max_chars": lane.max_chars if np.isfinite(lane.max_chars) else None,
+                        "slo_ms": lane.slo_ms,
+                        "row_cap": lane.row_cap(),
+                        **lane.stats.to_dict(),
+                    }
+                    for lane in self.lanes
+                }
+            }
+
+    def close(self) -> None:
+        """Score what is queued and stop the worker threads."""
+        with self._start_lock:
+            if self._pid != os.getpid():
+                return
+            for lane in self.lanes:
+                lane.queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads, self._pid = [], None
+
+    def _ensure_started(self) -> None:
+        """Start the lane threads on first use in this process, after a fork included."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked after the parent started: its threads did not survive, and its
+                # queues and lock may have been mid-use
+                self._lock = threading.Lock()
+                for lane in self.lanes:
+                    lane.queue = queue.Queue()
+                    lane.stats = LaneStats()
+            self._threads = [
+                threading.Thread(
+                    target=self._work, args=(lane,), name=f"lane-{lane.name}", daemon=True
+                )
+                for lane in self.lanes
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def _work(self, lane: Lane) -> None:
+        """Score batches of a lane's queued texts until close()."""
+        while True:
+            item = lane.queue.get()
+            if item is None:
+                return
+            # Take what is already queued, without waiting for more
+            batch = [item]
+            rows = len(item.texts)
+            cap = lane.row_cap()
+            while rows < cap:
+                try:
+                    item = lane.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    lane.queue.put(None)
+                    break
+                batch.append(item)
+                rows += len(item.texts)
+            self._run_batch(lane, batch)
+
+    def _run_batch(self, lane: Lane, batch: list[_LaneItem]) -> None:
+        """Score one batch and resolve its requests' futures."""
+        # Drop parts whose request timed out; the rest can no longer be cancelled
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        if self.shed:
+            on_time = []
+            for item in batch:
+                if (start - item.enqueued) * 1000 > lane.slo_ms:
+                    item.future.set_exception(
+                        LaneTimeoutError(f"Lane {lane.name} is past its {lane.slo_ms:g} ms SLO")
+                    )
+                    with self._lock:
+                        lane.stats.shed += 1
+                else:
+                    on_time.append(item)
+            if not on_time:
+                return
+            batch = on_time
+
+        texts = [text for item in batch for text in item.texts]
+        try:
+            proba = self.score(texts)
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        end = time.perf_counter()
+        lane.observe(len(texts), end - start)
+
+        offset = 0
+        with self._lock:
+            lane.stats.batches += 1
+            for item in batch:
+                wait_ms = (start - item.enqueued) * 1000
+                latency_ms = (end - item.enqueued) * 1000
+                violated = latency_ms > lane.slo_ms
+                lane.stats.requests += 1
+                lane.stats.rows += len(item.texts)
+                lane.stats.violations += violated
+                lane.stats.wait_ms.append(wait_ms)
+                lane.stats.latency_ms.append(latency_ms)
+                timing = LaneTiming(
+                    lane.name, len(item.texts), round(wait_ms, 3), round(latency_ms, 3), violated
+                )
+                item.future.set_result((proba[offset : offset + len(item.texts)], timing))
+                offset += len(item.texts)
+
+
+def make_lanes(bounds: Sequence[float], slos: Sequence[float], max_rows: int = 512) -> list[Lane]:
+    """
+    Build lanes from length bounds and SLOs.
+
+    Lanes are named short, medium and long when there are three, and lane0, lane1, ...
+    otherwise.
+
+    Args:
+        bounds: Increasing character lengths, one per lane but the last (which takes any
+            length)
+        slos: Latency objective in ms per lane, len(bounds) + 1 values
+        max_rows: Largest batch of any lane
+
+    Returns:
+        Lanes in increasing length order
+
+    Raises:
+        ValueError: If the bounds are not increasing or the SLOs do not match them
+    """
+    if any(b <= a for a, b in zip(bounds, bounds[1:], strict=False)):
+        raise ValueError(f"Lane bounds must be increasing, got {list(bounds)}")
+    if len(slos) != len(bounds) + 1:
+        raise ValueError(f"Expected {len(bounds) + 1} lane SLOs (LANE_SLO_MS), got {len(slos)}")
+    names = (
+        ["short", "medium", "long"] if len(slos) == 3 else [f"lane{i}" for i in range(len(slos))]
+    )
+    limits = [*bounds, float("inf")]
+    return [
+        Lane(name, limit, slo, max_rows)
+        for name, limit, slo in zip(names, limits, slos, strict=True)
+    ]
+
+
+def seldon_metrics(timings: Sequence[LaneTiming]) -> list[dict[str, Any]]:
+    """
+    Convert one request's lane timings to Seldon custom metrics, tagged by lane.
+
+    Args:
+        timings: Timings returned by LaneScheduler.run
+
+    Returns:
+        Seldon custom metrics: TIMERs of wait and latency, COUNTERs of rows and SLO
+        violations
+    """
+    metrics: list[dict[str, Any]] = []
+    for timing in timings:
+        tags = {"lane": timing.lane}
+        metrics += [
+            {"type": "TIMER", "key": "lane_wait_ms", "value": timing.wait_ms, "tags": tags},
+            {"type": "TIMER", "key": "lane_latency_ms", "value": timing.latency_ms, "tags": tags},
+            {"type": "COUNTER", "key": "lane_rows", "value": timing.rows, "tags": tags},
+            {
+                "type": "COUNTER",
+                "key": "lane_slo_violations",
+                "value": int(timing.violated),
+                "tags": tags,
+            },
+        ]
+    return metrics
@@ -0,0 +1,248 @@
+"""
+ONNX export of the serving pipeline and an onnxruntime backend for the model server.
+
+The whole text-to-probabilities pipeline becomes a single ONNX graph:
+
+    StringNormalizer (lowercase) -> Tokenizer (word runs, stop words dropped)
+    -> TfIdfVectorizer (n-gram counts) -> IDF scaling -> L2 norm -> MatMul + Add
+    -> Softmax / Sigmoid
+
+The graph is built directly from ServingPipeline parameters rather than with skl2onnx,
+whose TfidfVectorizer converter applies stop words to whole documents instead of tokens
+and so cannot reproduce sklearn's n-grams. Probabilities match ``predict_proba`` to float32
+precision. Known difference: lowercasing follows ICU rather than Python's ``str.lower``,
+so the Greek final sigma and the dotted capital I fold differently.
+
+``onnx`` is only needed to export and ``onnxruntime`` only to serve; both are optional
+dependencies (``pip install -e ".[onnx]"``) imported on first use.
+"""
+
+import json
+import os
+import re
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from serving_pipeline import ServingPipeline
+
+OPSET = 20  # StringConcat
+IR_VERSION = 10
+CLASSES_METADATA_KEY = "classes"
+
+# Python's \w as RE2 classes; RE2's \b only knows ASCII word characters
+_NON_WORD = r"[^\p{L}\p{N}_]+"
+
+
+def export_onnx(pipeline: ServingPipeline, path: str) -> None:
+    """
+    Write a serving pipeline as an ONNX model.
+
+    Args:
+        pipeline: Pipeline to export
+        path: Output ``.onnx`` path
+
+    Raises:
+        ValueError: If the featurizer uses options the graph does not implement
+    """
+    from onnx import TensorProto, checker, helper, numpy_helper, save_model
+
+    featurizer, scorer = pipeline.featurizer, pipeline.scorer
+    if featurizer.token_pattern != r"(?u)\b\w\w+\b":
+        raise ValueError(f"Cannot export token_pattern={featurizer.token_pattern!r} to ONNX")
+    if not featurizer.lowercase or featurizer.sublinear_tf or featurizer.binary:
+        raise ValueError("ONNX export requires lowercase=True, sublinear_tf=False, binary=False")
+    if featurizer.norm not in ("l2", None):
+        raise ValueError(f"Cannot export norm={featurizer.norm!r} to ONNX")
+
+    # TfIdfVectorizer takes every n-gram as consecutive tokens in one pool, grouped by n
+    min_n, max_n = featurizer.ngram_range
+    by_length: dict[int, list[str]] = {n: [] for n in range(min_n, max_n + 1)}
+    for term in featurizer.vocabulary:
+        by_length[term.count(" ") + 1].append(term)
+    pool: list[str] = []
+    ngram_counts: list[int] = []
+    ngram_indexes: list[int] = []
+    for n in range(min_n, max_n + 1):
+        ngram_counts.append(len(pool))
+        for term in by_length[n]:
+            pool.extend(term.split(" "))
+            ngram_indexes.append(featurizer.vocabulary[term])
+
+    # Splitting on non-word runs that may swallow whole stop words drops them before
+    # n-grams are formed; padding with spaces lets the first and last token match too
+    separator = _NON_WORD
+    if featurizer.stop_words:
+        stop_words = "|".join(
+            re.escape(word) for word in sorted(featurizer.stop_words, key=len, reverse=True)
+        )
+        separator = f"{_NON_WORD}(?:(?:{stop_words}){_NON_WORD})*"
+
+    n_features = featurizer.n_features
+    idf = featurizer.idf if featurizer.idf is not None else np.ones(n_features)
+    initializers = [
+        numpy_helper.from_array(np.array([-1], dtype=np.int64), "flat_shape"),
+        helper.make_tensor("space", TensorProto.STRING, [], [b" "]),
+        numpy_helper.from_array(idf.astype(np.float32), "idf"),
+        numpy_helper.from_array(np.array([1], dtype=np.int64), "row_axis"),
+        numpy_helper.from_array(np.array([np.finfo(np.float32).tiny], np.float32), "min_norm"),
+        numpy_helper.from_array(scorer.coef_t.astype(np.float32), "coef_t"),
+        numpy_helper.from_array(scorer.intercept.astype(np.float32), "intercept"),
+    ]
+    nodes = [
+        helper.make_node("Reshape", ["text", "flat_shape"], ["flat"]),
+        helper.make_node(
+            "StringNormalizer", ["flat"], ["lower"], case_change_action="LOWER", locale="C.UTF-8"
+        ),
+        helper.make_node("StringConcat", ["space", "lower"], ["padded_left"]),
+        helper.make_node("StringConcat", ["padded_left", "space"], ["padded"]),
+        helper.make_node(
+            "Tokenizer",
+            ["padded"],
+            ["tokens"],
+            domain="com.microsoft",
+            mark=0,
+            mincharnum=2,
+            pad_value="#",
+            separators=[separator],
+        ),
+        helper.make_node(
+            "TfIdfVectorizer",
+            ["tokens"],
+            ["counts"],
+            mode="TF",
+            min_gram_length=min_n,
+            max_gram_length=max_n,
+            max_skip_count=0,
+            ngram_counts=ngram_counts,
+            ngram_indexes=ngram_indexes,
+            pool_strings=pool,
+        ),
+        helper.make_node("Mul", ["counts", "idf"], ["tfidf"]),
+    ]
+
+    features = "tfidf"
+    if featurizer.norm == "l2":
+        nodes += [
+            helper.make_node("Mul", ["tfidf", "tfidf"], ["squares"]),
+            helper.make_node("ReduceSum", ["squares", "row_axis"], ["sum_squares"]),
+            helper.make_node("Sqrt", ["sum_squares"], ["norms"]),
+            # Empty rows stay zero instead of dividing by zero
+            helper.make_node("Max", ["norms", "min_norm"], ["safe_norms"]),
+            helper.make_node("Div", ["tfidf", "safe_norms"], ["normalized"]),
+        ]
+        features = "normalized"
+
+    nodes += [
+        helper.make_node("MatMul", [features, "coef_t"], ["linear"]),
+        helper.make_node("Add", ["linear", "intercept"], ["scores"]),
+    ]
+    if scorer.coef_t.shape[1] == 1:
+        initializers.append(numpy_helper.from_array(np.array(1.0, np.float32), "one"))
+        nodes += [
+            helper.make_node("Sigmoid", ["scores"], ["positive"]),
+            helper.make_node("Sub", ["one", "positive"], ["negative"]),
+            helper.make_node("Concat", ["negative", "positive"], ["probabilities"], axis=1),
+        ]
+    elif scorer.multinomial:
+        nodes.append(helper.make_node("Softmax", ["scores"], ["probabilities"], axis=1))
+    else:
+        nodes += [
+            helper.make_node("Sigmoid", ["scores"], ["sigmoids"]),
+            helper.make_node("ReduceSum", ["sigmoids", "row_axis"], ["sigmoid_sums"]),
+            helper.make_node("Div", ["sigmoids", "sigmoid_sums"], ["probabilities"]),
+        ]
+
+    graph = helper.make_graph(
+        nodes,
+        "sentiment_pipeline",
+        [helper.make_tensor_value_info("text", TensorProto.STRING, [None, 1])],
+        [
+            helper.make_tensor_value_info(
+                "probabilities", TensorProto.FLOAT, [None, len(scorer.classes)]
+            )
+        ],
+        initializers,
+    )
+    model = helper.make_model(
+        graph,
+        opset_imports=[helper.make_opsetid("", OPSET), helper.make_opsetid("com.microsoft", 1)],
+        ir_version=IR_VERSION,
+        producer_name="sentiment-analyzer",
+    )
+    helper.set_model_props(
+        model, {CLASSES_METADATA_KEY: json.dumps([str(label) for label in scorer.classes])}
+    )
+    checker.check_model(model)
+    save_model(model, path)
+
+
+class OnnxPipeline:
+    """Runs an exported pipeline on onnxruntime's CPU execution provider."""
+
+    # session.run() drops the GIL, so batch chunks can share one session across threads
+    releases_gil = True
+
+    def __init__(self, session: Any, classes: NDArray) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            session: onnxruntime InferenceSession of an exported model
+            classes: Class labels in probability column order
+        """
+        self.session = session
+        self.classes_ = classes
+        self._input_name = session.get_inputs()[0].name
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int | None = None,
+    ) -> "OnnxPipeline":
+        """
+        Create an inference session for an exported model.
+
+        Args:
+            path: Path to the ``.onnx`` model
+            intra_op_threads: Threads used inside an operator
+                (default: ONNX_INTRA_OP_THREADS or 1)
+            inter_op_threads: Threads running independent operators
+                (default: ONNX_INTER_OP_THREADS or 1)
+
+        Returns:
+            Loaded OnnxPipeline
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # One thread each suits one request per worker; raise intra-op threads for
+        # deployments that score large batches on dedicated cores
+        options.intra_op_num_threads = intra_op_threads or int(
+            os.getenv("ONNX_INTRA_OP_THREADS", "1")
+        )
+        options.inter_op_num_threads = inter_op_threads or int(
+            os.getenv("ONNX_INTER_OP_THREADS", "1")
+        )
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        metadata = session.get_modelmeta().custom_metadata_map
+        classes = np.array(json.loads(metadata[CLASSES_METADATA_KEY]), dtype=object)
+        return cls(session, classes)
+
+    def predict_proba(self, texts: Iterable[str]) -> NDArray[np.floating]:
+        """Predict class probabilities for raw texts."""
+        batch = np.array(list(texts), dtype=object).reshape(-1, 1)
+        if not len(batch):
+            return np.zeros((0, len(self.classes_)), dtype=np.float32)
+        return self.session.run(None, {self._input_name: batch})[0]
+
+    def predict(self, texts: Iterable[str]) -> NDArray:
+        """Predict class labels for raw texts."""
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
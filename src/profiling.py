@@ -0,0 +1,194 @@
+"""
+On-demand profiling for the Seldon model wrapper.
+
+A ProfileSession runs for a fixed number of seconds while live traffic is served and writes:
+- ``<name>.folded``: wall-clock stack samples of all threads in collapsed-stack format
+  (load into speedscope, or render with flamegraph.pl)
+- ``<name>.prof``: cProfile statistics (snakeviz, flameprof, gprof2dot)
+- ``<name>.alloc.folded``: net allocations per call stack, weighted by bytes
+- ``<name>.alloc.txt``: top allocation growth by traceback (tracemalloc)
+
+Nothing runs until a session is started, so the cost when idle is zero.
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+# Only one session per process; overlapping cProfile/tracemalloc sessions would collide
+_session_lock = threading.Lock()
+_active_session: "ProfileSession | None" = None
+
+
+def _fold_frame(frame: FrameType | None) -> str:
+    """Render a Python stack as a root-to-leaf, semicolon-separated string."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ProfileSession:
+    """Capture sampled stacks, cProfile data and allocations for a fixed duration."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        duration: float,
+        interval: float = 0.005,
+        traceback_frames: int = 25,
+    ) -> None:
+        """
+        Initialize the session.
+
+        Args:
+            output_dir: Directory for the output files
+            duration: Seconds to profile for
+            interval: Seconds between stack samples
+            traceback_frames: Stack depth recorded per allocation
+        """
+        self.output_dir = Path(output_dir)
+        self.duration = duration
+        self.interval = interval
+        self.traceback_frames = traceback_frames
+        self.name = f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._profiler = cProfile.Profile()
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._sampler = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling, cProfile and tracemalloc; the session stops itself after `duration`."""
+        tracemalloc.start(self.traceback_frames)
+        try:
+            self._baseline = tracemalloc.take_snapshot()
+            # On Python 3.12+ cProfile hooks sys.monitoring, which covers every thread
+            self._profiler.enable()
+            self._sampler.start()
+        except BaseException:
+            # Without a sampler thread, nothing would ever stop the hooks
+            self._profiler.disable()
+            tracemalloc.stop()
+            raise
+        logger.info(f"Profiling for {self.duration}s, writing {self.output_dir / self.name}.*")
+
+    def stop(self) -> None:
+        """End the session early."""
+        self._stop.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until the output files are written.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the session finished
+        """
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        """Sample all thread stacks until the deadline, then write the results."""
+        deadline = time.monotonic() + self.duration
+        own_id = threading.get_ident()
+        try:
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_id:
+                        self.samples[_fold_frame(frame)] += 1
+                self._stop.wait(self.interval)
+        finally:
+            try:
+                self._profiler.disable()
+                self._write()
+            except Exception:
+                logger.exception(f"Failed to write profile {self.output_dir / self.name}")
+            finally:
+                tracemalloc.stop()
+                _release(self)
+                self._done.set()
+
+    def _write(self) -> None:
+        """Write stack samples, cProfile stats and allocation reports."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prefix = self.output_dir / self.name
+
+        with open(f"{prefix}.folded", "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        self._profiler.dump_stats(f"{prefix}.prof")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        assert self._baseline is not None
+        growth = [
+            diff for diff in snapshot.compare_to(self._baseline, "traceback") if diff.size_diff > 0
+        ]
+
+        with open(f"{prefix}.alloc.folded", "w", encoding="utf-8") as f:
+            for diff in growth:
+                stack = ";".join(
+                    f"{Path(frame.filename).name}:{frame.lineno}"
+                    for frame in reversed(diff.traceback)
+                )
+                f.write(f"{stack} {diff.size_diff}\n")
+
+        with open(f"{prefix}.alloc.txt", "w", encoding="utf-8") as f:
+            for diff in growth[:50]:
+                f.write(f"{diff.size_diff / 1024:.1f} KiB in {diff.count_diff} blocks\n")
+                f.write("\n".join(diff.traceback.format()) + "\n\n")
+
+        logger.info(f"Profile written to {prefix}.* ({sum(self.samples.values())} stack samples)")
+
+
+def _release(session: ProfileSession) -> None:
+    """Mark the session as finished so a new one can start."""
+    global _active_session
+    with _session_lock:
+        if _active_session is session:
+            _active_session = None
+
+
+def start_profile(duration: float, output_dir: str | None = None) -> ProfileSession | None:
+    """
+    Start a profiling session unless one is already running in this process.
+
+    Args:
+        duration: Seconds to profile for
+        output_dir: Output directory (default: PROFILE_OUTPUT_DIR or /tmp/profiles)
+
+    Returns:
+        The started session, or None if a session is already active
+    """
+    global _active_session
+    with _session_lock:
+        if _active_session is not None:
+            return None
+        _active_session = ProfileSession(
+            output_dir or os.getenv("PROFILE_OUTPUT_DIR", "/tmp/profiles"),
+            duration,
+            interval=float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000,
+        )
+        session = _active_session
+    try:
+        session.start()
+    except Exception:
+        _release(session)
+        raise
+    return session
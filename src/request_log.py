@@ -0,0 +1,319 @@
+"""
+Sampled request/prediction logging, written off the request path.
+
+The UI server and the model wrapper each own a RequestLogger. A request costs one
+sampling decision and a non-blocking put on a bounded queue. When the queue is full,
+the record is dropped and counted rather than slowing the request down. A background
+thread drains the queue in batches and turns each batch into one record per text:
+
+    {"ts": 1718000000.123, "service": "ui", "text": "...", "sentiment": "positive",
+     "confidence": 0.93, "latency_ms": 12.4}
+
+It appends each batch to ``<service>-<start time>-<pid>.jsonl.gz`` as its own gzip
+member. Every flushed file is therefore a valid gzip stream that ``zcat`` and
+``gzip.open`` can read, even while it is still being written. Files rotate at
+REQUEST_LOG_MAX_MB compressed MiB, and each process keeps only its newest
+REQUEST_LOG_BACKUPS (files of exited processes are left in place). The writer thread
+starts with the first logged request in each process, so server workers forked after the
+logger was created each write their own files.
+``read_records`` reads the files back, for replaying as load (scripts/benchmark_ui.py
+--replay) or exporting as training data (scripts/export_request_log.py).
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLogger:
+    """Sample request/prediction records and write them to rotating gzip JSONL files."""
+
+    def __init__(
+        self,
+        service_name: str,
+        log_dir: str | None = None,
+        sample_rate: float = 1.0,
+        queue_size: int = 10000,
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+        max_bytes: int = 64 << 20,
+        backup_count: int = 20,
+    ) -> None:
+        """
+        Initialize the logger; its writer thread starts with the first logged request
+        in this process.
+
+        Args:
+            service_name: Name recorded on, and prefixing the files of, every record
+            log_dir: Directory of the log files; logging is disabled if None
+            sample_rate: Fraction of requests to log
+            queue_size: Requests waiting to be written before new ones are dropped
+            batch_size: Requests written together as one gzip member
+            flush_interval: Longest time in seconds a queued request waits to be written
+            max_bytes: Compressed size at which a file is rotated
+            backup_count: Files of this service and process to keep, including the
+                current one
+        """
+        self.service_name = service_name
+        self.log_dir = log_dir
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.enabled = bool(log_dir) and sample_rate > 0
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._closed = False
+        self._reset()
+
+        if self.enabled:
+            assert log_dir is not None
+            os.makedirs(log_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, service_name: str) -> "RequestLogger":
+        """
+        Create a logger configured by the REQUEST_LOG_* environment variables.
+
+        REQUEST_LOG_DIR enables it. REQUEST_LOG_SAMPLE_RATE, REQUEST_LOG_QUEUE_SIZE,
+        REQUEST_LOG_FLUSH_SECONDS, REQUEST_LOG_MAX_MB and REQUEST_LOG_BACKUPS tune it.
+
+        Args:
+            service_name: Name recorded on every record
+
+        Returns:
+            Configured RequestLogger
+        """
+        return cls(
+            service_name,
+            log_dir=os.getenv("REQUEST_LOG_DIR") or None,
+            sample_rate=float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0")),
+            queue_size=int(os.getenv("REQUEST_LOG_QUEUE_SIZE", "10000")),
+            flush_interval=float(os.getenv("REQUEST_LOG_FLUSH_SECONDS", "1.0")),
+            max_bytes=int(float(os.getenv("REQUEST_LOG_MAX_MB", "64")) * 2**20),
+            backup_count=int(os.getenv("REQUEST_LOG_BACKUPS", "20")),
+        )
+
+    def log(
+        self,
+        texts: Sequence[str],
+        predictions: Any,
+        confidences: Sequence[float] | None = None,
+        classes: Sequence[Any] | None = None,
+        **fields: Any,
+    ) -> bool:
+        """
+        Queue a scored request, if it is sampled, without waiting.
+
+        The arguments are only read by the writer thread, so they must not be modified
+        afterwards. Labels and confidences are derived there, not here.
+
+        Args:
+            texts: Input texts
+            predictions: A label per text, or probabilities of shape (n_texts, n_classes)
+            confidences: Confidence per text, when `predictions` are labels
+            classes: Class labels in probability column order, when `predictions` are
+                probabilities
+            **fields: Extra values recorded on each text's record, e.g. latency_ms
+
+        Returns:
+            True if queued; False if not sampled, disabled or dropped because the queue
+            was full
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.time(), texts, predictions, confidences, classes, fields))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Wait until every request queued by this process has been written."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued requests and stop the writer thread."""
+        with self._start_lock:
+            self._closed = True
+            if self._thread is None or self._pid != os.getpid():
+                return
+            thread, self._thread = self._thread, None
+        self._queue.put(None)
+        thread.join()
+        if self.dropped:
+            logger.warning(f"Request log dropped {self.dropped} requests (queue full)")
+
+    def _reset(self) -> None:
+        """Create the queue, lock, counters and file owned by the current process."""
+        self.dropped = 0
+        self.written = 0
+        self._path: str | None = None
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[Any, ...] | None] = queue.Queue(self.queue_size)
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use in this process, after a fork included."""
+        if self._pid == os.getpid() or self._closed:
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() or self._closed:
+                return
+            if self._pid is not None:
+                # Forked after the parent started: its thread did not survive, and its
+                # queue, lock and open file belong to the parent
+                self._reset()
+            self._thread = threading.Thread(
+                target=self._work, name=f"request-log-{self.service_name}", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _work(self) -> None:
+        """Write queued requests in batches until close()."""
+        while True:
+            # Collect until the batch is full or its first request has waited flush_interval
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            items = [item for item in batch if item is not None]
+            try:
+                if items:
+                    self._write(items)
+            except Exception as e:
+                logger.error(f"Request log write failed, {len(items)} requests lost: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(items) < len(batch):
+                return
+
+    def _write(self, items: list[tuple[Any, ...]]) -> None:
+        """Append one gzip member holding the records of `items`, rotating first if due."""
+        lines = [
+            json.dumps(record, default=_json_default) + "\n"
+            for item in items
+            for record in self._records(*item)
+        ]
+        member = gzip.compress("".join(lines).encode("utf-8"), compresslevel=6)
+        if self._path is None or os.path.getsize(self._path) + len(member) > self.max_bytes:
+            self._rotate()
+        assert self._path is not None
+        with open(self._path, "ab") as f:
+            f.write(member)
+        self.written += len(lines)
+
+    def _records(
+        self,
+        ts: float,
+        texts: Sequence[str],
+        predictions: Any,
+        confidences: Sequence[float] | None,
+        classes: Sequence[Any] | None,
+        fields: dict[str, Any],
+    ) -> Iterator[dict[str, Any]]:
+        """Expand one logged request into a record per text."""
+        predictions = np.asarray(predictions)
+        if predictions.ndim == 2:
+            if classes is None:
+                raise ValueError("classes are required to log probabilities")
+            confidences = predictions.max(axis=1).tolist()
+            predictions = np.asarray(classes)[predictions.argmax(axis=1)]
+        labels = [str(label) for label in predictions.tolist()]
+        for i, text in enumerate(texts):
+            record: dict[str, Any] = {
+                "ts": round(ts, 3),
+                "service": self.service_name,
+                "text": text,
+                "sentiment": labels[i],
+            }
+            if confidences is not None:
+                record["confidence"] = float(confidences[i])
+            record.update(fields)
+            yield record
+
+    def _rotate(self) -> None:
+        """
+        Start a new file and delete this process's oldest ones beyond backup_count.
+        Other processes' files are never touched, as they may still be written to.
+        """
+        assert self.log_dir is not None
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        pid = os.getpid()
+        self._path = os.path.join(self.log_dir, f"{self.service_name}-{stamp}-{pid}.jsonl.gz")
+        pattern = f"{glob.escape(self.service_name)}-*-{pid}.jsonl.gz"
+        files = sorted(glob.glob(os.path.join(glob.escape(self.log_dir), pattern)))
+        for old in files[: max(len(files) - self.backup_count + 1, 0)]:
+            os.remove(old)
+
+
+def read_records(paths: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """
+    Read request records back from log files, oldest file first.
+
+    Each gzip member (one written batch) is checked on its own, so a torn last member
+    from a crash mid-write is skipped instead of raising or yielding unverified records.
+
+    Args:
+        paths: Log files, or directories whose ``*.jsonl.gz`` files are read
+
+    Returns:
+        Iterator over the records
+    """
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += glob.glob(os.path.join(path, "*.jsonl.gz"))
+        else:
+            files.append(path)
+    for path in sorted(files, key=os.path.basename):
+        with open(path, "rb") as f:
+            data = f.read()
+        while data:
+            member = zlib.decompressobj(wbits=31)
+            try:
+                text = member.decompress(data)
+                complete = member.eof
+            except zlib.error:
+                complete = False
+            if not complete:
+                logger.warning(f"{path} ends with a partially written batch")
+                break
+            for line in text.decode("utf-8").splitlines():
+                yield json.loads(line)
+            data = member.unused_data
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize NumPy scalars found in extra fields."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
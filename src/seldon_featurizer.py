@@ -0,0 +1,228 @@
+"""
+Seldon Core v1 TRANSFORMER that turns raw texts into TF-IDF rows.
+
+In the two-node inference graph this component featurizes each request and passes compact
+CSR rows (see seldon_payload.py) to the SentimentClassifier MODEL node, which then only
+runs the linear scorer. Featurized rows are kept in an LRU cache, so repeated texts, and
+requests fanned out to several downstream classifiers, are tokenized once.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from seldon_payload import InputLimits, decode_texts, encode_features
+from serving_pipeline import ServingPipeline, SparseRows, TfidfFeaturizer, track_cost
+from tracing import TRACEPARENT, Tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spans are only recorded when TRACE_EXPORT_PATH is set
+tracer = Tracer.from_env("sentiment-featurizer")
+
+
+# Approximate bytes held per cache entry besides its row arrays: the digest key, two
+# ndarray headers, the tuple and the OrderedDict node
+_ENTRY_OVERHEAD = 300
+
+
+def _text_key(text: str) -> bytes:
+    """Key a text by a 16-byte digest, so the cache never holds the texts themselves."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class FeatureCache:
+    """Thread-safe LRU cache of TF-IDF rows keyed by a digest of the text."""
+
+    def __init__(self, featurizer: TfidfFeaturizer, max_bytes: int = 64 * 2**20) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            featurizer: Featurizer computing rows on a miss
+            max_bytes: Memory budget for cached rows; 0 disables caching
+        """
+        self.featurizer = featurizer
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._rows: OrderedDict[bytes, tuple[NDArray, NDArray]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of cached texts."""
+        return len(self._rows)
+
+    def transform(self, texts: list[str]) -> tuple[SparseRows, int]:
+        """
+        Featurize texts, computing only the rows that are not cached.
+
+        Args:
+            texts: Raw documents
+
+        Returns:
+            Tuple of (TF-IDF rows in input order, number of cache hits)
+        """
+        if self.max_bytes <= 0:
+            return self.featurizer.transform(texts), 0
+
+        keys = [_text_key(text) for text in texts]
+        found: list[tuple[NDArray, NDArray] | None] = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is not None:
+                    self._rows.move_to_end(key)
+                    found[i] = row
+
+        missing = [i for i, row in enumerate(found) if row is None]
+        if missing:
+            computed = self.featurizer.transform([texts[i] for i in missing])
+            bounds = computed.indptr
+            new_rows = {}
+            for position, i in enumerate(missing):
+                start, end = bounds[position], bounds[position + 1]
+                # Copies, so a cached row does not keep the whole batch's arrays alive
+                found[i] = (computed.indices[start:end].copy(), computed.data[start:end].copy())
+                new_rows[keys[i]] = found[i]
+            with self._lock:
+                for key, row in new_rows.items():
+                    old = self._rows.pop(key, None)
+                    if old is not None:
+                        self.nbytes -= _entry_bytes(old)
+                    self._rows[key] = row
+                    self.nbytes += _entry_bytes(row)
+                while self.nbytes > self.max_bytes and self._rows:
+                    self.nbytes -= _entry_bytes(self._rows.popitem(last=False)[1])
+
+        n_hits = len(texts) - len(missing)
+        with self._lock:
+            self.hits += n_hits
+            self.misses += len(missing)
+
+        rows = [row for row in found if row is not None]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+        indices = np.concatenate([r[0] for r in rows]) if rows else np.zeros(0, np.int64)
+        data = np.concatenate([r[1] for r in rows]) if rows else np.zeros(0, self.featurizer.dtype)
+        return SparseRows(indptr, indices, data, self.featurizer.n_features), n_hits
+
+
+def _entry_bytes(row: tuple[NDArray, NDArray]) -> int:
+    """Approximate memory held by one cache entry."""
+    return row[0].nbytes + row[1].nbytes + _ENTRY_OVERHEAD
+
+
+class SentimentFeaturizer:
+    """
+    Seldon Core v1 TRANSFORMER for the featurizer node of the inference graph.
+
+    The class implements the Seldon Python wrapper interface:
+    - transform_input(): Texts to TF-IDF rows (required)
+    - metrics(): Feature cache counters for the last request
+    - tags(): Cost of the last request, returned in the response meta
+    - health_status(): Health check endpoint (optional)
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """
+        Initialize and load the featurizer from the serving model archive.
+
+        Args:
+            **kwargs: Seldon may pass parameters like model_name, etc.
+        """
+        model_path = os.getenv("MODEL_PATH", "/mnt/models/sentiment_model.npz")
+        logger.info(f"Initializing SentimentFeaturizer, loading featurizer from {model_path}")
+
+        featurizer = ServingPipeline.load(model_path).featurizer
+        self.input_limits = InputLimits.from_env()
+        self.input_limits.configure(featurizer)
+        self.fingerprint = featurizer.fingerprint()
+        self.cache = FeatureCache(
+            featurizer, int(float(os.getenv("FEATURE_CACHE_MB", "64")) * 2**20)
+        )
+        self._last_request = threading.local()
+        self.ready = True
+
+    def transform_input(
+        self,
+        X: NDArray | list | list[str],
+        features_names: list[str] | None = None,
+        meta: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Featurize the request texts for the downstream classifier.
+
+        Args:
+            X: Input data (same formats as SentimentClassifier.predict())
+            features_names: Feature names (not used but part of Seldon interface)
+            meta: Seldon request metadata; a "traceparent" tag links spans to the caller
+
+        Returns:
+            jsonData holding the TF-IDF rows
+        """
+        start = time.perf_counter()
+        tags = (meta or {}).get("tags") or {}
+        with tracer.span("featurizer.tfidf", traceparent=tags.get(TRACEPARENT)):
+            texts, n_cut = self.input_limits.truncate(list(decode_texts(X)))
+            with track_cost() as featurized:
+                rows, hits = self.cache.transform(texts)
+        self._last_request.stats = (hits, len(texts) - hits)
+        # Cache hits cost no tokenization, so tokens only cover the misses
+        self._last_request.cost = {
+            "rows": len(texts),
+            "truncated_chars": n_cut,
+            "chars": featurized.chars,
+            "tokens": featurized.tokens,
+            "truncated_tokens": featurized.truncated,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        return encode_features(rows, self.fingerprint)
+
+    def metrics(self) -> list[dict[str, Any]]:
+        """
+        Report feature cache activity of the request just handled by this thread.
+
+        Returns:
+            Seldon custom metrics
+        """
+        hits, misses = getattr(self._last_request, "stats", (0, 0))
+        return [
+            {"type": "COUNTER", "key": "feature_cache_hits", "value": hits},
+            {"type": "COUNTER", "key": "feature_cache_misses", "value": misses},
+            {"type": "GAUGE", "key": "feature_cache_entries", "value": len(self.cache)},
+            {"type": "GAUGE", "key": "feature_cache_bytes", "value": self.cache.nbytes},
+        ]
+
+    def tags(self) -> dict[str, Any]:
+        """
+        Report the cost of the request just handled by this thread.
+
+        Returns:
+            Response tags, {"featurizer_cost": {...}} once a request has been featurized;
+            a key of its own, so it survives the merge with the classifier's "cost" tag
+        """
+        cost = getattr(self._last_request, "cost", None)
+        return {"featurizer_cost": cost} if cost else {}
+
+    def health_status(self) -> dict[str, Any]:
+        """
+        Return health status.
+
+        Returns:
+            Health status dictionary
+        """
+        return {
+            "ready": self.ready,
+            "cache_entries": len(self.cache),
+            "cache_bytes": self.cache.nbytes,
+        }
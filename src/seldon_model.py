@@ -4,16 +4,50 @@ This follows the Seldon Core v1 Python wrapper interface.
 """
 
 import logging
+import math
 import os
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
 from typing import Any
 
-import joblib
 import numpy as np
 from numpy.typing import NDArray
 
+from batching import BatchRunner
+from challengers import ShadowScorer
+from lanes import LaneScheduler, seldon_metrics
+from profiling import start_profile
+from request_log import RequestLogger
+from seldon_payload import (
+    CLASSES_TAG,
+    ENCODING_TAG,
+    ENCODINGS,
+    InputLimits,
+    decode_features,
+    decode_texts,
+    encode_output,
+    is_feature_payload,
+)
+from serving_pipeline import ServingPipeline, load_model, track_cost
+from tracing import TRACEPARENT, Tracer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Spans are only recorded when TRACE_EXPORT_PATH is set
+tracer = Tracer.from_env("sentiment-classifier")
+
+# Sampled texts and predictions, written off the request path when REQUEST_LOG_DIR is set
+request_log = RequestLogger.from_env("model")
+
+# Request tag that starts a profiling session of the given number of seconds
+PROFILE_TAG = "profile_seconds"
+
+# Request tag asking for the top-k contributing n-grams per class ("true" for EXPLAIN_TOP_K)
+EXPLAIN_TAG = "explain"
+
 
 class SentimentClassifier:
     """
@@ -24,6 +58,10 @@ class SentimentClassifier:
     - __init__(): Constructor, automatically called by Seldon
     - predict(): Main prediction method (required)
     - predict_proba(): Probability prediction (optional)
+    - explain(): Probabilities with the n-grams behind them (called directly; Seldon
+      returns the same explanations in meta.tags for requests tagged "explain")
+    - metrics(): Per-lane latency of the last request, when lanes are enabled (optional)
+    - tags(): Cost of the last request, returned in the response meta (optional)
     - health_status(): Health check endpoint (optional)
     """
 
@@ -43,15 +81,58 @@ class SentimentClassifier:
         logger.info(f"Initializing SentimentClassifier, loading model from {model_path}")
 
         try:
-            self.model = joblib.load(model_path)
+            self.model = load_model(model_path)
             self.ready = True
             logger.info("Model loaded successfully in __init__")
         except Exception as e:
             logger.error(f"Failed to load model in __init__: {e}")
             raise
 
+        # Rows featurized by the transformer must come from the same vocabulary
+        self.feature_fingerprint = (
+            self.model.featurizer.fingerprint() if isinstance(self.model, ServingPipeline) else None
+        )
+
+        # Texts are cut to MAX_INPUT_CHARS; the token cap is applied by load_model
+        self.input_limits = InputLimits.from_env()
+        self._last_request = threading.local()
+
+        # Explanations need the linear model's coefficients: .npz models have them as is,
+        # sklearn pipelines are converted on first use
+        self.explain_top_k = int(os.getenv("EXPLAIN_TOP_K", "5"))
+        self.explain_max_top_k = int(os.getenv("EXPLAIN_MAX_TOP_K", "50"))
+        self._explainer: ServingPipeline | None = (
+            self.model if isinstance(self.model, ServingPipeline) else None
+        )
+
+        # Challengers sharing the champion's vectorizer are scored on its rows off the
+        # request path; only the champion's output is returned
+        self.shadow = ShadowScorer.from_env(self.model)
+
+        # Large batches are split into chunks scored on a thread or process pool
+        self.batch_runner = BatchRunner.from_env(self.model, partial(load_model, model_path))
+
+        # With LANE_BOUNDS set, texts are scored in per-length lanes with their own SLOs,
+        # so short texts never wait behind long ones
+        self.lanes = LaneScheduler.from_env(
+            partial(self._run_batch, "predict_proba", traced=False), self.model.classes_
+        )
+
+        # Opt-in profiling: capture the first N seconds of traffic, and/or allow
+        # requests tagged with meta.tags.profile_seconds to start a session
+        self.profile_trigger_enabled = (
+            os.getenv("PROFILE_TRIGGER_ENABLED", "false").lower() == "true"
+        )
+        self.profile_max_seconds = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+        profile_on_start = float(os.getenv("PROFILE_ON_START_SECONDS", "0"))
+        if profile_on_start > 0:
+            start_profile(profile_on_start)
+
     def predict(
-        self, X: NDArray | list | list[str], features_names: list[str] | None = None
+        self,
+        X: NDArray | list | list[str],
+        features_names: list[str] | None = None,
+        meta: dict[str, Any] | None = None,
     ) -> NDArray:
         """
         Make predictions on input data.
@@ -62,41 +143,39 @@ class SentimentClassifier:
                - numpy array of shape (n_samples, n_features) or (n_samples,)
                - list of strings
                - list of lists
+               - jsonData of TF-IDF rows from the SentimentFeaturizer transformer
             features_names: Feature names (not used but part of Seldon interface)
+            meta: Seldon request metadata; a "traceparent" tag links spans to the caller,
+                an "explain" tag adds the top contributing n-grams to the response tags,
+                an "encoding" tag of "ids" or "proba" returns numeric output with the
+                labels in the "classes_" response tag (see seldon_payload.py)
 
         Returns:
-            Predictions as numpy array of shape (n_samples,)
+            Predictions as numpy array of shape (n_samples,): labels, or int32 class ids;
+            probabilities of shape (n_samples, n_classes) for the "proba" encoding
         """
         if not self.ready or self.model is None:
             raise RuntimeError("Model not loaded")
 
         input_info = getattr(X, "shape", len(X) if hasattr(X, "__len__") else "unknown")
-        logger.info(f"Received prediction request, input type: {type(X)}, shape/len: {input_info}")
+        logger.debug(f"Received prediction request, input type: {type(X)}, shape/len: {input_info}")
+
+        if self.profile_trigger_enabled:
+            self._maybe_start_profile(meta)
 
         try:
-            # Handle different input formats
-            if isinstance(X, np.ndarray):
-                # If 2D array with shape (n_samples, 1), flatten to get text strings
-                if X.ndim == 2 and X.shape[1] == 1:
-                    texts = X.flatten().tolist()
-                elif X.ndim == 1:
-                    texts = X.tolist()
+            encoding = self._response_encoding(meta)
+            with tracer.span("model.predict", traceparent=_request_tag(meta, TRACEPARENT)):
+                if encoding == "labels":
+                    predictions = self._score("predict", X, self._explain_top_k(meta))
                 else:
-                    # Already in the right format
-                    texts = X
-            elif isinstance(X, list):
-                # If list of lists (from JSON), extract the strings
-                if X and isinstance(X[0], list):
-                    texts = [item[0] if isinstance(item, list) else item for item in X]
-                else:
-                    texts = X
-            else:
-                texts = X
+                    # Ids and probabilities both come from the probabilities, so no
+                    # array of label strings is built at all
+                    probabilities = self._score("predict_proba", X, self._explain_top_k(meta))
+                    predictions = encode_output(probabilities, encoding)
+                    self._last_request.classes = self.model.classes_
 
-            # Make predictions
-            predictions = self.model.predict(texts)
-
-            logger.info(f"Predictions shape: {predictions.shape}")
+            logger.debug(f"Predictions shape: {predictions.shape}")
             return predictions
 
         except Exception as e:
@@ -104,7 +183,10 @@ class SentimentClassifier:
             raise
 
     def predict_proba(
-        self, X: NDArray | list | list[str], features_names: list[str] | None = None
+        self,
+        X: NDArray | list | list[str],
+        features_names: list[str] | None = None,
+        meta: dict[str, Any] | None = None,
     ) -> NDArray:
         """
         Predict class probabilities.
@@ -113,6 +195,7 @@ class SentimentClassifier:
         Args:
             X: Input data (same format as predict())
             features_names: Feature names (not used but part of Seldon interface)
+            meta: Seldon request metadata (same as predict())
 
         Returns:
             Class probabilities as numpy array of shape (n_samples, n_classes)
@@ -120,38 +203,383 @@ class SentimentClassifier:
         if not self.ready or self.model is None:
             raise RuntimeError("Model not loaded")
 
-        try:
-            # Handle different input formats (same logic as predict)
-            if isinstance(X, np.ndarray):
-                if X.ndim == 2 and X.shape[1] == 1:
-                    texts = X.flatten().tolist()
-                elif X.ndim == 1:
-                    texts = X.tolist()
-                else:
-                    texts = X
-            elif isinstance(X, list):
-                if X and isinstance(X[0], list):
-                    texts = [item[0] if isinstance(item, list) else item for item in X]
-                else:
-                    texts = X
-            else:
-                texts = X
+        if self.profile_trigger_enabled:
+            self._maybe_start_profile(meta)
 
-            # Get probabilities
-            probabilities = self.model.predict_proba(texts)
+        try:
+            with tracer.span("model.predict_proba", traceparent=_request_tag(meta, TRACEPARENT)):
+                probabilities = self._score("predict_proba", X, self._explain_top_k(meta))
 
-            logger.info(f"Probability predictions shape: {probabilities.shape}")
+            logger.debug(f"Probability predictions shape: {probabilities.shape}")
             return probabilities
 
         except Exception as e:
             logger.error(f"Probability prediction failed: {e}", exc_info=True)
             raise
 
+    def explain(
+        self,
+        X: NDArray | list | list[str],
+        features_names: list[str] | None = None,
+        meta: dict[str, Any] | None = None,
+        top_k: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Predict with the n-grams that contributed most to each class.
+
+        A contribution is the n-gram's TF-IDF value times the class coefficient, taken
+        from the products the scores are summed from, so this costs one sort of each
+        text's non-zero terms on top of predict_proba().
+
+        Args:
+            X: Input data (same format as predict())
+            features_names: Feature names (not used but part of Seldon interface)
+            meta: Seldon request metadata (same as predict())
+            top_k: N-grams per text and class (default EXPLAIN_TOP_K)
+
+        Returns:
+            {"classes": [...], "labels": [...], "probabilities": [[...]],
+            "explanations": [{class: {"terms": [...], "weights": [...]}}]}
+        """
+        if not self.ready or self.model is None:
+            raise RuntimeError("Model not loaded")
+
+        with tracer.span("model.explain", traceparent=_request_tag(meta, TRACEPARENT)):
+            probabilities = self._score("predict_proba", X, top_k or self.explain_top_k)
+        classes = self._explanation_model().classes_
+        return {
+            "classes": [str(label) for label in classes],
+            "labels": [str(label) for label in classes[probabilities.argmax(axis=1)]],
+            "probabilities": probabilities.tolist(),
+            "explanations": self._last_request.explanation,
+        }
+
+    def _explain_top_k(self, meta: dict[str, Any] | None) -> int | None:
+        """
+        Read the explain tag of a request. Values that are not an integer are logged and
+        ignored, so they never fail the request, and numbers are clamped to
+        [1, EXPLAIN_MAX_TOP_K].
+
+        Args:
+            meta: Seldon request metadata
+
+        Returns:
+            N-grams to report per text and class, or None when no explanation was asked for
+        """
+        value = _request_tag(meta, EXPLAIN_TAG)
+        if value is None or value.lower() in ("false", "0"):
+            return None
+        if value.lower() == "true":
+            return self.explain_top_k
+        try:
+            top_k = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {EXPLAIN_TAG} tag: {value!r}")
+            return None
+        return min(max(top_k, 1), self.explain_max_top_k)
+
+    def _response_encoding(self, meta: dict[str, Any] | None) -> str:
+        """
+        Read the encoding tag of a request.
+
+        Args:
+            meta: Seldon request metadata
+
+        Returns:
+            "labels" (the default), "ids" or "proba"
+
+        Raises:
+            ValueError: If the tag names another encoding
+        """
+        encoding = (_request_tag(meta, ENCODING_TAG) or "labels").lower()
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+        return encoding
+
+    def _explanation_model(self) -> ServingPipeline:
+        """
+        Return the served model as a ServingPipeline, converting an sklearn pipeline once.
+
+        Raises:
+            ValueError: If the served model exposes no linear coefficients (ONNX)
+        """
+        if self._explainer is None:
+            if not hasattr(self.model, "named_steps"):
+                raise ValueError("Explanations require a .npz or sklearn model (MODEL_PATH)")
+            self._explainer = ServingPipeline.from_sklearn(self.model)
+            self.input_limits.configure(self._explainer.featurizer)
+        return self._explainer
+
+    def _maybe_start_profile(self, meta: dict[str, Any] | None) -> None:
+        """
+        Start a profiling session if the request carries a profile_seconds tag.
+        Invalid durations are logged and ignored, so they never fail the request, and
+        long ones are clamped to PROFILE_MAX_SECONDS.
+
+        Args:
+            meta: Seldon request metadata
+        """
+        tag = _request_tag(meta, PROFILE_TAG)
+        if tag is None:
+            return
+        try:
+            seconds = float(tag)
+        except ValueError:
+            seconds = math.nan
+        if not math.isfinite(seconds) or seconds <= 0:
+            logger.warning(f"Ignoring invalid {PROFILE_TAG} tag: {tag!r}")
+            return
+        if start_profile(min(seconds, self.profile_max_seconds)) is None:
+            logger.info("Profiling already in progress, ignoring trigger")
+
+    def _score(
+        self, method: str, X: NDArray | list | list[str] | dict, explain_top_k: int | None = None
+    ) -> NDArray:
+        """
+        Score a request payload of raw texts or pre-featurized rows.
+
+        Args:
+            method: Final estimator method to call ("predict" or "predict_proba")
+            X: Input data (same format as predict())
+            explain_top_k: Also explain the scores with this many n-grams per class,
+                kept for tags()
+
+        Returns:
+            Output of the final estimator
+        """
+        start = time.perf_counter()
+        self._last_request.explanation = None
+        self._last_request.lanes = []
+        self._last_request.classes = None
+        texts = None
+        if is_feature_payload(X):
+            result = self._score_features(method, X, explain_top_k)
+            cost: dict[str, Any] = {"rows": len(result)}
+        else:
+            texts, n_cut = self.input_limits.truncate(self._decode_input(X))
+            with track_cost() as featurized:
+                if explain_top_k:
+                    result = self._explain_texts(method, texts, explain_top_k)
+                else:
+                    result = self._run_pipeline(method, texts)
+            cost = {"rows": len(texts), "truncated_chars": n_cut}
+            # Token counts are only seen when the NumPy featurizer ran in this thread
+            if featurized.texts:
+                cost.update(
+                    chars=featurized.chars,
+                    tokens=featurized.tokens,
+                    truncated_tokens=featurized.truncated,
+                )
+        cost["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._last_request.cost = cost
+        # Rows featurized upstream carry no texts; the UI's log records those requests
+        if texts is not None:
+            request_log.log(
+                texts,
+                result,
+                classes=self.model.classes_ if result.ndim == 2 else None,
+                method=method,
+                latency_ms=cost["elapsed_ms"],
+            )
+        return result
+
+    def _score_features(
+        self, method: str, payload: dict[str, Any], explain_top_k: int | None = None
+    ) -> NDArray:
+        """
+        Score rows featurized upstream, as the MODEL node of the two-node graph.
+
+        Args:
+            method: Scorer method to call ("predict" or "predict_proba")
+            payload: jsonData written by the SentimentFeaturizer transformer
+            explain_top_k: Also explain the scores (see `_score`)
+
+        Returns:
+            Output of the linear scorer
+
+        Raises:
+            ValueError: If the model cannot score rows or was trained on another vocabulary
+        """
+        if not isinstance(self.model, ServingPipeline):
+            raise ValueError("Featurized input requires a .npz serving model (MODEL_PATH)")
+        rows, fingerprint = decode_features(payload, self.model.dtype)
+        if fingerprint != self.feature_fingerprint:
+            raise ValueError(
+                f"Features from featurizer {fingerprint} do not match this model's "
+                f"featurizer {self.feature_fingerprint}"
+            )
+        with tracer.span("model.classifier", rows=rows.n_rows):
+            if explain_top_k:
+                probabilities, explanations = self.model.explain_rows(rows, explain_top_k)
+                result = self._explained_output(method, probabilities, explanations)
+            else:
+                result = getattr(self.model.scorer, method)(rows)
+        if self.shadow is not None:
+            self.shadow.submit(rows, result)
+        return result
+
+    def _explain_texts(self, method: str, texts: Any, top_k: int) -> NDArray:
+        """
+        Score texts and explain the scores in the same pass.
+
+        Args:
+            method: Output to return ("predict" or "predict_proba")
+            texts: Decoded input texts
+            top_k: N-grams per text and class
+
+        Returns:
+            Labels or probabilities, as the pipeline method would return them
+        """
+        explainer = self._explanation_model()
+        with tracer.span("model.explain", rows=len(texts)):
+            rows = explainer.featurizer.transform(texts)
+            probabilities, explanations = explainer.explain_rows(rows, top_k)
+        if self.shadow is not None:
+            self.shadow.submit(rows, probabilities)
+        return self._explained_output(method, probabilities, explanations)
+
+    def _explained_output(
+        self, method: str, probabilities: NDArray, explanations: list[dict[str, Any]]
+    ) -> NDArray:
+        """Keep the explanations for tags() and return the requested output."""
+        self._last_request.explanation = explanations
+        if method == "predict_proba":
+            return probabilities
+        return np.asarray(self._explanation_model().classes_)[probabilities.argmax(axis=1)]
+
+    def _decode_input(self, X: NDArray | list | list[str]) -> Any:
+        """
+        Convert a Seldon payload into the list of texts the pipeline expects.
+
+        Args:
+            X: Input data (same format as predict())
+
+        Returns:
+            Texts to score
+        """
+        with tracer.span("model.decode_input"):
+            return decode_texts(X)
+
+    def _run_pipeline(self, method: str, texts: Any) -> NDArray:
+        """
+        Run the pipeline through the length lanes if enabled, or else as one batch.
+
+        Args:
+            method: Final estimator method to call ("predict" or "predict_proba")
+            texts: Decoded input texts
+
+        Returns:
+            Output of the final estimator
+        """
+        if self.lanes is not None:
+            with tracer.span("model.lanes", rows=len(texts)):
+                result, self._last_request.lanes = self.lanes.run(method, texts)
+            return result
+        return self._run_batch(method, texts)
+
+    def _run_batch(self, method: str, texts: Any, traced: bool = True) -> NDArray:
+        """
+        Score one batch, in parallel chunks if it is large, timing each step separately
+        when tracing is enabled. The rows of batches scored in this thread are passed on
+        to the challengers. Lane workers call this for each lane batch.
+
+        Args:
+            method: Final estimator method to call ("predict" or "predict_proba")
+            texts: Decoded input texts
+            traced: Record spans; off in lane threads, which have no request trace
+
+        Returns:
+            Output of the final estimator
+        """
+        assert self.model is not None
+        traced = traced and tracer.enabled
+
+        def span(name: str, **attributes: Any) -> AbstractContextManager[Any]:
+            return tracer.span(name, **attributes) if traced else nullcontext()
+
+        if self.batch_runner.should_split(len(texts)):
+            # The pool workers featurize these rows, so challengers cannot reuse them
+            if self.shadow is not None:
+                self.shadow.skip(len(texts))
+            with span("model.parallel", rows=len(texts), workers=self.batch_runner.workers):
+                return self.batch_runner.run(method, texts)
+
+        if self.shadow is None and (not traced or not hasattr(self.model, "steps")):
+            return getattr(self.model, method)(texts)
+
+        features = texts
+        for name, step in self.model.steps[:-1]:
+            with span(f"model.{name}"):
+                features = step.transform(features)
+
+        name, estimator = self.model.steps[-1]
+        with span(f"model.{name}"):
+            result = getattr(estimator, method)(features)
+        if self.shadow is not None:
+            self.shadow.submit(features, result)
+        return result
+
+    def metrics(self) -> list[dict[str, Any]]:
+        """
+        Report how the request just handled by this thread fared in each length lane.
+
+        Returns:
+            Seldon custom metrics tagged by lane (none when lanes are disabled)
+        """
+        return seldon_metrics(getattr(self._last_request, "lanes", []))
+
+    def tags(self) -> dict[str, Any]:
+        """
+        Report the cost, and explanations if asked for, of the request just handled by
+        this thread.
+        Seldon calls this right after predict() and adds the result to the response meta.
+
+        Returns:
+            Response tags: {"cost": {...}} once a request has been scored, plus
+            {"explanation": [...]} for requests tagged "explain" and {"classes_": [...]},
+            the labels of the ids or probability columns, for encoded responses
+        """
+        tags: dict[str, Any] = {}
+        cost = getattr(self._last_request, "cost", None)
+        if cost:
+            tags["cost"] = cost
+        explanation = getattr(self._last_request, "explanation", None)
+        if explanation is not None:
+            tags["explanation"] = explanation
+        classes = getattr(self._last_request, "classes", None)
+        if classes is not None:
+            tags[CLASSES_TAG] = [str(label) for label in classes]
+        return tags
+
     def health_status(self) -> dict[str, Any]:
         """
         Return health status.
 
         Returns:
-            Health status dictionary
+            Health status dictionary, with the challengers' agreement stats when
+            CHALLENGER_MODEL_PATHS is set and per-lane stats when LANE_BOUNDS is set
         """
-        return {"ready": self.ready, "model_loaded": self.model is not None}
+        status: dict[str, Any] = {"ready": self.ready, "model_loaded": self.model is not None}
+        if self.shadow is not None:
+            status.update(self.shadow.stats())
+        if self.lanes is not None:
+            status.update(self.lanes.stats())
+        return status
+
+
+def _request_tag(meta: dict[str, Any] | None, key: str) -> str | None:
+    """
+    Read a tag from Seldon request metadata.
+
+    Args:
+        meta: Seldon request metadata
+        key: Tag name, e.g. "traceparent"
+
+    Returns:
+        Tag value as a string, or None if the caller did not send it
+    """
+    if not meta:
+        return None
+    tags = meta.get("tags") or {}
+    value = tags.get(key)
+    return str(value) if value else None
@@ -0,0 +1,211 @@
+"""
+Seldon message payloads shared by the model wrapper and the featurizer transformer.
+
+In the two-node inference graph the TRANSFORMER sends TF-IDF rows to the MODEL as Seldon
+``jsonData``. Rows travel in CSR form, with the arrays base64-encoded as little-endian
+int32 indices and float32 weights. That is about 10 bytes per non-zero term, where a
+dense ``ndarray`` of the vocabulary would take several bytes per column.
+
+Both nodes also apply the same `InputLimits` to the texts they receive.
+
+Responses can be encoded compactly on request: with the meta tag ``encoding`` set to
+``ids``, predict() returns int32 class ids, and with ``proba`` a contiguous float matrix
+of probabilities. In both cases the labels are sent once, as the ``classes_`` response
+tag, instead of a Python string per row. Seldon answers in the data type of the request,
+so a client that sends its texts as a ``tensor`` gets these arrays back as a flat tensor.
+"""
+
+import base64
+import os
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from serving_pipeline import DEFAULT_WINDOW_CHARS, SparseRows, TfidfFeaturizer
+
+# jsonData key holding featurized rows
+FEATURES_KEY = "tfidf_csr"
+
+# Request tag choosing the predict() output, and the response tag holding the labels
+ENCODING_TAG = "encoding"
+CLASSES_TAG = "classes_"
+ENCODINGS = ("labels", "ids", "proba")
+
+
+class InputLimits:
+    """Per-text bounds that keep the cost of one request proportional to its row count."""
+
+    def __init__(
+        self,
+        max_chars: int | None = 100000,
+        max_tokens: int | None = 20000,
+        window_chars: int = DEFAULT_WINDOW_CHARS,
+    ) -> None:
+        """
+        Initialize the limits.
+
+        Args:
+            max_chars: Characters kept per text (None: no cap)
+            max_tokens: Tokens turned into n-grams per text (None: no cap)
+            window_chars: Texts longer than this are featurized in streaming windows
+        """
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+        self.window_chars = window_chars
+
+    @classmethod
+    def from_env(cls) -> "InputLimits":
+        """
+        Read limits from MAX_INPUT_CHARS, MAX_INPUT_TOKENS and FEATURIZE_WINDOW_CHARS,
+        where 0 disables a cap.
+
+        Returns:
+            Configured InputLimits
+        """
+        max_chars = int(os.getenv("MAX_INPUT_CHARS", "100000"))
+        max_tokens = int(os.getenv("MAX_INPUT_TOKENS", "20000"))
+        return cls(
+            max_chars=max_chars or None,
+            max_tokens=max_tokens or None,
+            window_chars=int(os.getenv("FEATURIZE_WINDOW_CHARS", str(DEFAULT_WINDOW_CHARS))),
+        )
+
+    def configure(self, featurizer: TfidfFeaturizer) -> None:
+        """
+        Apply the token cap and window size to a featurizer.
+
+        Args:
+            featurizer: Featurizer of the served model
+        """
+        featurizer.max_tokens = self.max_tokens
+        featurizer.window_chars = self.window_chars
+
+    def truncate(self, texts: Any) -> tuple[Any, int]:
+        """
+        Cut texts to `max_chars` characters.
+
+        Args:
+            texts: Decoded request texts
+
+        Returns:
+            Tuple of (texts, number of texts that were cut)
+        """
+        max_chars = self.max_chars
+        if max_chars is None or not isinstance(texts, list):
+            return texts, 0
+        n_cut = sum(1 for text in texts if isinstance(text, str) and len(text) > max_chars)
+        if n_cut:
+            texts = [text[:max_chars] if isinstance(text, str) else text for text in texts]
+        return texts, n_cut
+
+
+def decode_texts(X: NDArray | list | list[str]) -> Any:
+    """
+    Convert a Seldon payload into the list of texts the pipeline expects.
+
+    Args:
+        X: Input data - numpy array of shape (n_samples, 1) or (n_samples,),
+           a list of strings, or a list of single-item lists
+
+    Returns:
+        Texts to score
+    """
+    # Handle different input formats
+    if isinstance(X, np.ndarray):
+        # If 2D array with shape (n_samples, 1), flatten to get text strings
+        if X.ndim == 2 and X.shape[1] == 1:
+            return X.flatten().tolist()
+        if X.ndim == 1:
+            return X.tolist()
+        # Already in the right format
+        return X
+    if isinstance(X, list):
+        # If list of lists (from JSON), extract the strings
+        if X and isinstance(X[0], list):
+            return [item[0] if isinstance(item, list) else item for item in X]
+        return X
+    return X
+
+
+def is_feature_payload(X: Any) -> bool:
+    """
+    Check whether a request carries featurized rows rather than texts.
+
+    Args:
+        X: Request data as passed to predict()
+
+    Returns:
+        True for jsonData produced by `encode_features`
+    """
+    return isinstance(X, dict) and FEATURES_KEY in X
+
+
+def encode_features(rows: SparseRows, fingerprint: str) -> dict[str, Any]:
+    """
+    Serialize TF-IDF rows as Seldon jsonData.
+
+    Args:
+        rows: Featurized rows
+        fingerprint: Featurizer fingerprint, checked by the receiving model
+
+    Returns:
+        JSON-serializable payload
+    """
+    return {
+        FEATURES_KEY: {
+            "shape": [rows.n_rows, rows.n_features],
+            "fingerprint": fingerprint,
+            "indptr": _b64(rows.indptr, "<i4"),
+            "indices": _b64(rows.indices, "<i4"),
+            "data": _b64(rows.data, "<f4"),
+        }
+    }
+
+
+def decode_features(payload: dict[str, Any], dtype: Any = np.float64) -> tuple[SparseRows, str]:
+    """
+    Deserialize rows written by `encode_features`.
+
+    Args:
+        payload: jsonData received by the model
+        dtype: Data type of the decoded feature values, that of the receiving model
+
+    Returns:
+        Tuple of (rows, featurizer fingerprint)
+    """
+    features = payload[FEATURES_KEY]
+    _, n_features = features["shape"]
+    rows = SparseRows(
+        indptr=_from_b64(features["indptr"], "<i4").astype(np.int64),
+        indices=_from_b64(features["indices"], "<i4").astype(np.int64),
+        data=_from_b64(features["data"], "<f4").astype(dtype),
+        n_features=int(n_features),
+    )
+    return rows, str(features["fingerprint"])
+
+
+def _b64(array: NDArray, dtype: str) -> str:
+    """Encode an array's values as base64 text."""
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode("ascii")
+
+
+def _from_b64(text: str, dtype: str) -> NDArray:
+    """Decode base64 text written by `_b64`."""
+    return np.frombuffer(base64.b64decode(text), dtype=dtype)
+
+
+def encode_output(probabilities: NDArray[np.floating], encoding: str) -> NDArray:
+    """
+    Encode predicted probabilities for a compact response.
+
+    Args:
+        probabilities: Array of shape (n_samples, n_classes)
+        encoding: "ids" for int32 class ids, "proba" for the probabilities themselves
+
+    Returns:
+        Contiguous numeric array
+    """
+    if encoding == "ids":
+        return probabilities.argmax(axis=1).astype(np.int32)
+    return np.ascontiguousarray(probabilities)
@@ -3,16 +3,34 @@ FastAPI application for sentiment analysis UI.
 This app provides a web interface and calls the Seldon Core v1 inference API.
 """
 
+import asyncio
+import gzip
+import hashlib
+import json
 import logging
 import os
+import sys
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Any
 
 import httpx
+import numpy as np
 from dotenv import load_dotenv
-from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
+# Add src to path so sibling modules resolve however the app is launched
+sys.path.insert(0, str(Path(__file__).parent))
+
+from batch_jobs import BatchJobRunner, JobNotFoundError, follow_job, parse_texts
+from request_log import RequestLogger
+from seldon_payload import CLASSES_TAG, ENCODING_TAG, ENCODINGS
+from tracing import TRACEPARENT, Tracer
+
 # Load environment variables
 load_dotenv()
 
@@ -20,15 +38,11 @@ load_dotenv()
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Sentiment Analyzer",
-    description="Sentiment analysis using Seldon Core v1",
-    version=os.getenv("APP_VERSION", "0.1.0"),
-)
+# Spans are only recorded when TRACE_EXPORT_PATH is set
+tracer = Tracer.from_env("sentiment-analyzer-ui")
 
-# Set up templates
-templates = Jinja2Templates(directory="src/templates")
+# Sampled texts and predictions, written off the request path when REQUEST_LOG_DIR is set
+request_log = RequestLogger.from_env("ui")
 
 # Seldon Core configuration
 SELDON_HOST = os.getenv("SELDON_HOST", "localhost")
@@ -39,108 +53,400 @@ SELDON_NAMESPACE = os.getenv("SELDON_NAMESPACE", "seldon")
 # Construct Seldon API URL (Seldon Core v1 format)
 SELDON_API_URL = f"http://{SELDON_HOST}:{SELDON_PORT}/api/v1.0/predictions"
 
+# Connection pool limits for the per-process Seldon client
+SELDON_MAX_CONNECTIONS = int(os.getenv("SELDON_MAX_CONNECTIONS", "100"))
+SELDON_MAX_KEEPALIVE = int(os.getenv("SELDON_MAX_KEEPALIVE", "20"))
+SELDON_TIMEOUT = float(os.getenv("SELDON_TIMEOUT", "30.0"))
 
-@app.get("/", response_class=HTMLResponse)
-async def home(request: Request) -> HTMLResponse:
+# Model output to ask for: "labels" (strings), or compact "ids" / "proba" tensors
+SELDON_RESPONSE_ENCODING = os.getenv("SELDON_RESPONSE_ENCODING", "labels").lower()
+if SELDON_RESPONSE_ENCODING not in ENCODINGS:
+    raise ValueError(f"SELDON_RESPONSE_ENCODING must be one of {ENCODINGS}")
+
+# Shared Seldon client; each worker process owns one connection pool
+_http_client: httpx.AsyncClient | None = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client used to call Seldon.
+
+    Returns:
+        Configured AsyncClient
+    """
+    limits = httpx.Limits(
+        max_connections=SELDON_MAX_CONNECTIONS,
+        max_keepalive_connections=SELDON_MAX_KEEPALIVE,
+    )
+    return httpx.AsyncClient(timeout=SELDON_TIMEOUT, limits=limits)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return this process's Seldon client, creating it if the lifespan hook has not run.
+
+    Returns:
+        Shared AsyncClient
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Open the Seldon connection pool on startup and close it after the server drains.
+
+    Args:
+        app: FastAPI application
+    """
+    get_http_client()
+    # Jobs left unfinished by a previous run continue where they stopped
+    job_runner.resume()
+    yield
+    await job_runner.shutdown()
+    await asyncio.to_thread(request_log.flush)
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="Sentiment Analyzer",
+    description="Sentiment analysis using Seldon Core v1",
+    version=os.getenv("APP_VERSION", "0.1.0"),
+    lifespan=lifespan,
+)
+
+# Set up templates
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+STATIC_DIR = Path(__file__).parent / "static"
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+# Browser cache lifetime for the home page (static assets are versioned and immutable)
+HOME_CACHE_MAX_AGE = int(os.getenv("HOME_CACHE_MAX_AGE", "300"))
+
+# Longest text /analyze accepts (0 disables the check). Form bodies are rejected from
+# their Content-Length before parsing: a percent-encoded character takes at most 12 bytes.
+ANALYZE_MAX_CHARS = int(os.getenv("ANALYZE_MAX_CHARS", "10000"))
+ANALYZE_MAX_BODY_BYTES = 12 * ANALYZE_MAX_CHARS + 4096
+
+# Batch jobs (/jobs): largest submission, and how often result streams check for new chunks
+BATCH_JOB_MAX_TEXTS = int(os.getenv("BATCH_JOB_MAX_TEXTS", "200000"))
+BATCH_JOB_MAX_BYTES = int(os.getenv("BATCH_JOB_MAX_BYTES", str(100 * 2**20)))
+BATCH_JOB_POLL_INTERVAL = float(os.getenv("BATCH_JOB_POLL_INTERVAL", "0.25"))
+
+
+def accepts_gzip(request: Request) -> bool:
     """
-    Render the home page with the sentiment analysis form.
+    Check whether Accept-Encoding allows a gzip response.
 
     Args:
         request: FastAPI request object
 
     Returns:
-        HTML response
+        True if gzip (or ``*``) is listed with a non-zero q-value
     """
-    return templates.TemplateResponse("index.html", {"request": request, "result": None})
+    qualities = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check If-None-Match against an ETag, with the weak comparison it calls for.
 
+    Args:
+        request: FastAPI request object
+        etag: Strong ETag of the response, quoted
 
-@app.post("/analyze", response_class=HTMLResponse)
-async def analyze_sentiment(request: Request, text: str = Form("")) -> HTMLResponse:
+    Returns:
+        True if the header is ``*`` or lists the ETag, with or without ``W/``
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+class PrecompressedAsset:
+    """
+    An in-memory response body that is rendered and gzip-compressed once at startup.
+    Served with an ETag per encoding so repeat visitors get a 304 instead of the body.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str) -> None:
+        """
+        Initialize the asset.
+
+        Args:
+            body: Uncompressed response body
+            media_type: Content type of the body
+            cache_control: Cache-Control header value
+        """
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9)
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{self.digest}"'
+        self.gzip_etag = f'"{self.digest}-gz"'
+        self.cache_control = cache_control
+
+    def response(self, request: Request) -> Response:
+        """
+        Build a response for the asset, honouring If-None-Match and Accept-Encoding.
+
+        Args:
+            request: FastAPI request object
+
+        Returns:
+            Response with the (possibly compressed) body, or 304 Not Modified
+        """
+        compress = accepts_gzip(request)
+        etag = self.gzip_etag if compress else self.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+# Static stylesheet, addressed by content hash so browsers can cache it forever
+STYLESHEET = PrecompressedAsset(
+    (STATIC_DIR / "style.css").read_bytes(),
+    media_type="text/css",
+    cache_control="public, max-age=31536000, immutable",
+)
+STYLESHEET_URL = f"/static/style.css?v={STYLESHEET.digest}"
+
+# Compile the page template once; every response renders the same Template object
+index_template = templates.get_template("index.html")
+
+
+def render_index(
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+    input_text: str | None = None,
+    explain: bool = False,
+) -> str:
     """
-    Analyze sentiment of the provided text.
+    Render the index page with the precompiled template.
+
+    Args:
+        result: Prediction result to display
+        error: Error message to display
+        input_text: Text submitted by the user
+        explain: Whether the "explain" box was ticked
+
+    Returns:
+        Rendered HTML
+    """
+    return index_template.render(
+        result=result,
+        error=error,
+        input_text=input_text,
+        explain=explain,
+        stylesheet_url=STYLESHEET_URL,
+    )
+
+
+# The home page has no per-request state, so it is rendered exactly once
+HOME_PAGE = PrecompressedAsset(
+    render_index().encode("utf-8"),
+    media_type="text/html; charset=utf-8",
+    cache_control=f"public, max-age={HOME_CACHE_MAX_AGE}",
+)
+
+
+def wants_json(request: Request) -> bool:
+    """
+    Check whether the client asked for a JSON response instead of HTML.
 
     Args:
         request: FastAPI request object
-        text: Text to analyze
 
     Returns:
-        HTML response with analysis result
+        True if the Accept header prefers application/json
     """
-    if not text or not text.strip():
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "result": None, "error": "Please enter some text to analyze."},
-        )
+    return "application/json" in request.headers.get("accept", "")
 
-    try:
-        # Call Seldon Core API
-        logger.info(f"Analyzing text: {text[:50]}...")
-        prediction = await call_seldon_api(text)
 
-        logger.info(f"Prediction: {prediction}")
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request) -> Response:
+    """
+    Serve the pre-rendered home page with the sentiment analysis form.
 
-        return templates.TemplateResponse(
-            "index.html", {"request": request, "result": prediction, "input_text": text}
-        )
+    Args:
+        request: FastAPI request object
 
-    except Exception as e:
-        logger.error(f"Error during analysis: {e}")
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "result": None,
-                "error": f"Error analyzing sentiment: {str(e)}",
-                "input_text": text,
-            },
-        )
+    Returns:
+        HTML response
+    """
+    return HOME_PAGE.response(request)
+
+
+@app.get("/static/style.css")
+async def stylesheet(request: Request) -> Response:
+    """
+    Serve the precompressed stylesheet.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        CSS response
+    """
+    return STYLESHEET.response(request)
+
+
+@app.post("/analyze", response_class=HTMLResponse)
+async def analyze_sentiment(request: Request) -> Response:
+    """
+    Analyze sentiment of the text submitted in the form's ``text`` field.
+    A truthy ``explain`` field adds the n-grams that contributed most to each class.
+    Clients sending ``Accept: application/json`` get the prediction as JSON and
+    skip template rendering entirely.
 
+    Args:
+        request: FastAPI request object
 
-async def call_seldon_api(text: str) -> dict[str, Any]:
+    Returns:
+        HTML response with analysis result, or JSON if requested
+    """
+    with tracer.span("ui.analyze", traceparent=request.headers.get(TRACEPARENT)):
+        json_response = wants_json(request)
+        too_long = f"Text is too long; the limit is {ANALYZE_MAX_CHARS} characters."
+
+        content_length = request.headers.get("content-length", "")
+        if (
+            ANALYZE_MAX_CHARS
+            and content_length.isdigit()
+            and int(content_length) > ANALYZE_MAX_BODY_BYTES
+        ):
+            if json_response:
+                return JSONResponse({"error": too_long}, status_code=413)
+            return HTMLResponse(render_index(error=too_long), status_code=413)
+
+        # Parse the form here rather than via Form() so it is timed as its own stage
+        with tracer.span("ui.form_parse"):
+            form = await request.form()
+            text = str(form.get("text") or "")
+            explain = str(form.get("explain") or "").lower() in ("1", "true", "on")
+
+        if not text or not text.strip():
+            error = "Please enter some text to analyze."
+            if json_response:
+                return JSONResponse({"error": error}, status_code=400)
+            return HTMLResponse(render_index(error=error, explain=explain))
+
+        if ANALYZE_MAX_CHARS and len(text) > ANALYZE_MAX_CHARS:
+            if json_response:
+                return JSONResponse({"error": too_long}, status_code=413)
+            return HTMLResponse(
+                render_index(error=too_long, input_text=text[:ANALYZE_MAX_CHARS], explain=explain),
+                status_code=413,
+            )
+
+        try:
+            # Call Seldon Core API
+            start = time.perf_counter()
+            prediction = await call_seldon_api(text, explain=explain)
+            latency_ms = round((time.perf_counter() - start) * 1000, 3)
+            request_log.log(
+                [text], [prediction["sentiment"]], [prediction["confidence"]], latency_ms=latency_ms
+            )
+            logger.debug(f"Prediction: {prediction}")
+
+            if json_response:
+                return JSONResponse(prediction)
+            with tracer.span("ui.render"):
+                return HTMLResponse(
+                    render_index(result=prediction, input_text=text, explain=explain)
+                )
+
+        except Exception as e:
+            logger.error(f"Error during analysis: {e}")
+            if json_response:
+                status_code = e.status_code if isinstance(e, HTTPException) else 500
+                return JSONResponse(
+                    {"error": f"Error analyzing sentiment: {str(e)}"}, status_code=status_code
+                )
+            return HTMLResponse(
+                render_index(
+                    error=f"Error analyzing sentiment: {str(e)}", input_text=text, explain=explain
+                )
+            )
+
+
+async def call_seldon_api(text: str, explain: bool = False) -> dict[str, Any]:
     """
     Call the Seldon Core v1 API.
 
     Args:
         text: Text to analyze
+        explain: Ask the model for the n-grams behind the prediction (meta tag "explain")
 
     Returns:
-        Dictionary with prediction results
+        Dictionary with prediction results, plus an "explanation" mapping each class to
+        its top {"terms": [...], "weights": [...]} when requested
 
     Raises:
         HTTPException: If the API call fails
     """
-    # Prepare Seldon Core v1 request payload
-    # Format: {"data": {"ndarray": [["text"]]}}
-    payload = {"data": {"ndarray": [[text]]}}
+    payload, request_tags = seldon_request([text])
+    if explain:
+        # The model computes explanations in the same pass and returns them in meta.tags
+        request_tags["explain"] = "true"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(SELDON_API_URL, json=payload)
+        client = get_http_client()
+        with tracer.span("ui.seldon_call"):
+            # Propagate the trace to Seldon's executor (header) and the model (meta tag)
+            headers = {}
+            traceparent = tracer.current_traceparent()
+            if traceparent:
+                headers[TRACEPARENT] = traceparent
+                request_tags[TRACEPARENT] = traceparent
+            if request_tags:
+                payload["meta"] = {"tags": request_tags}
+
+            response = await client.post(SELDON_API_URL, json=payload, headers=headers)
             response.raise_for_status()
 
-            # Parse Seldon response
-            result = response.json()
-            logger.debug(f"Seldon API response: {result}")
-
-            # Extract prediction from Seldon Core v1 format
-            # Response: {"data": {"ndarray": [["positive", 0.95]]}}
-            # or {"names": [...], "ndarray": [[...]]}
-            data = result.get("data", {})
-            ndarray = data.get("ndarray", [])
-
-            if ndarray and len(ndarray) > 0:
-                prediction_data = ndarray[0]
-                if isinstance(prediction_data, list) and len(prediction_data) >= 2:
-                    sentiment = prediction_data[0]
-                    confidence = float(prediction_data[1])
-                else:
-                    sentiment = str(prediction_data[0]) if prediction_data else "unknown"
-                    confidence = 0.0
-            else:
-                sentiment = "unknown"
-                confidence = 0.0
+        # Parse Seldon response
+        result = response.json()
+        logger.debug(f"Seldon API response: {result}")
 
-            return {"sentiment": sentiment, "text": text, "confidence": confidence}
+        rows = decode_seldon_response(result)
+        prediction = {"text": text, **(rows[0] if rows else parse_prediction(None))}
+        explanation = ((result.get("meta") or {}).get("tags") or {}).get("explanation")
+        if explain and explanation:
+            prediction["explanation"] = explanation[0]
+        return prediction
 
     except httpx.HTTPStatusError as e:
         logger.error(f"Seldon API returned error: {e}")
@@ -155,6 +461,273 @@ async def call_seldon_api(text: str) -> dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") from e
 
 
+def seldon_request(
+    texts: list[str], encoding: str | None = None
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Build a Seldon Core v1 request for texts.
+
+    Labels are asked for as {"data": {"ndarray": [["text"], ...]}}. For the compact
+    encodings the texts are sent as a tensor, so Seldon returns the model's numeric output
+    as a flat tensor too, and the "encoding" tag tells the model what to return.
+
+    Args:
+        texts: Texts to analyze
+        encoding: "labels", "ids" or "proba" (default SELDON_RESPONSE_ENCODING)
+
+    Returns:
+        Tuple of (payload, its request tags, to be extended and sent as meta.tags)
+    """
+    encoding = encoding or SELDON_RESPONSE_ENCODING
+    if encoding == "labels":
+        return {"data": {"ndarray": [[text] for text in texts]}}, {}
+    payload = {"data": {"tensor": {"shape": [len(texts), 1], "values": texts}}}
+    return payload, {ENCODING_TAG: encoding}
+
+
+def decode_seldon_response(result: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Read the predictions of a Seldon Core v1 response, in any of its encodings.
+
+    Args:
+        result: Response JSON, with "ndarray" or "tensor" data. With a "classes_" tag in
+            meta.tags, the data holds class ids (one per text) or probabilities (one row
+            per text, a column per class); otherwise label rows (see parse_prediction)
+
+    Returns:
+        One {"sentiment": ..., "confidence": ...} per text
+    """
+    data = result.get("data") or {}
+    classes = ((result.get("meta") or {}).get("tags") or {}).get(CLASSES_TAG)
+    if classes is None:
+        return [parse_prediction(row) for row in data.get("ndarray", [])]
+
+    labels = np.asarray(classes)
+    if "tensor" in data:
+        values = np.asarray(data["tensor"]["values"]).reshape(data["tensor"]["shape"])
+    else:
+        values = np.asarray(data.get("ndarray", []))
+    if values.ndim == 2 and values.shape[1] == len(labels):
+        ids, confidences = values.argmax(axis=1), values.max(axis=1).astype(float).tolist()
+    else:
+        ids, confidences = values.reshape(-1).astype(np.int64), [0.0] * values.size
+    return [
+        {"sentiment": sentiment, "confidence": confidence}
+        for sentiment, confidence in zip(labels[ids].tolist(), confidences, strict=True)
+    ]
+
+
+def parse_prediction(row: Any) -> dict[str, Any]:
+    """
+    Read one row of a Seldon Core v1 ``ndarray`` response.
+
+    Args:
+        row: A label ("positive"), a [label] or [label, confidence] list, or None
+
+    Returns:
+        {"sentiment": ..., "confidence": ...}, with confidence 0.0 when not returned
+    """
+    # Response: {"data": {"ndarray": ["positive", ...]}}
+    # or {"data": {"ndarray": [["positive", 0.95], ...]}}
+    if isinstance(row, list) and len(row) >= 2:
+        return {"sentiment": row[0], "confidence": float(row[1])}
+    if isinstance(row, list):
+        row = row[0] if row else None
+    return {"sentiment": str(row) if row is not None else "unknown", "confidence": 0.0}
+
+
+async def call_seldon_batch(texts: list[str]) -> list[dict[str, Any]]:
+    """
+    Score several texts with one Seldon Core v1 call.
+    Errors propagate, so the batch job runner can retry the chunk.
+
+    Args:
+        texts: Texts to analyze
+
+    Returns:
+        One {"sentiment": ..., "confidence": ...} per text
+    """
+    payload, request_tags = seldon_request(texts)
+    client = get_http_client()
+    with tracer.span("ui.seldon_batch_call", rows=len(texts)):
+        headers = {}
+        traceparent = tracer.current_traceparent()
+        if traceparent:
+            headers[TRACEPARENT] = traceparent
+            request_tags[TRACEPARENT] = traceparent
+        if request_tags:
+            payload["meta"] = {"tags": request_tags}
+        response = await client.post(SELDON_API_URL, json=payload, headers=headers)
+        response.raise_for_status()
+    return decode_seldon_response(response.json())
+
+
+# Background runner for /jobs; jobs are stored under BATCH_JOB_DIR
+job_runner = BatchJobRunner.from_env(call_seldon_batch)
+
+
+def job_status(job: dict[str, Any]) -> dict[str, Any]:
+    """
+    Describe a job for API responses.
+
+    Args:
+        job: Stored job record
+
+    Returns:
+        Job record with progress and links to its status and results
+    """
+    job_id = job["job_id"]
+    total = job["n_texts"]
+    return {
+        **job,
+        "progress": job["n_done"] / total if total else 1.0,
+        "links": {"status": f"/jobs/{job_id}", "results": f"/jobs/{job_id}/results"},
+    }
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request) -> JSONResponse:
+    """
+    Submit texts for asynchronous batch scoring.
+
+    The body is either JSON (an array of strings, or {"texts": [...]}) or a multipart
+    upload in a ``file`` field (``.csv`` with a text column, ``.json``, ``.jsonl`` or
+    plain text with one text per line).
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        202 with the job record, or 400/413 for invalid or oversized submissions
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > BATCH_JOB_MAX_BYTES:
+        return JSONResponse(
+            {"error": f"Submission is larger than {BATCH_JOB_MAX_BYTES} bytes"}, status_code=413
+        )
+
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if isinstance(upload, str) or upload is None:
+                raise ValueError("Upload the texts in a 'file' field")
+            texts = parse_texts(upload.filename or "", await upload.read())
+        else:
+            body = await request.json()
+            texts = body.get("texts") if isinstance(body, dict) else body
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ValueError("Texts must be a list of strings")
+        if not texts:
+            raise ValueError("No texts submitted")
+    except (ValueError, UnicodeDecodeError) as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    if len(texts) > BATCH_JOB_MAX_TEXTS:
+        error = f"Too many texts; the limit is {BATCH_JOB_MAX_TEXTS} per job."
+        return JSONResponse({"error": error}, status_code=413)
+    if ANALYZE_MAX_CHARS:
+        too_long = next((i for i, text in enumerate(texts) if len(text) > ANALYZE_MAX_CHARS), None)
+        if too_long is not None:
+            error = f"Text {too_long} is too long; the limit is {ANALYZE_MAX_CHARS} characters."
+            return JSONResponse({"error": error}, status_code=413)
+
+    job = await job_runner.submit(texts)
+    logger.info(f"Batch job {job['job_id']} submitted with {len(texts)} texts")
+    return JSONResponse(
+        job_status(job), status_code=202, headers={"Location": f"/jobs/{job['job_id']}"}
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> JSONResponse:
+    """
+    Report a job's status and progress.
+
+    Args:
+        job_id: Job id returned by POST /jobs
+
+    Returns:
+        Job record, or 404
+    """
+    try:
+        return JSONResponse(job_status(job_runner.store.load(job_id)))
+    except JobNotFoundError:
+        return JSONResponse({"error": f"Job {job_id} not found"}, status_code=404)
+
+
+@app.get("/jobs/{job_id}/results")
+async def stream_job_results(job_id: str, request: Request, follow: bool = True) -> Response:
+    """
+    Stream a job's results as its chunks finish.
+
+    Clients sending ``Accept: text/event-stream`` get server-sent events: ``results``
+    (a list of rows), ``progress`` and a final ``done``. Others get JSON lines: one
+    {"index", "sentiment", "confidence"} row per text, in completion order, each batch
+    followed by a {"progress": {...}} line. ``follow=false`` returns only the results
+    stored so far instead of waiting for the job to finish.
+
+    Args:
+        job_id: Job id returned by POST /jobs
+        request: FastAPI request object
+        follow: Keep the stream open until the job finishes
+
+    Returns:
+        Streaming response, or 404
+    """
+    try:
+        job_runner.store.load(job_id)
+    except JobNotFoundError:
+        return JSONResponse({"error": f"Job {job_id} not found"}, status_code=404)
+    events = "text/event-stream" in request.headers.get("accept", "")
+
+    async def stream() -> AsyncIterator[str]:
+        n_streamed = 0
+        job: dict[str, Any] = {}
+        async for job, chunks in follow_job(
+            job_runner.store, job_id, BATCH_JOB_POLL_INTERVAL, follow
+        ):
+            rows = [
+                {"index": chunk["start"] + i, **result}
+                for chunk in chunks
+                for i, result in enumerate(chunk["results"])
+            ]
+            n_streamed += len(rows)
+            progress = {"status": job["status"], "done": n_streamed, "total": job["n_texts"]}
+            if events:
+                if rows:
+                    yield f"event: results\ndata: {json.dumps(rows)}\n\n"
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+            else:
+                lines = [json.dumps(row) for row in rows] + [json.dumps({"progress": progress})]
+                yield "\n".join(lines) + "\n"
+        # job stays empty if the job was deleted before its first record was read
+        if events and job:
+            yield f"event: done\ndata: {json.dumps(job_status(job))}\n\n"
+
+    media_type = "text/event-stream" if events else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@app.delete("/jobs/{job_id}", status_code=204)
+async def delete_job(job_id: str) -> Response:
+    """
+    Stop a job, in whichever worker runs it, and delete it with its results.
+
+    Args:
+        job_id: Job id returned by POST /jobs
+
+    Returns:
+        204, or 404
+    """
+    await job_runner.cancel(job_id)
+    try:
+        job_runner.store.delete(job_id)
+    except JobNotFoundError:
+        return JSONResponse({"error": f"Job {job_id} not found"}, status_code=404)
+    return Response(status_code=204)
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """
@@ -166,10 +739,40 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy", "service": "sentiment-analyzer-ui"}
 
 
+def server_config_from_env() -> dict[str, Any]:
+    """
+    Build uvicorn settings from the environment.
+
+    ``FASTAPI_MODE=production`` runs several worker processes on uvloop and httptools
+    with tuned keep-alive and backlog; any other value keeps the single-process server.
+
+    Returns:
+        Keyword arguments for ``uvicorn.run``
+    """
+    config: dict[str, Any] = {
+        "host": os.getenv("FASTAPI_HOST", "0.0.0.0"),
+        "port": int(os.getenv("FASTAPI_PORT", "8000")),
+        "timeout_keep_alive": int(os.getenv("FASTAPI_KEEP_ALIVE", "5")),
+        "backlog": int(os.getenv("FASTAPI_BACKLOG", "2048")),
+        "timeout_graceful_shutdown": int(os.getenv("FASTAPI_GRACEFUL_TIMEOUT", "30")),
+    }
+
+    if os.getenv("FASTAPI_MODE", "development") == "production":
+        config.update(
+            {
+                "workers": int(os.getenv("FASTAPI_WORKERS", str(os.cpu_count() or 1))),
+                "loop": "uvloop",
+                "http": "httptools",
+                "access_log": os.getenv("FASTAPI_ACCESS_LOG", "false").lower() == "true",
+            }
+        )
+    return config
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    port = int(os.getenv("FASTAPI_PORT", "8000"))
-    host = os.getenv("FASTAPI_HOST", "0.0.0.0")
-
-    uvicorn.run(app, host=host, port=port)
+    # Workers are spawned as separate processes, so the app is passed as an import string
+    uvicorn.run(
+        "sentiment_app_server:app", app_dir=str(Path(__file__).parent), **server_config_from_env()
+    )
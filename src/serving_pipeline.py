@@ -0,0 +1,822 @@
+"""
+Serving-only version of the trained TF-IDF + Logistic Regression pipeline.
+
+A fitted sklearn pipeline is exported to a NumPy ``.npz`` archive holding the vocabulary,
+IDF weights and linear coefficients. ServingPipeline reloads it and reproduces
+``predict``/``predict_proba`` with NumPy alone, so the model server starts without
+importing scikit-learn, SciPy or pandas, and without unpickling code.
+
+Features and coefficients keep the dtype the model was trained with, so a float32 model
+(``SentimentModel(precision="float32")``) is also scored in float32.
+
+``load_model()`` loads any serving model by file extension. It lives here, free of
+import-time side effects, so the inference daemon and worker processes can load models
+without importing the Seldon wrapper.
+"""
+
+import copy
+import hashlib
+import json
+import math
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+FORMAT_VERSION = 1
+
+# Texts longer than this are lowercased and tokenized one window at a time
+DEFAULT_WINDOW_CHARS = 65536
+
+# Characters a window may be cut at without splitting a token
+_WINDOW_BREAKS = (" ", "\n", "\t")
+
+
+class SparseRows(NamedTuple):
+    """Minimal CSR matrix: row i holds indices/data[indptr[i]:indptr[i + 1]]."""
+
+    indptr: NDArray[np.int64]
+    indices: NDArray[np.int64]
+    data: NDArray[np.floating]
+    n_features: int
+
+    @property
+    def n_rows(self) -> int:
+        """Number of rows."""
+        return len(self.indptr) - 1
+
+
+class FeaturizeCost:
+    """Work done by `TfidfFeaturizer.transform` inside a `track_cost` block."""
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.texts = 0
+        self.chars = 0
+        self.tokens = 0
+        self.truncated = 0
+
+    def add(self, chars: int, tokens: int, truncated: bool) -> None:
+        """
+        Account for one featurized text.
+
+        Args:
+            chars: Length of the text
+            tokens: Tokens turned into n-grams
+            truncated: Whether the token cap cut the text short
+        """
+        self.texts += 1
+        self.chars += chars
+        self.tokens += tokens
+        self.truncated += int(truncated)
+
+    def to_dict(self) -> dict[str, int]:
+        """Counters as a JSON-serializable dictionary."""
+        return {
+            "texts": self.texts,
+            "chars": self.chars,
+            "tokens": self.tokens,
+            "truncated": self.truncated,
+        }
+
+
+_active_cost: ContextVar[FeaturizeCost | None] = ContextVar("featurize_cost", default=None)
+
+
+@contextmanager
+def track_cost() -> Iterator[FeaturizeCost]:
+    """
+    Count the featurization work done in the current context.
+
+    Yields:
+        FeaturizeCost updated by every `TfidfFeaturizer.transform` call in the block
+    """
+    cost = FeaturizeCost()
+    token = _active_cost.set(cost)
+    try:
+        yield cost
+    finally:
+        _active_cost.reset(token)
+
+
+class BufferPool:
+    """
+    Scratch arrays kept per thread and reused by later calls of the same or smaller size.
+
+    With fixed-size batches each intermediate is allocated once per thread. Arrays over
+    `max_elements` are not kept, so one oversized batch does not pin its memory.
+    """
+
+    def __init__(self, max_elements: int = 1 << 22) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_elements: Largest array, in elements, that is kept for reuse
+        """
+        self.max_elements = max_elements
+        self._local = threading.local()
+
+    def get(self, name: str, shape: tuple[int, ...], dtype: Any) -> NDArray:
+        """
+        Return an uninitialized array, reusing this thread's buffer called `name` if it fits.
+        Its contents are only valid until the next `get` of the same name in the thread.
+
+        Args:
+            name: Buffer identifier
+            shape: Shape of the array
+            dtype: Data type of the array
+
+        Returns:
+            Array of the given shape and dtype
+        """
+        size = math.prod(shape)
+        if size > self.max_elements:
+            return np.empty(shape, dtype=dtype)
+        buffers: dict[str, NDArray] = self._local.__dict__.setdefault("buffers", {})
+        buffer = buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(size, dtype=dtype)
+        return buffer[:size].reshape(shape)
+
+
+class TfidfFeaturizer:
+    """NumPy re-implementation of a fitted sklearn TfidfVectorizer's transform."""
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        idf: NDArray[np.floating] | None,
+        stop_words: Iterable[str] | None = None,
+        token_pattern: str = r"(?u)\b\w\w+\b",
+        ngram_range: tuple[int, int] = (1, 1),
+        lowercase: bool = True,
+        norm: str | None = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        max_tokens: int | None = None,
+        window_chars: int = DEFAULT_WINDOW_CHARS,
+        dtype: Any = np.float64,
+    ) -> None:
+        """
+        Initialize the featurizer from fitted vectorizer parameters.
+
+        Args:
+            vocabulary: Term to column index mapping
+            idf: Inverse document frequency per column, or None if use_idf=False
+            stop_words: Tokens dropped before n-grams are built
+            token_pattern: Regex selecting tokens
+            ngram_range: Minimum and maximum n-gram size
+            lowercase: Whether to lowercase text before tokenizing
+            norm: Row normalization ("l2", "l1" or None)
+            sublinear_tf: Whether term counts are replaced with 1 + log(count)
+            binary: Whether term counts are clipped to 1
+            max_tokens: Tokens per text after which the rest is ignored (None: no cap)
+            window_chars: Texts longer than this are featurized in streaming windows
+            dtype: Data type of the feature values (float64 or float32)
+        """
+        self.dtype = np.dtype(dtype)
+        self.vocabulary = vocabulary
+        self.idf = idf if idf is None else np.asarray(idf, dtype=self.dtype)
+        self.stop_words = frozenset(stop_words or ())
+        self.token_pattern = token_pattern
+        self.ngram_range = ngram_range
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.max_tokens = max_tokens
+        self.window_chars = window_chars
+        self.n_features = len(vocabulary)
+        self._tokenize = re.compile(token_pattern).findall
+        self._terms: NDArray | None = None
+
+    @classmethod
+    def from_sklearn(cls, vectorizer: Any) -> "TfidfFeaturizer":
+        """
+        Copy the parameters of a fitted TfidfVectorizer.
+
+        Args:
+            vectorizer: Fitted sklearn TfidfVectorizer
+
+        Returns:
+            Equivalent TfidfFeaturizer
+        """
+        unsupported = {
+            "analyzer": "word",
+            "strip_accents": None,
+            "preprocessor": None,
+            "tokenizer": None,
+        }
+        for name, expected in unsupported.items():
+            if getattr(vectorizer, name) != expected:
+                raise ValueError(f"Cannot export TfidfVectorizer with {name}={expected!r}")
+
+        return cls(
+            vocabulary={term: int(index) for term, index in vectorizer.vocabulary_.items()},
+            idf=vectorizer.idf_ if vectorizer.use_idf else None,
+            stop_words=vectorizer.get_stop_words(),
+            token_pattern=vectorizer.token_pattern,
+            ngram_range=tuple(vectorizer.ngram_range),
+            lowercase=vectorizer.lowercase,
+            norm=vectorizer.norm,
+            sublinear_tf=vectorizer.sublinear_tf,
+            binary=vectorizer.binary,
+            dtype=vectorizer.dtype,
+        )
+
+    @property
+    def terms(self) -> NDArray:
+        """N-gram of each column, in column order."""
+        if self._terms is None:
+            ordered = sorted(self.vocabulary, key=self.vocabulary.__getitem__)
+            self._terms = np.array(ordered, dtype=object)
+        return self._terms
+
+    def fingerprint(self) -> str:
+        """
+        Identify the featurizer's output space, so rows featurized in one process can be
+        checked against the model that scores them in another.
+
+        Returns:
+            16-hex-digit digest of the vocabulary, IDF weights and analyzer settings
+        """
+        digest = hashlib.sha256()
+        settings = [self.token_pattern, self.ngram_range, self.lowercase, self.norm]
+        settings += [self.sublinear_tf, self.binary, sorted(self.stop_words)]
+        digest.update(json.dumps(settings).encode())
+        digest.update("\n".join(self.terms).encode())
+        if self.idf is not None:
+            digest.update(np.ascontiguousarray(self.idf, dtype="<f8").tobytes())
+        return digest.hexdigest()[:16]
+
+    def analyze(self, text: str) -> Iterator[str]:
+        """
+        Yield the word n-grams of a text, matching sklearn's word analyzer.
+
+        Args:
+            text: Raw document
+
+        Yields:
+            N-gram strings
+        """
+        if self.lowercase:
+            text = text.lower()
+        tokens = [token for token in self._tokenize(text) if token not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, min(max_n, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                yield " ".join(tokens[i : i + n])
+
+    def term_counts(self, text: str) -> dict[int, int]:
+        """
+        Count in-vocabulary n-grams of a text, up to the `max_tokens` cap.
+
+        Args:
+            text: Raw document
+
+        Returns:
+            Column index to count mapping
+        """
+        return self._count_terms(text)[0]
+
+    def transform(self, texts: Iterable[str]) -> SparseRows:
+        """
+        Compute TF-IDF rows for a batch of texts.
+
+        Args:
+            texts: Raw documents
+
+        Returns:
+            TF-IDF matrix in CSR form
+        """
+        cost = _active_cost.get()
+        rows = []
+        for text in texts:
+            counts, n_tokens, truncated = self._count_terms(text)
+            rows.append(counts)
+            if cost is not None:
+                cost.add(len(text), n_tokens, truncated)
+        return self.weight_counts(rows)
+
+    def _count_terms(self, text: str) -> tuple[dict[int, int], int, bool]:
+        """
+        Count in-vocabulary n-grams of the first `max_tokens` tokens of a text.
+
+        Texts up to `window_chars` long are tokenized in one go. Longer texts are
+        streamed: windows are lowercased and tokenized one at a time and each token only
+        adds the n-grams ending at it, so neither a lowercased copy of the whole text nor
+        its full n-gram list is built, and scanning stops at the token cap.
+
+        Args:
+            text: Raw document
+
+        Returns:
+            Tuple of (column index to count mapping, tokens used, whether the cap was hit)
+        """
+        counts: dict[int, int] = {}
+        vocabulary = self.vocabulary
+        min_n, max_n = self.ngram_range
+
+        if len(text) <= self.window_chars:
+            if self.lowercase:
+                text = text.lower()
+            tokens = [token for token in self._tokenize(text) if token not in self.stop_words]
+            truncated = self.max_tokens is not None and len(tokens) > self.max_tokens
+            if truncated:
+                tokens = tokens[: self.max_tokens]
+            for n in range(min_n, min(max_n, len(tokens)) + 1):
+                for i in range(len(tokens) - n + 1):
+                    index = vocabulary.get(" ".join(tokens[i : i + n]))
+                    if index is not None:
+                        counts[index] = counts.get(index, 0) + 1
+            return counts, len(tokens), truncated
+
+        recent: list[str] = []
+        n_tokens = 0
+        for token in self._stream_tokens(text):
+            if n_tokens == self.max_tokens:
+                return counts, n_tokens, True
+            n_tokens += 1
+            recent.append(token)
+            if len(recent) > max_n:
+                del recent[0]
+            for n in range(min_n, min(max_n, len(recent)) + 1):
+                index = vocabulary.get(" ".join(recent[-n:]))
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+        return counts, n_tokens, False
+
+    def _stream_tokens(self, text: str) -> Iterator[str]:
+        """Yield the non-stop-word tokens of a long text, one window at a time."""
+        start = 0
+        while start < len(text):
+            end = start + self.window_chars
+            if end < len(text):
+                # Cut after whitespace so no token straddles two windows
+                cut = max(text.rfind(char, start, end) for char in _WINDOW_BREAKS)
+                if cut > start:
+                    end = cut + 1
+            window = text[start:end]
+            if self.lowercase:
+                window = window.lower()
+            for token in self._tokenize(window):
+                if token not in self.stop_words:
+                    yield token
+            start = end
+
+    def weight_counts(self, rows: list[dict[int, int]]) -> SparseRows:
+        """
+        Apply TF scaling, IDF weighting and row normalization to raw term counts.
+
+        Args:
+            rows: Column index to count mapping per document
+
+        Returns:
+            TF-IDF matrix in CSR form
+        """
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.fromiter(
+            (index for row in rows for index in row), dtype=np.int64, count=int(indptr[-1])
+        )
+        data = np.fromiter(
+            (count for row in rows for count in row.values()),
+            dtype=self.dtype,
+            count=int(indptr[-1]),
+        )
+
+        if self.binary:
+            data[:] = 1.0
+        elif self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1.0
+        if self.idf is not None:
+            data *= self.idf[indices]
+        if self.norm is not None and data.size:
+            self._normalize(indptr, data)
+        return SparseRows(indptr, indices, data, self.n_features)
+
+    def _normalize(self, indptr: NDArray[np.int64], data: NDArray[np.floating]) -> None:
+        """Scale each row of `data` in place to unit l1 or l2 norm."""
+        values = data * data if self.norm == "l2" else np.abs(data)
+        starts = indptr[:-1]
+        nonempty = starts < indptr[1:]
+        norms = np.zeros(len(starts), dtype=data.dtype)
+        norms[nonempty] = np.add.reduceat(values, starts[nonempty])
+        if self.norm == "l2":
+            np.sqrt(norms, out=norms)
+        norms[norms == 0.0] = 1.0
+        data /= np.repeat(norms, np.diff(indptr))
+
+
+class LinearScorer:
+    """NumPy re-implementation of a fitted sklearn LogisticRegression's scoring."""
+
+    def __init__(
+        self,
+        coef: NDArray[np.floating],
+        intercept: NDArray[np.floating],
+        classes: NDArray,
+        multinomial: bool = True,
+    ) -> None:
+        """
+        Initialize the scorer from fitted model parameters.
+
+        Args:
+            coef: Coefficients of shape (n_classes, n_features), or (1, n_features) if binary
+            intercept: Intercepts of shape (n_classes,) or (1,)
+            classes: Class labels
+            multinomial: Softmax probabilities (True) or normalized one-vs-rest sigmoids
+        """
+        # Stored feature-major so a row's columns can be gathered contiguously
+        self.coef_t = np.ascontiguousarray(coef.T)
+        self.intercept = np.asarray(intercept, dtype=self.coef_t.dtype)
+        self.classes = classes
+        self.multinomial = multinomial
+        # Per-term contributions are the largest intermediate; reused across batches
+        self.buffers = BufferPool()
+
+    @classmethod
+    def from_sklearn(cls, classifier: Any) -> "LinearScorer":
+        """
+        Copy the parameters of a fitted LogisticRegression.
+
+        Args:
+            classifier: Fitted sklearn LogisticRegression, or a OneVsRestClassifier of them
+                (one binary model per class, as trained with the liblinear solver)
+
+        Returns:
+            Equivalent LinearScorer
+        """
+        estimators = getattr(classifier, "estimators_", None)
+        if estimators is not None:
+            return cls(
+                coef=np.vstack([estimator.coef_ for estimator in estimators]),
+                intercept=np.concatenate([estimator.intercept_ for estimator in estimators]),
+                classes=classifier.classes_,
+                multinomial=False,
+            )
+        multi_class = getattr(classifier, "multi_class", "deprecated")
+        ovr = multi_class == "ovr" or (
+            multi_class == "auto" and getattr(classifier, "solver", "") == "liblinear"
+        )
+        return cls(
+            coef=classifier.coef_,
+            intercept=classifier.intercept_,
+            classes=classifier.classes_,
+            multinomial=not ovr,
+        )
+
+    def decision_function(self, X: SparseRows) -> NDArray[np.floating]:
+        """
+        Compute linear scores ``X @ coef.T + intercept``.
+
+        Args:
+            X: Feature rows
+
+        Returns:
+            Scores of shape (n_samples, n_coef_rows)
+        """
+        return self._scores(X, self._contributions(X))
+
+    def _contributions(self, X: SparseRows) -> NDArray[np.floating]:
+        """
+        Multiply each non-zero by the coefficients of its column, into a pooled buffer.
+
+        Returns:
+            Array of shape (nnz, n_coef_rows), valid until the next call in this thread
+        """
+        shape = (len(X.indices), self.coef_t.shape[1])
+        contributions = self.buffers.get("contributions", shape, self.coef_t.dtype)
+        np.take(self.coef_t, X.indices, axis=0, out=contributions)
+        contributions *= X.data[:, None]
+        return contributions
+
+    def _scores(self, X: SparseRows, contributions: NDArray[np.floating]) -> NDArray[np.floating]:
+        """Sum the per-non-zero contributions of each row and add the intercept."""
+        scores = np.zeros((X.n_rows, self.coef_t.shape[1]), dtype=self.coef_t.dtype)
+        if X.data.size:
+            starts = X.indptr[:-1]
+            nonempty = starts < X.indptr[1:]
+            scores[nonempty] = np.add.reduceat(contributions, starts[nonempty], axis=0)
+        scores += self.intercept
+        return scores
+
+    def predict_proba(self, X: SparseRows) -> NDArray[np.floating]:
+        """
+        Compute class probabilities.
+
+        Args:
+            X: Feature rows
+
+        Returns:
+            Probabilities of shape (n_samples, n_classes)
+        """
+        return self._probabilities(self.decision_function(X))
+
+    def _probabilities(self, scores: NDArray[np.floating]) -> NDArray[np.floating]:
+        """Turn linear scores into class probabilities (overwrites `scores`)."""
+        if scores.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        if self.multinomial:
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def explain(
+        self, X: SparseRows, top_k: int = 5
+    ) -> tuple[NDArray[np.floating], NDArray[np.int64], NDArray[np.floating]]:
+        """
+        Compute class probabilities and each class's largest term contributions together.
+
+        A term's contribution to a class is its feature value times the class coefficient,
+        the same products the scores are summed from, so explaining adds only a per-class
+        sort of the non-zeros. For a binary model the negative class gets the negated
+        contributions of the positive one.
+
+        Args:
+            X: Feature rows
+            top_k: Terms reported per row and class
+
+        Returns:
+            Tuple of (probabilities of shape (n_samples, n_classes), column indices and
+            contributions of shape (n_samples, n_classes, top_k), largest first; rows
+            with fewer than top_k terms are padded with column -1 and weight 0)
+
+        Raises:
+            ValueError: If top_k is not positive
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k must be positive, got {top_k}")
+        contributions = self._contributions(X)
+        probabilities = self._probabilities(self._scores(X, contributions))
+        if contributions.shape[1] == 1:
+            contributions = np.column_stack([-contributions[:, 0], contributions[:, 0]])
+
+        n_classes = contributions.shape[1]
+        columns = np.full((X.n_rows, n_classes, top_k), -1, dtype=np.int64)
+        weights = np.zeros((X.n_rows, n_classes, top_k), dtype=contributions.dtype)
+        rows = np.repeat(np.arange(X.n_rows), np.diff(X.indptr))
+        # Sort every class by (row, descending contribution) in one argsort: rows are spaced
+        # further apart than any two contributions, so they never interleave
+        span = 2.0 * np.abs(contributions).max(initial=0.0) + 1.0
+        order = np.argsort(rows[:, None] * span - contributions, axis=0)
+        # Rank of each non-zero within its row in that order
+        rank = np.arange(len(rows)) - X.indptr[rows]
+        top = rank < top_k
+        order = order[top]
+        for c in range(n_classes):
+            columns[rows[top], c, rank[top]] = X.indices[order[:, c]]
+            weights[rows[top], c, rank[top]] = contributions[order[:, c], c]
+        return probabilities, columns, weights
+
+    def predict(self, X: SparseRows) -> NDArray:
+        """
+        Predict class labels.
+
+        Args:
+            X: Feature rows
+
+        Returns:
+            Labels of shape (n_samples,)
+        """
+        scores = self.decision_function(X)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(np.int64)]
+        return self.classes[scores.argmax(axis=1)]
+
+
+class ServingPipeline:
+    """Featurizer + scorer with the same predict/predict_proba interface as the sklearn pipeline."""
+
+    def __init__(self, featurizer: TfidfFeaturizer, scorer: LinearScorer) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            featurizer: Text to TF-IDF step
+            scorer: Linear classification step
+        """
+        self.featurizer = featurizer
+        self.scorer = scorer
+        # Same step names as the training pipeline, so per-step tracing works unchanged
+        self.steps: list[tuple[str, Any]] = [("tfidf", featurizer), ("classifier", scorer)]
+
+    @property
+    def classes_(self) -> NDArray:
+        """Class labels in probability column order."""
+        return self.scorer.classes
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the features and coefficients."""
+        return self.featurizer.dtype
+
+    def astype(self, dtype: Any) -> "ServingPipeline":
+        """
+        Copy the pipeline with features and coefficients in another precision.
+
+        Args:
+            dtype: Target data type (float64 or float32)
+
+        Returns:
+            Converted ServingPipeline
+        """
+        featurizer = copy.copy(self.featurizer)
+        featurizer.dtype = np.dtype(dtype)
+        if featurizer.idf is not None:
+            featurizer.idf = featurizer.idf.astype(dtype)
+        scorer = self.scorer
+        return ServingPipeline(
+            featurizer,
+            LinearScorer(
+                coef=scorer.coef_t.T.astype(dtype),
+                intercept=scorer.intercept,
+                classes=scorer.classes,
+                multinomial=scorer.multinomial,
+            ),
+        )
+
+    @classmethod
+    def from_sklearn(cls, pipeline: Any) -> "ServingPipeline":
+        """
+        Convert a fitted sklearn Pipeline of TfidfVectorizer + LogisticRegression.
+
+        Args:
+            pipeline: Fitted sklearn Pipeline
+
+        Returns:
+            Equivalent ServingPipeline
+        """
+        serving = cls(
+            TfidfFeaturizer.from_sklearn(pipeline.named_steps["tfidf"]),
+            LinearScorer.from_sklearn(pipeline.named_steps["classifier"]),
+        )
+        # liblinear fits in float64 whatever the dtype of the features
+        if serving.scorer.coef_t.dtype != serving.dtype:
+            return serving.astype(serving.dtype)
+        return serving
+
+    def predict(self, texts: Iterable[str]) -> NDArray:
+        """Predict class labels for raw texts."""
+        return self.scorer.predict(self.featurizer.transform(texts))
+
+    def predict_proba(self, texts: Iterable[str]) -> NDArray[np.floating]:
+        """Predict class probabilities for raw texts."""
+        return self.scorer.predict_proba(self.featurizer.transform(texts))
+
+    def explain(
+        self, texts: Iterable[str], top_k: int = 5
+    ) -> tuple[NDArray[np.floating], list[dict[str, dict[str, list]]]]:
+        """
+        Predict class probabilities and the n-grams that contributed most to each class.
+
+        Args:
+            texts: Raw texts
+            top_k: N-grams reported per text and class
+
+        Returns:
+            Tuple of (probabilities, per text a mapping of class label to
+            {"terms": [...], "weights": [...]}, largest contribution first)
+        """
+        return self.explain_rows(self.featurizer.transform(texts), top_k)
+
+    def explain_rows(
+        self, X: SparseRows, top_k: int = 5
+    ) -> tuple[NDArray[np.floating], list[dict[str, dict[str, list]]]]:
+        """
+        Same as `explain` for rows already featurized by this pipeline's featurizer.
+
+        Args:
+            X: Feature rows
+            top_k: N-grams reported per row and class
+
+        Returns:
+            Tuple of (probabilities, explanations), as for `explain`
+        """
+        probabilities, columns, weights = self.scorer.explain(X, top_k)
+        # Nested lists built by NumPy; per-term Python objects would dominate the cost
+        counts = np.count_nonzero(columns[:, 0, :] >= 0, axis=1).tolist()
+        terms = self.featurizer.terms[columns].tolist()
+        labels = [str(label) for label in self.classes_]
+        explanations = [
+            {
+                label: {"terms": class_terms[:n], "weights": class_weights[:n]}
+                for label, class_terms, class_weights in zip(
+                    labels, row_terms, row_weights, strict=True
+                )
+            }
+            for row_terms, row_weights, n in zip(terms, weights.tolist(), counts, strict=True)
+        ]
+        return probabilities, explanations
+
+    def save(self, path: str) -> None:
+        """
+        Write the pipeline to an ``.npz`` archive.
+
+        Args:
+            path: Output path
+        """
+        featurizer, scorer = self.featurizer, self.scorer
+        config = {
+            "format_version": FORMAT_VERSION,
+            "token_pattern": featurizer.token_pattern,
+            "ngram_range": list(featurizer.ngram_range),
+            "lowercase": featurizer.lowercase,
+            "norm": featurizer.norm,
+            "sublinear_tf": featurizer.sublinear_tf,
+            "binary": featurizer.binary,
+            "use_idf": featurizer.idf is not None,
+            "multinomial": scorer.multinomial,
+            "dtype": featurizer.dtype.name,
+        }
+        idf = featurizer.idf if featurizer.idf is not None else np.zeros(0)
+        np.savez(
+            path,
+            config=np.array(json.dumps(config)),
+            terms=featurizer.terms.astype(str),
+            idf=idf,
+            stop_words=np.array(sorted(featurizer.stop_words), dtype=str),
+            coef=scorer.coef_t.T,
+            intercept=scorer.intercept,
+            classes=np.asarray(scorer.classes, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ServingPipeline":
+        """
+        Read a pipeline written by `save`.
+
+        Args:
+            path: Path to the ``.npz`` archive
+
+        Returns:
+            Loaded ServingPipeline
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            config = json.loads(str(archive["config"]))
+            if config["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported serving model format: {config['format_version']}")
+
+            featurizer = TfidfFeaturizer(
+                vocabulary={str(term): index for index, term in enumerate(archive["terms"])},
+                idf=archive["idf"] if config["use_idf"] else None,
+                stop_words=archive["stop_words"].tolist(),
+                token_pattern=config["token_pattern"],
+                ngram_range=tuple(config["ngram_range"]),
+                lowercase=config["lowercase"],
+                norm=config["norm"],
+                sublinear_tf=config["sublinear_tf"],
+                binary=config["binary"],
+                # Archives written before the precision option are float64
+                dtype=config.get("dtype", "float64"),
+            )
+            scorer = LinearScorer(
+                coef=archive["coef"],
+                intercept=archive["intercept"],
+                classes=archive["classes"].astype(object),
+                multinomial=config["multinomial"],
+            )
+        return cls(featurizer, scorer)
+
+
+def load_model(model_path: str) -> Any:
+    """
+    Load a serving model.
+
+    ``.npz`` archives exported by ``SentimentModel.save_serving`` load with NumPy only,
+    with the MAX_INPUT_TOKENS cap and FEATURIZE_WINDOW_CHARS streaming window applied;
+    ``.onnx`` models exported by ``SentimentModel.export_onnx`` run on onnxruntime;
+    anything else is treated as a joblib-pickled sklearn pipeline, which imports sklearn
+    (and with it SciPy and pandas) and is noticeably slower to start.
+
+    Args:
+        model_path: Path to the model file
+
+    Returns:
+        Object with predict() and predict_proba() over raw texts
+    """
+    if model_path.endswith(".npz"):
+        from seldon_payload import InputLimits
+
+        pipeline = ServingPipeline.load(model_path)
+        InputLimits.from_env().configure(pipeline.featurizer)
+        return pipeline
+    if model_path.endswith(".onnx"):
+        from onnx_pipeline import OnnxPipeline
+
+        return OnnxPipeline.load(model_path)
+
+    import joblib
+
+    return joblib.load(model_path)
@@ -0,0 +1,139 @@
+"""
+Content-addressed cache of data generation and training stage outputs.
+
+Each stage (generated samples, the cleaned dataset, the train/test split, the fitted
+vectorizer with its feature matrices, the fitted classifier) is stored under a key
+hashed from everything it depends on:
+
+- its parameters (seed, num_samples, max_features, ngram_range, test size, ...)
+- the keys of the stages it reads, or the digest of an input file
+- the source of the code that computes it
+
+A rerun with the same key loads the stored output instead of recomputing it. Changing
+one parameter changes that stage's key, and through it the keys of every stage
+downstream, while upstream stages are still loaded. Outputs are stored with joblib
+under ``STAGE_CACHE_DIR/<stage>/<key>.joblib``. Entries are never invalidated in place,
+so clearing the directory (``make clean-cache``) is always safe.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, TypeVar
+
+import joblib
+
+T = TypeVar("T")
+
+
+def file_digest(path: str) -> str:
+    """
+    Hash a file's contents.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_digest(paths: Iterable[str]) -> str:
+    """
+    Hash the source files a stage runs, so editing them invalidates its outputs.
+
+    Args:
+        paths: Source files
+
+    Returns:
+        Hex SHA-256 digest of their digests
+    """
+    return hashlib.sha256("".join(file_digest(path) for path in paths).encode()).hexdigest()
+
+
+class StageCache:
+    """Store and reuse stage outputs keyed by a hash of their inputs."""
+
+    def __init__(self, root: str = "data/cache", enabled: bool = True) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            root: Directory of the stored outputs
+            enabled: Always recompute (and store nothing) when False
+        """
+        self.root = Path(root)
+        self.enabled = enabled
+        self.hits: list[str] = []
+        self.misses: list[str] = []
+
+    @classmethod
+    def from_env(cls) -> "StageCache":
+        """
+        Create a cache configured by STAGE_CACHE_DIR and STAGE_CACHE_ENABLED.
+
+        Returns:
+            Configured StageCache
+        """
+        return cls(
+            root=os.getenv("STAGE_CACHE_DIR", "data/cache"),
+            enabled=os.getenv("STAGE_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    @staticmethod
+    def key(stage: str, params: dict[str, Any]) -> str:
+        """
+        Compute a stage's key.
+
+        Args:
+            stage: Stage name
+            params: Everything the output depends on: parameters, upstream keys, input
+                file and code digests. Values must be JSON-serializable or have a stable
+                repr()
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps({"stage": stage, **params}, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_or_compute(self, stage: str, key: str, compute: Callable[[], T]) -> T:
+        """
+        Load a stage's stored output, or compute and store it.
+
+        Args:
+            stage: Stage name
+            key: Key from `key()`
+            compute: Produces the output on a miss
+
+        Returns:
+            The stage's output
+        """
+        path = self.root / stage / f"{key}.joblib"
+        if self.enabled and path.exists():
+            start = time.perf_counter()
+            value: T = joblib.load(path)
+            self.hits.append(stage)
+            print(f"♻️  {stage}: reused {key[:12]} ({time.perf_counter() - start:.2f}s to load)")
+            return value
+
+        start = time.perf_counter()
+        value = compute()
+        self.misses.append(stage)
+        print(f"⚙️  {stage}: computed {key[:12]} in {time.perf_counter() - start:.2f}s")
+        if self.enabled:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so a concurrent or interrupted run never reads half a file
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+                joblib.dump(value, f)
+            os.replace(f.name, path)
+        return value
@@ -0,0 +1,227 @@
+"""
+Lightweight span-based tracing shared by the UI server and the Seldon model wrapper.
+
+Spans are exported as OTLP-style JSON lines to TRACE_EXPORT_PATH, a local stand-in for
+an OpenTelemetry collector. Trace context travels between processes as a W3C
+``traceparent`` value, sent as an HTTP header and as a Seldon ``meta.tags`` entry.
+Tracing is disabled when TRACE_EXPORT_PATH is unset, in which case ``span()`` returns a
+shared no-op context manager. A trace that is not sampled still sets an unsampled current
+span, so its descendants record nothing and downstream calls receive flags ``00``.
+"""
+
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any
+
+TRACEPARENT = "traceparent"
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+_NOOP_SPAN: AbstractContextManager[None] = nullcontext()
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+        sampled: bool = True,
+    ) -> None:
+        """
+        Start a span.
+
+        Args:
+            name: Stage name, e.g. "model.tfidf"
+            trace_id: 32-hex-digit trace ID
+            parent_id: 16-hex-digit ID of the parent span, if any
+            attributes: Extra key/value pairs recorded with the span
+            sampled: False for the marker of a trace that is not recorded
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent value identifying this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self, service_name: str) -> dict[str, Any]:
+        """
+        Serialize the span using OTLP field names.
+
+        Args:
+            service_name: Name of the emitting service
+
+        Returns:
+            JSON-serializable span record
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "resource": {"service.name": service_name},
+        }
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """
+    Parse a W3C traceparent value.
+
+    Args:
+        value: Header or tag value, e.g. "00-<trace id>-<span id>-01"
+
+    Returns:
+        Tuple of (trace_id, parent_span_id, sampled), or None if missing or malformed
+    """
+    if not value:
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2], parts[3] == "01"
+
+
+class Tracer:
+    """Creates spans and appends finished spans to a JSON-lines file."""
+
+    def __init__(
+        self,
+        service_name: str,
+        export_path: str | None = None,
+        sample_rate: float = 1.0,
+    ) -> None:
+        """
+        Initialize the tracer.
+
+        Args:
+            service_name: Name recorded on every span
+            export_path: JSON-lines file to append spans to; tracing is disabled if None
+            sample_rate: Fraction of new traces to record (propagated traces keep
+                the caller's sampling decision)
+        """
+        self.service_name = service_name
+        self.export_path = export_path
+        self.sample_rate = sample_rate
+        self.enabled = bool(export_path)
+        self._lock = threading.Lock()
+        self._file = None
+
+        if self.enabled:
+            assert export_path is not None
+            os.makedirs(os.path.dirname(export_path) or ".", exist_ok=True)
+            self._file = open(export_path, "a", buffering=1, encoding="utf-8")
+
+    @classmethod
+    def from_env(cls, service_name: str) -> "Tracer":
+        """
+        Create a tracer configured by TRACE_EXPORT_PATH and TRACE_SAMPLE_RATE.
+
+        Args:
+            service_name: Name recorded on every span
+
+        Returns:
+            Configured Tracer
+        """
+        return cls(
+            service_name,
+            export_path=os.getenv("TRACE_EXPORT_PATH") or None,
+            sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+        )
+
+    def span(
+        self, name: str, traceparent: str | None = None, **attributes: Any
+    ) -> AbstractContextManager[Span | None]:
+        """
+        Open a span as a child of the current span, or of a propagated traceparent.
+
+        Args:
+            name: Stage name
+            traceparent: Remote parent context; only used when there is no current span
+            **attributes: Extra key/value pairs recorded with the span
+
+        Returns:
+            Context manager yielding the Span, or None when tracing is off or unsampled
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is not None:
+            if not parent.sampled:
+                return _NOOP_SPAN
+            return self._record(name, parent.trace_id, parent.span_id, attributes)
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+            if not sampled:
+                return self._unsampled(trace_id, parent_id)
+            return self._record(name, trace_id, parent_id, attributes)
+
+        if random.random() >= self.sample_rate:
+            return self._unsampled(secrets.token_hex(16), None)
+        return self._record(name, secrets.token_hex(16), None, attributes)
+
+    def current_traceparent(self) -> str | None:
+        """
+        Return the traceparent to propagate to downstream calls.
+
+        Returns:
+            traceparent of the active span (flags 00 in an unsampled trace), or None
+            outside any span
+        """
+        current = _current_span.get()
+        return current.traceparent if current is not None else None
+
+    @contextmanager
+    def _record(
+        self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]
+    ) -> Iterator[Span]:
+        """Run the body inside a new span and export it when done."""
+        span = Span(name, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.attributes["error"] = repr(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._export(span)
+
+    @contextmanager
+    def _unsampled(self, trace_id: str, parent_id: str | None) -> Iterator[None]:
+        """Run the body under an unsampled marker, so nested spans are not recorded."""
+        token = _current_span.set(Span("unsampled", trace_id, parent_id, {}, sampled=False))
+        try:
+            yield None
+        finally:
+            _current_span.reset(token)
+
+    def _export(self, span: Span) -> None:
+        """Append a finished span to the export file."""
+        line = json.dumps(span.to_dict(self.service_name)) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
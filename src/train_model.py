@@ -1,22 +1,204 @@
 """
 Sentiment analysis model training script.
+
+Evaluation, data loading and splitting dependencies (pandas, sklearn.metrics,
+sklearn.model_selection) are imported where they are used, so importing
+SentimentModel only pays for the estimators themselves.
 """
 
 import os
+import sys
+import time
+import warnings
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import joblib
 import numpy as np
-import pandas as pd
-from dotenv import load_dotenv
+from sklearn.exceptions import ConvergenceWarning
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from sklearn.model_selection import train_test_split
+from sklearn.multiclass import OneVsRestClassifier
 from sklearn.pipeline import Pipeline
 
-# Load environment variables
-load_dotenv()
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from serving_pipeline import ServingPipeline, TfidfFeaturizer
+from stage_cache import StageCache, code_digest, file_digest
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Supported values of SentimentModel(precision=...)
+PRECISIONS = ("float64", "float32")
+
+# Solvers compared by SentimentModel(solver="auto"), in order of preference on ties
+SOLVERS = ("lbfgs", "saga", "liblinear")
+
+
+class SolverTrial(NamedTuple):
+    """Fit time and quality of one classifier configuration."""
+
+    solver: str
+    n_jobs: int | None
+    seconds: float
+    accuracy: float
+    n_iter: int
+    converged: bool
+
+
+def make_classifier(solver: str, random_state: int = 42, n_jobs: int | None = None) -> Any:
+    """
+    Build an unfitted logistic regression classifier.
+
+    liblinear only fits binary problems, so it is wrapped in a OneVsRestClassifier that
+    fits one binary model per class, on `n_jobs` processes. The other solvers fit one
+    multinomial model on a single core, so they ignore `n_jobs`.
+
+    Args:
+        solver: One of SOLVERS
+        random_state: Random state for reproducibility
+        n_jobs: Parallel class fits for liblinear (-1 for all cores)
+
+    Returns:
+        LogisticRegression, or OneVsRestClassifier of liblinear LogisticRegressions
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"solver must be one of {SOLVERS}, got {solver!r}")
+    classifier = LogisticRegression(solver=solver, random_state=random_state, max_iter=1000)
+    if solver == "liblinear":
+        return OneVsRestClassifier(classifier, n_jobs=n_jobs)
+    return classifier
+
+
+def time_solver(
+    solver: str,
+    X_train: Any,
+    y_train: Any,
+    X_val: Any,
+    y_val: Any,
+    random_state: int = 42,
+    n_jobs: int | None = None,
+    repeats: int = 1,
+) -> SolverTrial:
+    """
+    Fit a classifier on TF-IDF features and measure it.
+
+    Args:
+        solver: One of SOLVERS
+        X_train: Training features
+        y_train: Training labels
+        X_val: Validation features
+        y_val: Validation labels
+        random_state: Random state for reproducibility
+        n_jobs: Parallel class fits for liblinear
+        repeats: Fits to time; the median is reported, so one slow (e.g. first) fit
+            does not decide it
+
+    Returns:
+        SolverTrial with the median fit time, validation accuracy and iteration count
+    """
+    times = []
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ConvergenceWarning)
+        for _ in range(max(1, repeats)):
+            classifier = make_classifier(solver, random_state, n_jobs)
+            start = time.perf_counter()
+            classifier.fit(X_train, y_train)
+            times.append(time.perf_counter() - start)
+    seconds = float(np.median(times))
+    estimators = getattr(classifier, "estimators_", [classifier])
+    return SolverTrial(
+        solver=solver,
+        n_jobs=n_jobs,
+        seconds=seconds,
+        accuracy=float(np.mean(classifier.predict(X_val) == np.asarray(y_val))),
+        n_iter=int(max(np.max(estimator.n_iter_) for estimator in estimators)),
+        converged=not any(issubclass(w.category, ConvergenceWarning) for w in caught),
+    )
+
+
+def choose_solver(
+    X: Any,
+    y: Any,
+    tolerance: float = 0.005,
+    random_state: int = 42,
+    n_jobs: int | None = None,
+    max_rows: int = 5000,
+    repeats: int = 5,
+    margin: float = 0.2,
+) -> tuple[str, list[SolverTrial]]:
+    """
+    Pick the fastest solver whose accuracy is within `tolerance` of the best one.
+
+    Every solver is fit on the same sample of at most `max_rows` rows, which keeps the
+    data's vocabulary and class count, and scored on a held-out fifth of it. Solvers that
+    did not converge are only chosen when none did. See `pick_solver` for how fit times
+    and accuracies decide.
+
+    Args:
+        X: TF-IDF features of the whole training set
+        y: Training labels
+        tolerance: Accuracy a faster solver may lose against the most accurate one
+        random_state: Random state of the sample, split and fits
+        n_jobs: Parallel class fits for liblinear
+        max_rows: Rows sampled for the trial fits
+        repeats: Timed fits per solver
+        margin: Fraction of fit time a solver must save to replace an earlier one
+
+    Returns:
+        Tuple of (chosen solver, trials in SOLVERS order); "lbfgs" with no trials when
+        there are too few rows per class to hold some out
+    """
+    from sklearn.model_selection import train_test_split
+
+    y = np.asarray(y)
+    _, counts = np.unique(y, return_counts=True)
+    if counts.min() < 10:
+        return "lbfgs", []
+    if X.shape[0] > max_rows:
+        X, _, y, _ = train_test_split(
+            X, y, train_size=max_rows, random_state=random_state, stratify=y
+        )
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=random_state, stratify=y
+    )
+
+    trials = [
+        time_solver(solver, X_train, y_train, X_val, y_val, random_state, n_jobs, repeats)
+        for solver in SOLVERS
+    ]
+    return pick_solver(trials, tolerance, margin), trials
+
+
+def pick_solver(trials: list[SolverTrial], tolerance: float = 0.005, margin: float = 0.2) -> str:
+    """
+    Pick a solver from its trials.
+
+    Only converged trials are considered, unless none converged, and of those only the
+    ones within `tolerance` of the best accuracy. Timing noise should not change the
+    trained model, so these are preferred in SOLVERS order: a later solver is only chosen
+    when its fit time is more than `margin` below that of every earlier one.
+
+    Args:
+        trials: Trials in SOLVERS order
+        tolerance: Accuracy a faster solver may lose against the most accurate one
+        margin: Fraction of fit time a solver must save to replace every earlier one
+
+    Returns:
+        Name of the chosen solver
+    """
+    candidates = [trial for trial in trials if trial.converged] or trials
+    best = max(trial.accuracy for trial in candidates)
+    accurate = [trial for trial in candidates if trial.accuracy >= best - tolerance]
+    chosen = accurate[0]
+    earliest_fastest = chosen.seconds
+    for trial in accurate[1:]:
+        if trial.seconds < earliest_fastest * (1 - margin):
+            chosen = trial
+        earliest_fastest = min(earliest_fastest, trial.seconds)
+    return chosen.solver
 
 
 class SentimentModel:
@@ -27,6 +209,10 @@ class SentimentModel:
         max_features: int = 5000,
         ngram_range: tuple[int, int] = (1, 5),
         random_state: int = 42,
+        precision: str = "float64",
+        solver: str = "lbfgs",
+        n_jobs: int | None = None,
+        auto_tolerance: float = 0.005,
     ) -> None:
         """
         Initialize the sentiment model.
@@ -35,10 +221,25 @@ class SentimentModel:
             max_features: Maximum number of features for TF-IDF
             ngram_range: N-gram range for TF-IDF (1-5: unigrams through 5-grams)
             random_state: Random state for reproducibility
+            precision: "float64", or "float32" to keep TF-IDF features, coefficients and
+                the exported serving model in single precision (half the memory)
+            solver: One of SOLVERS, or "auto" to time them on a sample of the training
+                data and use the fastest one within `auto_tolerance` accuracy of the best
+            n_jobs: Parallel class fits for the liblinear solver (-1 for all cores)
+            auto_tolerance: Validation accuracy the "auto" choice may give up for speed
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+        if solver != "auto" and solver not in SOLVERS:
+            raise ValueError(f"solver must be 'auto' or one of {SOLVERS}, got {solver!r}")
         self.max_features = max_features
         self.ngram_range = ngram_range
         self.random_state = random_state
+        self.precision = precision
+        self.shared_vectorizer = False
+        self.solver = solver
+        self.n_jobs = n_jobs
+        self.auto_tolerance = auto_tolerance
 
         # Create pipeline
         self.pipeline = Pipeline(
@@ -49,13 +250,18 @@ class SentimentModel:
                         max_features=max_features,
                         ngram_range=ngram_range,
                         stop_words="english",
+                        # LogisticRegression fits in the dtype of its input
+                        dtype=np.dtype(precision).type,
                     ),
                 ),
-                ("classifier", LogisticRegression(random_state=random_state, max_iter=1000)),
+                (
+                    "classifier",
+                    make_classifier("lbfgs" if solver == "auto" else solver, random_state, n_jobs),
+                ),
             ]
         )
 
-    def train(self, X_train: pd.Series, y_train: pd.Series) -> None:
+    def train(self, X_train: "pd.Series", y_train: "pd.Series") -> None:
         """
         Train the model.
 
@@ -64,10 +270,73 @@ class SentimentModel:
             y_train: Training labels
         """
         print("Training model...")
-        self.pipeline.fit(X_train, y_train)
+        self.fit_classifier(self.fit_features(X_train), y_train)
         print("Training complete!")
 
-    def predict(self, X: pd.Series) -> np.ndarray:
+    def fit_features(self, X_train: "pd.Series") -> Any:
+        """
+        Fit the vectorizer, or only apply it if it is shared, and featurize the texts.
+
+        Args:
+            X_train: Training texts
+
+        Returns:
+            Sparse TF-IDF matrix of X_train
+        """
+        tfidf = self.pipeline.named_steps["tfidf"]
+        if self.shared_vectorizer:
+            return tfidf.transform(X_train)
+        return tfidf.fit_transform(X_train)
+
+    def fit_classifier(self, features: Any, y_train: "pd.Series") -> None:
+        """
+        Fit the classifier on featurized texts, choosing its solver first in auto mode.
+
+        Args:
+            features: TF-IDF matrix from `fit_features`
+            y_train: Training labels
+        """
+        if self.solver == "auto":
+            self._choose_solver(features, y_train)
+        self.pipeline.named_steps["classifier"].fit(features, y_train)
+
+    def _choose_solver(self, features: Any, y_train: "pd.Series") -> None:
+        """
+        Replace the classifier with the one `choose_solver` picks for this data.
+
+        Args:
+            features: TF-IDF features of the training texts
+            y_train: Training labels
+        """
+        solver, trials = choose_solver(
+            features, y_train, self.auto_tolerance, self.random_state, self.n_jobs
+        )
+        for trial in trials:
+            print(
+                f"  {trial.solver:<10} {trial.seconds:.3f}s  accuracy {trial.accuracy:.4f}  "
+                f"{trial.n_iter} iterations{'' if trial.converged else ' (not converged)'}"
+            )
+        print(f"Solver: {solver} (auto, {features.shape[0]}x{features.shape[1]} features)")
+        self.pipeline.steps[-1] = (
+            "classifier",
+            make_classifier(solver, self.random_state, self.n_jobs),
+        )
+
+    def share_vectorizer(self, vectorizer: TfidfVectorizer) -> None:
+        """
+        Reuse another model's fitted vectorizer, so train() only fits the classifier.
+
+        The model then produces the same TF-IDF rows as that model and can be served as
+        its challenger (CHALLENGER_MODEL_PATHS, see challengers.py).
+
+        Args:
+            vectorizer: Fitted TfidfVectorizer, e.g. the champion's
+        """
+        self.pipeline.steps[0] = ("tfidf", vectorizer)
+        self.precision = np.dtype(vectorizer.dtype).name
+        self.shared_vectorizer = True
+
+    def predict(self, X: "pd.Series") -> np.ndarray:
         """
         Make predictions.
 
@@ -79,22 +348,45 @@ class SentimentModel:
         """
         return self.pipeline.predict(X)
 
-    def evaluate(self, X_test: pd.Series, y_test: pd.Series) -> None:
+    def evaluate(
+        self,
+        X_test: "pd.Series",
+        y_test: "pd.Series",
+        features: Any = None,
+        chunk_rows: int = 65536,
+    ) -> dict[str, Any]:
         """
-        Evaluate the model.
+        Evaluate the model chunk by chunk with `evaluate_stream` (see evaluation.py), so
+        memory does not grow with the test set. Chunks are scored inline: the model may
+        not be saved yet for worker processes to load, and precomputed features leave
+        only the classifier's dot product to score.
 
         Args:
             X_test: Test texts
             y_test: Test labels
+            features: TF-IDF matrix of X_test, if already computed
+            chunk_rows: Rows scored at a time
+
+        Returns:
+            Metrics report from StreamingMetrics.report()
         """
-        y_pred = self.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
+        from evaluation import evaluate_stream
+
+        labels = list(y_test)
+        if features is None:
+            model, rows = self.pipeline, list(X_test)
+        else:
+            model, rows = self.pipeline.named_steps["classifier"], features
+        chunks = (
+            (rows[begin : begin + chunk_rows], labels[begin : begin + chunk_rows])
+            for begin in range(0, len(labels), chunk_rows)
+        )
+        metrics = evaluate_stream(chunks, model)
 
-        print(f"\nAccuracy: {accuracy:.4f}")
+        print(f"\nAccuracy: {metrics.report()['accuracy']:.4f}")
         print("\nClassification Report:")
-        print(classification_report(y_test, y_pred))
-        print("\nConfusion Matrix:")
-        print(confusion_matrix(y_test, y_pred))
+        print(metrics.format())
+        return metrics.report()
 
     def save(self, path: str) -> None:
         """
@@ -110,6 +402,32 @@ class SentimentModel:
         joblib.dump(self.pipeline, path)
         print(f"\nModel saved to {path}")
 
+    def save_serving(self, path: str) -> None:
+        """
+        Export the fitted pipeline as a serving-only ``.npz`` archive.
+        The model server loads it with NumPy alone (see serving_pipeline.py).
+
+        Args:
+            path: Path to save the archive
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        ServingPipeline.from_sklearn(self.pipeline).save(path)
+        print(f"Serving model saved to {path}")
+
+    def export_onnx(self, path: str) -> None:
+        """
+        Export the fitted pipeline as an ONNX model for the onnxruntime backend.
+        Requires the optional ``onnx`` dependency (see onnx_pipeline.py).
+
+        Args:
+            path: Path to save the model
+        """
+        from onnx_pipeline import export_onnx
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        export_onnx(ServingPipeline.from_sklearn(self.pipeline), path)
+        print(f"ONNX model saved to {path}")
+
     @classmethod
     def load(cls, path: str) -> "SentimentModel":
         """
@@ -123,11 +441,14 @@ class SentimentModel:
         """
         model = cls()
         model.pipeline = joblib.load(path)
+        model.precision = np.dtype(model.pipeline.named_steps["tfidf"].dtype).name
+        classifier = model.pipeline.named_steps["classifier"]
+        model.solver = getattr(classifier, "estimator", classifier).solver
         print(f"Model loaded from {path}")
         return model
 
 
-def load_data(data_path: str) -> pd.DataFrame:
+def load_data(data_path: str) -> "pd.DataFrame":
     """
     Load training data.
 
@@ -137,6 +458,8 @@ def load_data(data_path: str) -> pd.DataFrame:
     Returns:
         DataFrame with the data
     """
+    import pandas as pd
+
     print(f"Loading data from {data_path}")
     df = pd.read_csv(data_path)
     print(f"Loaded {len(df)} samples")
@@ -144,38 +467,204 @@ def load_data(data_path: str) -> pd.DataFrame:
     return df
 
 
+def deduplicate(
+    df: "pd.DataFrame", model: SentimentModel, threshold: float = 0.8
+) -> "pd.DataFrame":
+    """
+    Drop exact and near-duplicate texts, tokenized the way the model's vectorizer does.
+
+    Args:
+        df: Data with a "text" column
+        model: Model whose TF-IDF settings define the tokens
+        threshold: Jaccard similarity at which texts count as near duplicates
+
+    Returns:
+        Rows of `df` that are kept, in their original order
+    """
+    from dedup import Deduplicator, vectorizer_tokenizer
+
+    deduplicator = Deduplicator(
+        threshold=threshold,
+        tokenize=vectorizer_tokenizer(model.pipeline.named_steps["tfidf"]),
+    )
+    result = deduplicator.deduplicate(df["text"].astype(str))
+    print(result.summary())
+    return df.iloc[result.keep]
+
+
+def fit_stages(
+    model: SentimentModel,
+    cache: StageCache,
+    data_path: str,
+    test_size: float = 0.2,
+    random_seed: int = 42,
+    dedup_threshold: float | None = 0.8,
+) -> tuple["pd.Series", "pd.Series", Any]:
+    """
+    Load, deduplicate, split, featurize and fit, reusing every stage whose inputs and
+    parameters are unchanged (see stage_cache.py).
+
+    Args:
+        model: Unfitted model; its vectorizer and classifier are set to the fitted ones
+        cache: Stage cache
+        data_path: CSV with text and sentiment columns
+        test_size: Fraction of rows held out for evaluation
+        random_seed: Random state of the split
+        dedup_threshold: Near-duplicate Jaccard threshold, or None to keep duplicates
+
+    Returns:
+        Tuple of (test texts, test labels, test features)
+    """
+    import sklearn
+    from sklearn.model_selection import train_test_split
+
+    src = Path(__file__).parent
+    code = code_digest([str(src / "train_model.py"), str(src / "dedup.py")])
+    tfidf = model.pipeline.named_steps["tfidf"]
+    vectorizer_params = tfidf.get_params()
+    tokenizer_params = {
+        name: vectorizer_params[name]
+        for name in ("lowercase", "strip_accents", "token_pattern", "stop_words")
+    }
+
+    dataset_key = cache.key(
+        "dataset",
+        {
+            "data": file_digest(data_path),
+            "dedup_threshold": dedup_threshold,
+            "tokenizer": tokenizer_params if dedup_threshold is not None else None,
+            "code": code,
+        },
+    )
+
+    def load_dataset() -> "pd.DataFrame":
+        df = load_data(data_path)
+        # Drop duplicates before splitting, so no test text is also a training text
+        return df if dedup_threshold is None else deduplicate(df, model, dedup_threshold)
+
+    df = cache.get_or_compute("dataset", dataset_key, load_dataset)
+
+    split_key = cache.key(
+        "split", {"dataset": dataset_key, "test_size": test_size, "seed": random_seed}
+    )
+    X_train, X_test, y_train, y_test = cache.get_or_compute(
+        "split",
+        split_key,
+        lambda: train_test_split(
+            df["text"],
+            df["sentiment"],
+            test_size=test_size,
+            random_state=random_seed,
+            stratify=df["sentiment"],
+        ),
+    )
+    print(f"\nTraining samples: {len(X_train)}")
+    print(f"Test samples: {len(X_test)}")
+
+    # A shared vectorizer is already fitted: its vocabulary and IDF weights are the input
+    shared = TfidfFeaturizer.from_sklearn(tfidf).fingerprint() if model.shared_vectorizer else None
+    features_key = cache.key(
+        "features",
+        {
+            "split": split_key,
+            "vectorizer": vectorizer_params,
+            "shared": shared,
+            "sklearn": sklearn.__version__,
+            "code": code,
+        },
+    )
+
+    def fit_features() -> tuple[Any, Any, Any]:
+        train_features = model.fit_features(X_train)
+        return tfidf, train_features, tfidf.transform(X_test)
+
+    vectorizer, train_features, test_features = cache.get_or_compute(
+        "features", features_key, fit_features
+    )
+    model.pipeline.set_params(tfidf=vectorizer)
+
+    # n_jobs only changes how fast the classifier fits, not the result
+    classifier_params = {
+        name: value
+        for name, value in model.pipeline.named_steps["classifier"].get_params().items()
+        if not name.endswith("n_jobs")
+    }
+    classifier_key = cache.key(
+        "classifier",
+        {
+            "features": features_key,
+            "classifier": classifier_params,
+            "solver": model.solver,
+            "auto_tolerance": model.auto_tolerance if model.solver == "auto" else None,
+            "sklearn": sklearn.__version__,
+            "code": code,
+        },
+    )
+
+    def fit_classifier() -> Any:
+        print("Training model...")
+        model.fit_classifier(train_features, y_train)
+        print("Training complete!")
+        return model.pipeline.named_steps["classifier"]
+
+    model.pipeline.set_params(
+        classifier=cache.get_or_compute("classifier", classifier_key, fit_classifier)
+    )
+    return X_test, y_test, test_features
+
+
 def main() -> None:
     """Main training function."""
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
     # Get configuration from environment
     data_path = os.getenv("RAW_DATA_PATH", "data/raw") + "/sentiment_data.csv"
     model_path = os.getenv("MODEL_PATH", "models/sentiment_model.pkl")
+    serving_model_path = os.getenv("SERVING_MODEL_PATH", "models/sentiment_model.npz")
+    onnx_model_path = os.getenv("ONNX_MODEL_PATH")
     test_size = float(os.getenv("TRAIN_TEST_SPLIT", "0.2"))
     random_seed = int(os.getenv("RANDOM_SEED", "42"))
     max_features = int(os.getenv("MAX_FEATURES", "5000"))
-
-    # Load data
-    df = load_data(data_path)
-
-    # Split data
-    X = df["text"]
-    y = df["sentiment"]
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_seed, stratify=y
+    dedup = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+    dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    precision = os.getenv("MODEL_PRECISION", "float64")
+    shared_vectorizer_path = os.getenv("SHARED_VECTORIZER_PATH")
+    solver = os.getenv("MODEL_SOLVER", "lbfgs")
+    n_jobs = int(os.getenv("TRAIN_N_JOBS", "1"))
+
+    model = SentimentModel(
+        max_features=max_features,
+        random_state=random_seed,
+        precision=precision,
+        solver=solver,
+        n_jobs=n_jobs,
+    )
+    # Train a challenger on the champion's vocabulary and IDF weights
+    if shared_vectorizer_path:
+        champion = SentimentModel.load(shared_vectorizer_path)
+        model.share_vectorizer(champion.pipeline.named_steps["tfidf"])
+
+    # Unchanged stages are loaded from STAGE_CACHE_DIR instead of recomputed
+    X_test, y_test, test_features = fit_stages(
+        model,
+        StageCache.from_env(),
+        data_path,
+        test_size=test_size,
+        random_seed=random_seed,
+        dedup_threshold=dedup_threshold if dedup else None,
     )
-
-    print(f"\nTraining samples: {len(X_train)}")
-    print(f"Test samples: {len(X_test)}")
-
-    # Initialize and train model
-    model = SentimentModel(max_features=max_features, random_state=random_seed)
-    model.train(X_train, y_train)
 
     # Evaluate model
-    model.evaluate(X_test, y_test)
+    model.evaluate(X_test, y_test, test_features)
 
     # Save model
     model.save(model_path)
+    model.save_serving(serving_model_path)
+    if onnx_model_path:
+        model.export_onnx(onnx_model_path)
 
 
 if __name__ == "__main__":
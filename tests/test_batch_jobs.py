@@ -0,0 +1,247 @@
+"""
+Tests for asynchronous batch jobs.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from batch_jobs import (
+    FAILED,
+    RUNNING,
+    SUCCEEDED,
+    BatchJobRunner,
+    JobNotFoundError,
+    JobStore,
+    follow_job,
+    parse_texts,
+)
+
+
+async def score(texts: list[str]) -> list[dict]:
+    """Fake Seldon batch call: the label is the text's length."""
+    await asyncio.sleep(0)
+    return [{"sentiment": str(len(text))} for text in texts]
+
+
+async def wait_finished(runner: BatchJobRunner, job_id: str) -> dict:
+    """Wait for a job to reach a final status."""
+    updates = [job async for job, _ in follow_job(runner.store, job_id, poll_interval=0.01)]
+    return updates[-1]
+
+
+class TestJobStore:
+    """Test cases for the file-backed job store."""
+
+    def test_create_and_update(self, tmp_path: Path) -> None:
+        """Test that jobs, texts and updates are persisted."""
+        store = JobStore(str(tmp_path / "jobs"))
+        job = store.create(["a", "b", "c"], chunk_size=2)
+        assert job["n_chunks"] == 2
+
+        store.update(job["job_id"], status=RUNNING)
+        assert store.load(job["job_id"])["status"] == RUNNING
+        assert store.texts(job["job_id"]) == ["a", "b", "c"]
+        assert [record["job_id"] for record in store.jobs()] == [job["job_id"]]
+
+        with pytest.raises(JobNotFoundError):
+            store.load("../etc")
+        store.delete(job["job_id"])
+        with pytest.raises(JobNotFoundError):
+            store.load(job["job_id"])
+
+    def test_torn_result_line(self, tmp_path: Path) -> None:
+        """Test that a partially written chunk is neither read nor counted as done."""
+        store = JobStore(str(tmp_path))
+        job_id = store.create(["a", "b", "c"], chunk_size=1)["job_id"]
+        store.append_chunk(job_id, 1, 1, [{"sentiment": "1"}])
+        with open(tmp_path / job_id / "results.jsonl", "a") as f:
+            f.write('{"chunk": 0, "sta')
+
+        chunks, offset = store.read_chunks(job_id)
+        assert [chunk["chunk"] for chunk in chunks] == [1]
+        assert store.read_chunks(job_id, offset) == ([], offset)
+        assert store.completed_chunks(job_id) == {1}
+        assert (tmp_path / job_id / "results.jsonl").stat().st_size == offset
+
+    def test_lock_is_exclusive(self, tmp_path: Path) -> None:
+        """Test that only one holder can run a job."""
+        store = JobStore(str(tmp_path))
+        job_id = store.create(["a"], chunk_size=1)["job_id"]
+        lock = store.try_lock(job_id)
+        assert lock is not None
+        assert store.try_lock(job_id) is None
+        lock.close()
+        assert store.try_lock(job_id) is not None
+
+    def test_parse_texts(self) -> None:
+        """Test the supported upload formats."""
+        assert parse_texts("a.txt", b"first\n\nsecond\n") == ["first", "second"]
+        assert parse_texts("a.csv", b"text,sentiment\nGreat,positive\n") == ["Great"]
+        assert parse_texts("a.json", b'["x", "y"]') == ["x", "y"]
+        assert parse_texts("a.jsonl", b'"x"\n{"text": "y"}\n') == ["x", "y"]
+        with pytest.raises(ValueError, match="text"):
+            parse_texts("a.csv", b"review\nGreat\n")
+
+
+class TestBatchJobRunner:
+    """Test cases for running jobs in the background."""
+
+    async def test_runs_all_chunks(self, tmp_path: Path) -> None:
+        """Test that every text is scored once, with bounded concurrency."""
+        in_flight = peak = 0
+
+        async def tracked(texts: list[str]) -> list[dict]:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), tracked, concurrency=2, chunk_size=3)
+        texts = ["x" * i for i in range(20)]
+        job = await runner.submit(texts)
+        final = await wait_finished(runner, job["job_id"])
+
+        assert final["status"] == SUCCEEDED
+        assert final["n_done"] == 20
+        assert peak == 2
+        rows = {}
+        for chunk in runner.store.read_chunks(job["job_id"])[0]:
+            for i, result in enumerate(chunk["results"]):
+                rows[chunk["start"] + i] = result["sentiment"]
+        assert rows == {i: str(i) for i in range(20)}
+
+    async def test_retries_then_fails(self, tmp_path: Path) -> None:
+        """Test that a transient error is retried and a persistent one fails the job."""
+        calls = []
+
+        async def flaky(texts: list[str]) -> list[dict]:
+            calls.append(texts)
+            if len(calls) == 1:
+                raise ConnectionError("model restarting")
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), flaky, retry_delay=0.0)
+        job = await runner.submit(["a", "b"])
+        assert (await wait_finished(runner, job["job_id"]))["status"] == SUCCEEDED
+        assert len(calls) == 2
+
+        async def broken(texts: list[str]) -> list[dict]:
+            raise ConnectionError("model down")
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), broken, retries=1, retry_delay=0.0)
+        job = await runner.submit(["a"])
+        final = await wait_finished(runner, job["job_id"])
+        assert final["status"] == FAILED
+        assert "model down" in final["error"]
+
+    async def test_resume_after_restart(self, tmp_path: Path) -> None:
+        """Test that a restarted runner only scores the chunks that are missing."""
+        store = JobStore(str(tmp_path))
+        job_id = store.create(["a", "bb", "ccc", "dddd"], chunk_size=2)["job_id"]
+        store.append_chunk(job_id, 0, 0, [{"sentiment": "1"}, {"sentiment": "2"}])
+        store.update(job_id, status=RUNNING, n_done=2)
+
+        scored = []
+
+        async def recording(texts: list[str]) -> list[dict]:
+            scored.extend(texts)
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), recording)
+        assert runner.resume() == [job_id]
+        final = await wait_finished(runner, job_id)
+        assert final["status"] == SUCCEEDED
+        assert final["n_done"] == 4
+        assert scored == ["ccc", "dddd"]
+        assert runner.resume() == []
+
+    async def test_shutdown_leaves_job_resumable(self, tmp_path: Path) -> None:
+        """Test that stopping the server keeps unfinished jobs for the next start."""
+        blocked = asyncio.Event()
+
+        async def slow(texts: list[str]) -> list[dict]:
+            await blocked.wait()
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), slow)
+        job = await runner.submit(["a"])
+        await asyncio.sleep(0.01)
+        await runner.shutdown()
+        assert runner.store.load(job["job_id"])["status"] == RUNNING
+
+        restarted = BatchJobRunner(JobStore(str(tmp_path)), score)
+        assert restarted.resume() == [job["job_id"]]
+        assert (await wait_finished(restarted, job["job_id"]))["status"] == SUCCEEDED
+
+    async def test_follow_streams_progressively(self, tmp_path: Path) -> None:
+        """Test that results are yielded as chunks finish, ending with the final record."""
+        gate = asyncio.Semaphore(0)
+
+        async def gated(texts: list[str]) -> list[dict]:
+            await gate.acquire()
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), gated, concurrency=1, chunk_size=1)
+        job = await runner.submit(["a", "bb"])
+        gate.release()
+
+        updates = []
+        async for record, chunks in follow_job(runner.store, job["job_id"], poll_interval=0.01):
+            updates.append((record["status"], [chunk["chunk"] for chunk in chunks]))
+            gate.release()
+        assert [chunk for _, chunks in updates for chunk in chunks] == [0, 1]
+        assert updates[-1][0] == SUCCEEDED
+        assert json.loads((tmp_path / job["job_id"] / "job.json").read_text())["n_done"] == 2
+
+    async def test_cancel_from_another_process(self, tmp_path: Path) -> None:
+        """Test that a job stops between chunks when another runner cancels it."""
+        scored = []
+
+        async def slow(texts: list[str]) -> list[dict]:
+            scored.extend(texts)
+            await asyncio.sleep(0.02)
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), slow, concurrency=1, chunk_size=1)
+        job = await runner.submit(["a", "b", "c", "d", "e"])
+        await asyncio.sleep(0.01)
+
+        other = BatchJobRunner(JobStore(str(tmp_path)), score)
+        assert await other.cancel(job["job_id"], timeout=5.0)
+        assert not runner._tasks
+        assert len(scored) < 5
+        assert other.store.load(job["job_id"])["status"] == RUNNING
+        assert other.resume() == []
+        assert not await other.cancel("0" * 32)
+
+    async def test_follow_ends_when_deleted(self, tmp_path: Path) -> None:
+        """Test that a result stream ends cleanly when its job is deleted."""
+        blocked = asyncio.Event()
+
+        async def stuck(texts: list[str]) -> list[dict]:
+            await blocked.wait()
+            return await score(texts)
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), stuck)
+        job = await runner.submit(["a"])
+
+        async def delete_soon() -> None:
+            await asyncio.sleep(0.05)
+            await runner.cancel(job["job_id"])
+            runner.store.delete(job["job_id"])
+
+        deleting = asyncio.create_task(delete_soon())
+        updates = [record async for record, _ in follow_job(runner.store, job["job_id"], 0.01)]
+        await deleting
+        assert updates == []
+        with pytest.raises(JobNotFoundError):
+            await anext(follow_job(runner.store, job["job_id"]))
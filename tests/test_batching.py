@@ -0,0 +1,180 @@
+"""
+Tests for chunked parallel batch scoring.
+"""
+
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import BrokenExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from batching import BatchRunner, available_cpus
+from generate_data import SentimentDataGenerator
+from seldon_model import SentimentClassifier
+from serving_pipeline import load_model
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Train a small model on generated data and save its serving archive."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+
+    path = tmp_path_factory.mktemp("models") / "sentiment_model.npz"
+    model.save_serving(str(path))
+    return path
+
+
+@pytest.fixture
+def texts() -> list[str]:
+    """A batch large enough to span several chunks."""
+    samples = SentimentDataGenerator(num_samples=50, seed=7).generate_samples()
+    return [text for text, _ in samples]
+
+
+class TestAvailableCpus:
+    """Test cases for the cgroup-aware CPU count."""
+
+    @pytest.fixture(autouse=True)
+    def eight_cpus(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Pretend the process may run on 8 CPUs."""
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+
+    def test_cgroup_v2_quota(self, tmp_path: Path) -> None:
+        """Test that a v2 quota of 2.5 CPUs rounds down to 2."""
+        (tmp_path / "cpu.max").write_text("250000 100000\n")
+        assert available_cpus(str(tmp_path)) == 2
+
+    def test_cgroup_v2_unlimited(self, tmp_path: Path) -> None:
+        """Test that an unlimited quota falls back to the affinity mask."""
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert available_cpus(str(tmp_path)) == 8
+
+    def test_cgroup_v1_quota(self, tmp_path: Path) -> None:
+        """Test the cgroup v1 CFS quota files."""
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("300000\n")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        assert available_cpus(str(tmp_path)) == 3
+
+    def test_fractional_quota_keeps_one_cpu(self, tmp_path: Path) -> None:
+        """Test that a quota below one CPU still allows one worker."""
+        (tmp_path / "cpu.max").write_text("50000 100000\n")
+        assert available_cpus(str(tmp_path)) == 1
+
+    def test_without_affinity(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the os.cpu_count() fallback on platforms without sched_getaffinity."""
+        monkeypatch.delattr(os, "sched_getaffinity")
+        monkeypatch.setattr(os, "cpu_count", lambda: 6)
+        assert available_cpus(str(tmp_path)) == 6
+
+
+class TestBatchRunner:
+    """Test cases for BatchRunner class."""
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_chunked_matches_serial(
+        self, model_path: Path, texts: list[str], executor: str
+    ) -> None:
+        """Test that chunked results are identical to a serial run and in input order."""
+        model = load_model(str(model_path))
+        runner = BatchRunner(
+            model,
+            partial(load_model, str(model_path)),
+            min_rows=10,
+            chunk_rows=8,
+            workers=2,
+            executor=executor,
+        )
+        try:
+            assert runner.should_split(len(texts))
+            np.testing.assert_array_equal(
+                runner.run("predict_proba", texts), model.predict_proba(texts)
+            )
+            assert list(runner.run("predict", texts)) == list(model.predict(texts))
+        finally:
+            runner.shutdown()
+
+    def test_one_pool_for_concurrent_requests(self, model_path: Path) -> None:
+        """Test that requests starting the pool together share a single one."""
+        model = load_model(str(model_path))
+        runner = BatchRunner(
+            model, partial(load_model, str(model_path)), workers=2, executor="thread"
+        )
+        barrier = threading.Barrier(8)
+        pools = []
+
+        def start() -> None:
+            barrier.wait()
+            pools.append(runner._get_executor())
+
+        threads = [threading.Thread(target=start) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        runner.shutdown()
+        assert len({id(pool) for pool in pools}) == 1
+
+    def test_broken_pool_is_replaced(self, model_path: Path, texts: list[str]) -> None:
+        """Test that batches after a worker crash run on a new pool."""
+        model = load_model(str(model_path))
+        runner = BatchRunner(
+            model,
+            partial(load_model, str(model_path)),
+            min_rows=10,
+            chunk_rows=8,
+            workers=2,
+            executor="process",
+        )
+        try:
+            expected = list(model.predict(texts))
+            assert list(runner.run("predict", texts)) == expected
+            broken = runner._executor
+            for pid in list(broken._processes):  # type: ignore[union-attr]
+                os.kill(pid, signal.SIGKILL)
+            with pytest.raises(BrokenExecutor):
+                runner.run("predict", texts)
+            assert list(runner.run("predict", texts)) == expected
+            assert runner._executor is not broken
+        finally:
+            runner.shutdown()
+
+    def test_small_batch_runs_inline(self, model_path: Path, texts: list[str]) -> None:
+        """Test that batches below the threshold never start a pool."""
+        model = load_model(str(model_path))
+        runner = BatchRunner(model, partial(load_model, str(model_path)), workers=4)
+        runner.run("predict", texts)
+        assert runner._executor is None
+
+    def test_auto_executor(self, model_path: Path) -> None:
+        """Test that the GIL-bound NumPy backend gets a process pool."""
+        model = load_model(str(model_path))
+        runner = BatchRunner(model, partial(load_model, str(model_path)), workers=2)
+        assert runner.executor_kind == "process"
+
+    def test_wrapper_splits_large_batches(
+        self, model_path: Path, texts: list[str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that SentimentClassifier routes large batches through the runner."""
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("BATCH_WORKERS", "2")
+        monkeypatch.setenv("BATCH_EXECUTOR", "thread")
+        monkeypatch.setenv("BATCH_PARALLEL_MIN_ROWS", "10")
+        monkeypatch.setenv("BATCH_CHUNK_ROWS", "8")
+        classifier = SentimentClassifier()
+
+        predictions = classifier.predict(np.array([[text] for text in texts]))
+        assert classifier.batch_runner._executor is not None
+        assert list(predictions) == list(classifier.model.predict(texts))
+        classifier.batch_runner.shutdown()
@@ -0,0 +1,126 @@
+"""
+Tests for shadow scoring of challenger models.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from challengers import ShadowScorer
+from generate_data import SentimentDataGenerator
+from serving_pipeline import LinearScorer, ServingPipeline, SparseRows
+from train_model import SentimentModel
+
+TEXTS = ["I absolutely love this laptop!", "Terrible. Broke after a day.", "It is okay."]
+
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory: pytest.TempPathFactory) -> dict[str, Path]:
+    """Save a champion, a challenger on its vectorizer, and one with its own vectorizer."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    texts = [text for text, _ in samples]
+    labels = [label for _, label in samples]
+    directory = tmp_path_factory.mktemp("models")
+
+    champion = SentimentModel(max_features=500, random_state=42)
+    champion.train(texts, labels)
+    challenger = SentimentModel()
+    challenger.share_vectorizer(champion.pipeline.named_steps["tfidf"])
+    challenger.train(texts[:150], labels[:150])
+    other = SentimentModel(max_features=400, random_state=42)
+    other.train(texts, labels)
+
+    paths = {}
+    for name, model in [("champion", champion), ("challenger", challenger), ("other", other)]:
+        paths[name] = directory / f"{name}.npz"
+        model.save_serving(str(paths[name]))
+    return paths
+
+
+class TestShadowScorer:
+    """Test cases for ShadowScorer."""
+
+    def test_counts_agreement_and_flips(self) -> None:
+        """Test the stats of a challenger that disagrees on one row of each batch."""
+        classes = np.array(["negative", "positive"])
+        champion = LinearScorer(np.array([[1.0, -1.0]]), np.array([0.0]), classes)
+        challenger = LinearScorer(np.array([[1.0, 1.0]]), np.array([0.0]), classes)
+        shadow = ShadowScorer({"flipped": challenger}, classes)
+        X = SparseRows(np.array([0, 1, 2]), np.array([0, 1]), np.array([1.0, 1.0]), 2)
+        assert shadow.submit(X, champion.predict(X))
+        assert shadow.submit(X, champion.predict_proba(X))
+        shadow.close()
+
+        stats = shadow.stats()["challengers"]["flipped"]
+        assert stats["rows"] == 4
+        assert stats["agreement"] == 0.5
+        assert stats["flips"] == {"negative->positive": 2}
+
+    def test_full_queue_drops_batches(self) -> None:
+        """Test that submit() never blocks the request thread."""
+        classes = np.array(["negative", "positive"])
+        shadow = ShadowScorer({}, classes, queue_size=1)
+        shadow.close()
+
+        X = SparseRows(np.array([0, 0]), np.array([], dtype=np.int64), np.array([]), 2)
+        assert shadow.submit(X, np.array(["positive"]))
+        assert not shadow.submit(X, np.array(["positive"]))
+        assert shadow.stats()["dropped_batches"] == 1
+
+    # Forking with the scorer thread running is the case under test
+    @pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+    def test_thread_starts_in_forked_child(self) -> None:
+        """Test that a worker forked after the scorer was used runs its own thread."""
+        classes = np.array(["negative", "positive"])
+        scorer = LinearScorer(np.array([[1.0, -1.0]]), np.array([0.0]), classes)
+        shadow = ShadowScorer({"same": scorer}, classes)
+        X = SparseRows(np.array([0, 1, 2]), np.array([0, 1]), np.array([1.0, 1.0]), 2)
+        assert shadow.submit(X, scorer.predict(X))
+        shadow.join()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                for _ in range(3):
+                    shadow.submit(X, scorer.predict(X))
+                shadow.join()
+                stats = shadow.stats()["challengers"]["same"]
+                status = 0 if stats["rows"] == 6 and stats["agreement"] == 1.0 else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        shadow.close()
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert shadow.stats()["challengers"]["same"]["rows"] == 2
+
+    def test_skipped_batches_are_counted(self) -> None:
+        """Test that batches scored outside this process are counted as skipped."""
+        shadow = ShadowScorer({}, np.array(["negative", "positive"]))
+        shadow.skip(5000)
+        shadow.skip(3000)
+        stats = shadow.stats()
+        shadow.close()
+        assert (stats["skipped_batches"], stats["skipped_rows"]) == (2, 8000)
+
+    def test_from_env(self, models: dict[str, Path], monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test loading challengers and rejecting ones with another vectorizer."""
+        champion = ServingPipeline.load(str(models["champion"]))
+        monkeypatch.delenv("CHALLENGER_MODEL_PATHS", raising=False)
+        assert ShadowScorer.from_env(champion) is None
+
+        monkeypatch.setenv("CHALLENGER_MODEL_PATHS", f" {models['challenger']} ,")
+        shadow = ShadowScorer.from_env(champion)
+        assert shadow is not None
+        assert list(shadow.challengers) == ["challenger"]
+        shadow.close()
+
+        monkeypatch.setenv("CHALLENGER_MODEL_PATHS", str(models["other"]))
+        with pytest.raises(ValueError, match="another vectorizer"):
+            ShadowScorer.from_env(champion)
@@ -69,3 +69,17 @@ class TestSentimentDataGenerator:
             data = json.load(f)
         assert len(data) == 100
         assert all("text" in item and "sentiment" in item for item in data)
+
+    def test_save_same_samples(self, generator: SentimentDataGenerator, tmp_path: Path) -> None:
+        """Test that the CSV and JSON can be written from one generation."""
+        import json
+
+        samples = generator.generate_samples()
+        generator.save_to_csv(str(tmp_path / "data.csv"), samples)
+        generator.save_to_json(str(tmp_path / "data.json"), samples)
+
+        df = pd.read_csv(tmp_path / "data.csv")
+        with open(tmp_path / "data.json") as f:
+            data = json.load(f)
+        assert list(zip(df["text"], df["sentiment"], strict=True)) == samples
+        assert [(item["text"], item["sentiment"]) for item in data] == samples
@@ -0,0 +1,76 @@
+"""
+Tests for training-data deduplication.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dedup import Deduplicator, lsh_bands
+from generate_data import SentimentDataGenerator
+from train_model import SentimentModel, deduplicate
+
+
+@pytest.fixture(scope="module")
+def deduplicator() -> Deduplicator:
+    """Deduplicator with the default vectorizer tokenization."""
+    return Deduplicator(threshold=0.8)
+
+
+class TestDeduplicator:
+    """Test cases for Deduplicator class."""
+
+    def test_exact_duplicates_by_tokens(self, deduplicator: Deduplicator) -> None:
+        """Test that texts differing only in case, punctuation and stop words are exact."""
+        texts = ["Love this laptop!", "LOVE this laptop", "the laptop, love it", "Hate it."]
+        result = deduplicator.deduplicate(texts)
+        assert result.keep == [0, 2, 3]
+        assert (result.n_exact, result.n_near) == (1, 0)
+
+    def test_near_duplicates(self, deduplicator: Deduplicator) -> None:
+        """Test that one changed word in a long text is caught and distinct texts are kept."""
+        rng = random.Random(0)
+        words = [f"word{i}" for i in range(2000)]
+        originals = [" ".join(rng.choices(words, k=60)) for _ in range(200)]
+        edited = [text.replace(text.split()[30], "changed", 1) for text in originals[:50]]
+
+        result = deduplicator.deduplicate(originals + edited)
+        assert result.keep == list(range(200))
+        assert result.n_near == 50
+
+    def test_first_occurrence_is_kept(self, deduplicator: Deduplicator) -> None:
+        """Test that kept indices follow input order and empty texts are kept once."""
+        result = deduplicator.deduplicate(["", "Great camera", "", "great camera!"])
+        assert result.keep == [0, 1]
+        assert result.ratio == 0.5
+
+    def test_generated_data_ratio(self, deduplicator: Deduplicator) -> None:
+        """Test that template-generated data shrinks and stays labelled."""
+        generator = SentimentDataGenerator(num_samples=1000, seed=42, dedup_threshold=0.8)
+        samples = generator.generate_samples()
+        texts = [text for text, _ in samples]
+        assert len(samples) < 1000
+        assert deduplicator.deduplicate(texts).n_kept == len(samples)
+
+    def test_lsh_bands(self) -> None:
+        """Test that the band split divides the signature and sits below the threshold."""
+        bands, rows = lsh_bands(0.8, 128)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) <= 0.8
+
+    def test_train_model_deduplicate(self) -> None:
+        """Test the DataFrame helper used by train_model.main."""
+        df = pd.DataFrame(
+            {
+                "text": ["Great laptop!", "great laptop", "Awful mouse.", "Great laptop!!"],
+                "sentiment": ["positive", "positive", "negative", "positive"],
+            }
+        )
+        kept = deduplicate(df, SentimentModel())
+        assert kept.index.tolist() == [0, 2]
@@ -0,0 +1,136 @@
+"""
+Tests for streaming evaluation.
+"""
+
+import sys
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import classification_report, confusion_matrix, log_loss
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from evaluation import StreamingMetrics, evaluate_stream, read_chunks
+from generate_data import SentimentDataGenerator
+from serving_pipeline import load_model
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def dataset() -> tuple[list[str], list[str]]:
+    """Generated texts and labels, disjoint from the training data."""
+    samples = SentimentDataGenerator(num_samples=300, seed=7).generate_samples()
+    return [text for text, _ in samples], [label for _, label in samples]
+
+
+@pytest.fixture(scope="module")
+def model() -> SentimentModel:
+    """Train a small model; few features, so it makes mistakes worth counting."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=20, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+    return model
+
+
+class TestStreamingMetrics:
+    """Test cases for StreamingMetrics."""
+
+    def test_matches_sklearn(self, model: SentimentModel, dataset: tuple) -> None:
+        """Test that chunked counters reproduce sklearn's metrics on the full arrays."""
+        texts, labels = dataset
+        proba = model.pipeline.predict_proba(texts)
+        predicted = model.pipeline.classes_[proba.argmax(axis=1)]
+
+        metrics = StreamingMetrics(model.pipeline.classes_)
+        for begin in range(0, len(texts), 37):
+            metrics.update(labels[begin : begin + 37], proba[begin : begin + 37])
+        report = metrics.report()
+        expected = classification_report(labels, predicted, output_dict=True, zero_division=0)
+
+        assert report["rows"] == len(texts)
+        assert report["accuracy"] == pytest.approx(expected["accuracy"])
+        for label, stats in report["classes"].items():
+            assert stats["precision"] == pytest.approx(expected[label]["precision"])
+            assert stats["recall"] == pytest.approx(expected[label]["recall"])
+            assert stats["support"] == expected[label]["support"]
+        assert report["macro_avg"]["f1"] == pytest.approx(expected["macro avg"]["f1-score"])
+        assert report["weighted_avg"]["f1"] == pytest.approx(expected["weighted avg"]["f1-score"])
+        assert report["confusion_matrix"] == confusion_matrix(labels, predicted).tolist()
+        assert report["log_loss"] == pytest.approx(log_loss(labels, proba))
+
+        onehot = np.asarray(labels)[:, None] == model.pipeline.classes_
+        assert report["brier"] == pytest.approx(np.square(proba - onehot).sum(axis=1).mean())
+        assert sum(row["rows"] for row in report["calibration"]) == len(texts)
+        assert 0 <= report["ece"] <= 1
+
+    def test_merge(self, model: SentimentModel, dataset: tuple) -> None:
+        """Test that merging per-chunk metrics equals accumulating them in one object."""
+        texts, labels = dataset
+        proba = model.pipeline.predict_proba(texts)
+        whole = StreamingMetrics(model.pipeline.classes_)
+        whole.update(labels, proba)
+        merged = StreamingMetrics(model.pipeline.classes_)
+        for begin in (0, 100, 200):
+            part = StreamingMetrics(model.pipeline.classes_)
+            part.update(labels[begin : begin + 100], proba[begin : begin + 100])
+            merged.merge(part)
+
+        assert np.array_equal(merged.confusion, whole.confusion)
+        assert np.array_equal(merged.bin_rows, whole.bin_rows)
+        assert merged.bin_confidence == pytest.approx(whole.bin_confidence)
+        assert merged.log_loss_sum == pytest.approx(whole.log_loss_sum)
+        assert merged.brier_sum == pytest.approx(whole.brier_sum)
+
+    def test_unknown_label(self) -> None:
+        """Test that a label the model cannot predict is reported."""
+        metrics = StreamingMetrics(["negative", "positive"])
+        with pytest.raises(ValueError, match="mixed"):
+            metrics.update(["mixed"], np.array([[0.5, 0.5]]))
+
+
+class TestEvaluateStream:
+    """Test cases for chunked, parallel evaluation."""
+
+    def test_inline_and_parallel_agree(
+        self, model: SentimentModel, dataset: tuple, tmp_path: Path
+    ) -> None:
+        """Test that worker processes produce the same metrics as scoring inline."""
+        texts, labels = dataset
+        data_path = tmp_path / "eval.csv"
+        pd.DataFrame({"text": texts, "sentiment": labels}).to_csv(data_path, index=False)
+        model_path = str(tmp_path / "model.npz")
+        model.save_serving(model_path)
+        serving = load_model(model_path)
+
+        inline = evaluate_stream(read_chunks(str(data_path), 64), serving)
+        parallel = evaluate_stream(
+            read_chunks(str(data_path), 64),
+            serving,
+            load_model=partial(load_model, model_path),
+            workers=2,
+            max_pending=2,
+        )
+
+        assert inline.rows == parallel.rows == len(texts)
+        assert np.array_equal(inline.confusion, parallel.confusion)
+        assert parallel.log_loss_sum == pytest.approx(inline.log_loss_sum)
+        assert parallel.report()["throughput"]["rows_per_second"] > 0
+        assert "rows/s" in parallel.format()
+
+        with pytest.raises(ValueError, match="load_model"):
+            evaluate_stream(read_chunks(str(data_path), 64), serving, workers=2)
+
+    def test_model_evaluate(self, model: SentimentModel, dataset: tuple) -> None:
+        """Test that SentimentModel.evaluate returns the same report in any chunk size."""
+        texts, labels = dataset
+        small = model.evaluate(pd.Series(texts), pd.Series(labels), chunk_rows=50)
+        whole = model.evaluate(texts, labels)
+        assert small["confusion_matrix"] == whole["confusion_matrix"]
+        assert small["log_loss"] == pytest.approx(whole["log_loss"])
+        features = model.pipeline.named_steps["tfidf"].transform(texts)
+        featurized = model.evaluate(texts, labels, features, chunk_rows=50)
+        assert featurized["confusion_matrix"] == whole["confusion_matrix"]
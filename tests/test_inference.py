@@ -0,0 +1,154 @@
+"""
+Tests for local inference and the warm inference daemon.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from inference import InferenceClient, InferenceDaemon, predict_local, predict_texts
+from train_model import SentimentModel
+
+TEXTS = ["I absolutely love this laptop!", "Terrible camera.", ""]
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Train a small model on generated data and save its serving archive."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+
+    path = tmp_path_factory.mktemp("models") / "sentiment_model.npz"
+    model.save_serving(str(path))
+    return path
+
+
+@pytest.fixture
+def socket_path() -> Iterator[str]:
+    """A short socket path (Unix socket paths are limited to about 100 bytes)."""
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        yield os.path.join(directory, "inference.sock")
+
+
+@pytest.fixture
+def daemon(model_path: Path, socket_path: str) -> Iterator[InferenceDaemon]:
+    """Run a daemon on a background thread."""
+    server = InferenceDaemon(str(model_path), socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestInferenceDaemon:
+    """Test cases for InferenceDaemon and InferenceClient."""
+
+    def test_daemon_matches_local(
+        self, daemon: InferenceDaemon, model_path: Path, socket_path: str
+    ) -> None:
+        """Test that predictions over the socket equal in-process predictions."""
+        with InferenceClient(socket_path) as client:
+            remote = client.predict(TEXTS)
+            again = client.predict(TEXTS[:1])  # the connection is reused
+        local = predict_local(TEXTS, str(model_path))
+
+        assert remote["labels"] == local["labels"]
+        assert remote["classes"] == ["negative", "neutral", "positive"]
+        np.testing.assert_allclose(remote["probabilities"], local["probabilities"])
+        assert again["labels"] == local["labels"][:1]
+
+    def test_client_uses_daemon(
+        self, daemon: InferenceDaemon, model_path: Path, socket_path: str
+    ) -> None:
+        """Test that predict_texts goes to the daemon serving the requested model."""
+        requests = []
+        daemon.current_model = lambda: requests.append(1) or daemon.model  # type: ignore
+        predict_texts(TEXTS, str(model_path), socket_path)
+        assert requests == [1]
+
+    def test_fallback_without_daemon(self, model_path: Path, socket_path: str) -> None:
+        """Test that predict_texts loads the model in-process when no daemon runs."""
+        result = predict_texts(TEXTS, str(model_path), socket_path)
+        assert result["labels"] == predict_local(TEXTS, str(model_path))["labels"]
+
+    def test_fallback_when_predict_fails(
+        self,
+        daemon: InferenceDaemon,
+        model_path: Path,
+        socket_path: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a daemon failing after the ping is replaced by in-process inference."""
+
+        def timeout(self: InferenceClient, texts: list[str]) -> dict:
+            raise TimeoutError("timed out")
+
+        monkeypatch.setattr(InferenceClient, "predict", timeout)
+        result = predict_texts(TEXTS, str(model_path), socket_path)
+        assert result["labels"] == predict_local(TEXTS, str(model_path))["labels"]
+
+    def test_fallback_for_other_model(
+        self, daemon: InferenceDaemon, model_path: Path, socket_path: str, tmp_path: Path
+    ) -> None:
+        """Test that a daemon serving a different model file is not used."""
+        other = tmp_path / "other.npz"
+        other.write_bytes(model_path.read_bytes())
+        daemon.current_model = lambda: pytest.fail("daemon used")  # type: ignore
+        assert predict_texts(TEXTS, str(other), socket_path)["labels"]
+
+    def test_bad_request(self, daemon: InferenceDaemon, socket_path: str) -> None:
+        """Test that malformed requests get an error and keep the connection usable."""
+        with InferenceClient(socket_path) as client:
+            with pytest.raises(RuntimeError, match="JSON array of strings"):
+                client.predict("one text")  # type: ignore[arg-type]
+            assert client._request("HELLO").startswith("ERR unknown command")
+            assert client.ping() is not None
+
+    def test_stale_socket_is_replaced(self, model_path: Path, socket_path: str) -> None:
+        """Test that a socket file left by a dead daemon does not block a new one."""
+        Path(socket_path).touch()
+        server = InferenceDaemon(str(model_path), socket_path)
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_second_daemon_refused(
+        self, daemon: InferenceDaemon, model_path: Path, socket_path: str
+    ) -> None:
+        """Test that a second daemon on a live socket fails to start."""
+        with pytest.raises(RuntimeError, match="already running"):
+            InferenceDaemon(str(model_path), socket_path)
+
+    def test_shutdown(self, model_path: Path, socket_path: str) -> None:
+        """Test that SHUTDOWN stops serve_forever and removes the socket."""
+        server = InferenceDaemon(str(model_path), socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        assert InferenceClient(socket_path).shutdown()
+        thread.join(timeout=5)
+        server.server_close()
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+    def test_load_model_skips_seldon_wrapper(self, model_path: Path) -> None:
+        """Test that loading a model does not import the Seldon wrapper and its side effects."""
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            f"import sys; sys.path.insert(0, {str(src)!r}); import inference; "
+            f"inference.load_model({str(model_path)!r}); "
+            "assert 'seldon_model' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, timeout=60)
@@ -0,0 +1,209 @@
+"""
+Tests for length-bucketed lane scheduling.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from lanes import Lane, LaneScheduler, LaneTimeoutError, make_lanes, seldon_metrics
+
+CLASSES = ["negative", "positive"]
+
+
+class FakeModel:
+    """Scores a text as positive iff its length is even; long texts are slow."""
+
+    def __init__(self, slow_chars: int = 1000, delay: float = 0.0) -> None:
+        """Sleep `delay` seconds for batches holding a text of at least slow_chars."""
+        self.slow_chars = slow_chars
+        self.delay = delay
+        self.batches: list[list[str]] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        """Return probabilities in CLASSES order."""
+        self.gate.wait()
+        self.batches.append(texts)
+        if self.delay and max(len(text) for text in texts) >= self.slow_chars:
+            time.sleep(self.delay)
+        even = np.array([len(text) % 2 == 0 for text in texts], dtype=float)
+        return np.column_stack([1 - even, even])
+
+
+class TestLaneScheduler:
+    """Test cases for LaneScheduler."""
+
+    def test_routes_by_length_and_keeps_order(self) -> None:
+        """Test that texts go to the lane of their length and come back in input order."""
+        model = FakeModel()
+        scheduler = LaneScheduler(model, CLASSES, make_lanes([10, 100], [100, 100, 100]))
+        texts = ["ab", "x" * 500, "abc", "y" * 51, "z" * 10]
+
+        labels, timings = scheduler.run("predict", texts)
+        proba, _ = scheduler.run("predict_proba", texts)
+        scheduler.close()
+
+        assert list(labels) == ["positive", "positive", "negative", "negative", "positive"]
+        assert proba.shape == (5, 2)
+        assert {timing.lane: timing.rows for timing in timings} == {
+            "short": 3,
+            "medium": 1,
+            "long": 1,
+        }
+        assert sorted(model.batches[:3], key=lambda batch: (len(batch), batch)) == [
+            ["x" * 500],
+            ["y" * 51],
+            ["ab", "abc", "z" * 10],
+        ]
+
+    def test_short_lane_does_not_wait_for_long(self) -> None:
+        """Test that a short request finishes while a slow long batch is still running."""
+        model = FakeModel(slow_chars=1000, delay=0.5)
+        scheduler = LaneScheduler(model, CLASSES, make_lanes([100], [1000, 5000]))
+        with ThreadPoolExecutor(1) as pool:
+            slow = pool.submit(scheduler.run, "predict", ["x" * 2000])
+            time.sleep(0.05)
+            start = time.perf_counter()
+            scheduler.run("predict", ["short"])
+            assert time.perf_counter() - start < 0.3
+            assert not slow.done()
+            slow.result()
+        scheduler.close()
+
+    def test_batches_concurrent_requests(self) -> None:
+        """Test that requests queued while a lane is busy are scored as one batch."""
+        model = FakeModel()
+        model.gate.clear()
+        scheduler = LaneScheduler(model, CLASSES, [Lane("all", float("inf"), 1000)])
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(scheduler.run, "predict", ["a" * i]) for i in range(1, 9)]
+            time.sleep(0.1)
+            model.gate.set()
+            results = [future.result()[0][0] for future in futures]
+        scheduler.close()
+
+        assert results == ["negative", "positive"] * 4
+        assert len(model.batches) < 8
+        stats = scheduler.stats()["lanes"]["all"]
+        assert stats["requests"] == 8 and stats["rows"] == 8
+        assert stats["batches"] == len(model.batches)
+        assert set(stats["latency_ms"]) == {"p50", "p95", "p99"}
+
+    def test_row_cap_follows_slo(self) -> None:
+        """Test that a lane's batch cap fits half its SLO at the measured cost per row."""
+        lane = Lane("short", 100, slo_ms=100, max_rows=512)
+        assert lane.row_cap() == 512
+        lane.observe(rows=100, seconds=0.1)
+        assert lane.row_cap() == 50
+
+    def test_violations_and_shedding(self) -> None:
+        """Test that late texts are counted as violations, or shed when shedding is on."""
+        for shed in (False, True):
+            model = FakeModel(slow_chars=1, delay=0.1)
+            model.gate.clear()
+            scheduler = LaneScheduler(model, CLASSES, [Lane("all", float("inf"), 50)], shed=shed)
+            with ThreadPoolExecutor(2) as pool:
+                # The first request holds the lane while the second waits past the SLO
+                first = pool.submit(scheduler.run, "predict", ["text"])
+                time.sleep(0.02)
+                second = pool.submit(scheduler.run, "predict", ["text"])
+                time.sleep(0.1)
+                model.gate.set()
+                assert first.result()[1][0].violated
+                if shed:
+                    with pytest.raises(LaneTimeoutError, match="SLO"):
+                        second.result()
+                else:
+                    assert second.result()[1][0].violated
+            stats = scheduler.stats()["lanes"]["all"]
+            scheduler.close()
+            assert (stats["shed"], stats["violations"]) == ((1, 1) if shed else (0, 2))
+
+    def test_timeout(self) -> None:
+        """Test that a request fails after the timeout, and its unstarted parts are dropped."""
+        model = FakeModel()
+        model.gate.clear()
+        scheduler = LaneScheduler(model, CLASSES, [Lane("all", float("inf"), 1000)], timeout=0.1)
+        with ThreadPoolExecutor(2) as pool:
+            # The first request holds the lane; the second is still queued when it gives up
+            first = pool.submit(scheduler.run, "predict", ["first"])
+            time.sleep(0.02)
+            second = pool.submit(scheduler.run, "predict", ["second"])
+            for future in (first, second):
+                with pytest.raises(LaneTimeoutError, match="within"):
+                    future.result()
+        model.gate.set()
+        scheduler.close()
+        assert model.batches == [["first"]]
+
+    # Forking with the lane threads running is the case under test
+    @pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+    def test_threads_start_in_forked_child(self) -> None:
+        """Test that a worker forked after the scheduler started runs its own lane threads."""
+        scheduler = LaneScheduler(FakeModel(), CLASSES, make_lanes([10], [1000, 1000]))
+        assert list(scheduler.run("predict", ["ab"])[0]) == ["positive"]
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                labels, _ = scheduler.run("predict", ["ab", "x" * 21])
+                stats = scheduler.stats()["lanes"]
+                ok = list(labels) == ["positive", "negative"] and stats["lane0"]["requests"] == 1
+                status = 0 if ok else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        scheduler.close()
+        assert os.waitstatus_to_exitcode(status) == 0
+
+    def test_make_lanes(self) -> None:
+        """Test lane naming and configuration errors."""
+        assert [lane.name for lane in make_lanes([256, 2048], [50, 200, 1000])] == [
+            "short",
+            "medium",
+            "long",
+        ]
+        assert [lane.name for lane in make_lanes([256], [50, 200])] == ["lane0", "lane1"]
+        with pytest.raises(ValueError, match="increasing"):
+            make_lanes([2048, 256], [1, 2, 3])
+        with pytest.raises(ValueError, match="LANE_SLO_MS"):
+            make_lanes([256], [50])
+
+    def test_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that lanes are disabled without LANE_BOUNDS."""
+        monkeypatch.delenv("LANE_BOUNDS", raising=False)
+        assert LaneScheduler.from_env(FakeModel(), CLASSES) is None
+        monkeypatch.setenv("LANE_BOUNDS", "256,2048")
+        monkeypatch.setenv("LANE_SLO_MS", "50,200,1000")
+        monkeypatch.setenv("LANE_SHED", "true")
+        scheduler = LaneScheduler.from_env(FakeModel(), CLASSES)
+        assert scheduler is not None and scheduler.shed
+        assert [lane.slo_ms for lane in scheduler.lanes] == [50, 200, 1000]
+        scheduler.close()
+
+    def test_seldon_metrics(self) -> None:
+        """Test that request timings become lane-tagged Seldon metrics."""
+        scheduler = LaneScheduler(FakeModel(), CLASSES, make_lanes([10], [1000, 1000]))
+        _, timings = scheduler.run("predict", ["short", "x" * 20, "y" * 30])
+        scheduler.close()
+        metrics = seldon_metrics(timings)
+        assert {(m["key"], m["tags"]["lane"]) for m in metrics if m["type"] == "TIMER"} == {
+            ("lane_wait_ms", "lane0"),
+            ("lane_latency_ms", "lane0"),
+            ("lane_wait_ms", "lane1"),
+            ("lane_latency_ms", "lane1"),
+        }
+        rows = {m["tags"]["lane"]: m["value"] for m in metrics if m["key"] == "lane_rows"}
+        assert rows == {"lane0": 1, "lane1": 2}
@@ -4,6 +4,7 @@ Tests for the sentiment model.
 
 import sys
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 import pytest
@@ -11,7 +12,9 @@ import pytest
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from train_model import SentimentModel
+import train_model
+from generate_data import SentimentDataGenerator
+from train_model import SOLVERS, SentimentModel, SolverTrial, choose_solver, pick_solver
 
 
 class TestSentimentModel:
@@ -44,6 +47,20 @@ class TestSentimentModel:
         assert model.random_state == 42
         assert model.pipeline is not None
 
+    def test_precision(self, sample_data: tuple, tmp_path: Path) -> None:
+        """Test that float32 models train, save and load in float32."""
+        X, y = sample_data
+        model = SentimentModel(max_features=100, precision="float32")
+        model.train(X, y)
+        assert model.pipeline.named_steps["classifier"].coef_.dtype == np.float32
+
+        path = tmp_path / "model.pkl"
+        model.save(str(path))
+        assert SentimentModel.load(str(path)).precision == "float32"
+
+        with pytest.raises(ValueError, match="precision"):
+            SentimentModel(precision="float16")
+
     def test_model_training(self, model: SentimentModel, sample_data: tuple) -> None:
         """Test model training."""
         X, y = sample_data
@@ -80,3 +97,94 @@ class TestSentimentModel:
         original_pred = model.predict(X)
         loaded_pred = loaded_model.predict(X)
         assert np.array_equal(original_pred, loaded_pred)
+
+    def test_share_vectorizer(self, model: SentimentModel, sample_data: tuple) -> None:
+        """Test that a challenger keeps the champion's vectorizer and fits its own classifier."""
+        X, y = sample_data
+        model.train(X, y)
+        vectorizer = model.pipeline.named_steps["tfidf"]
+        vocabulary = dict(vectorizer.vocabulary_)
+
+        challenger = SentimentModel(max_features=10, random_state=0)
+        challenger.share_vectorizer(vectorizer)
+        challenger.train(X[:4], y[:4])
+
+        assert challenger.pipeline.named_steps["tfidf"].vocabulary_ == vocabulary
+        assert challenger.pipeline.named_steps["classifier"].coef_.shape[1] == len(vocabulary)
+        assert len(challenger.predict(X)) == len(X)
+
+    def test_solvers(self, sample_data: tuple) -> None:
+        """Test that every solver trains, liblinear one binary model per class."""
+        X, y = sample_data
+        for solver in SOLVERS:
+            model = SentimentModel(max_features=100, solver=solver)
+            model.train(X, y)
+            assert list(model.predict(X)) == list(y)
+        assert model.pipeline.named_steps["classifier"].estimator.solver == "liblinear"
+
+        with pytest.raises(ValueError, match="solver"):
+            SentimentModel(solver="newton-cholesky")
+
+    def test_auto_solver(self) -> None:
+        """Test that auto mode times every solver and keeps the fastest accurate one."""
+        samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+        texts = [text for text, _ in samples]
+        labels = [label for _, label in samples]
+        model = SentimentModel(max_features=500, solver="auto")
+        features = model.pipeline.named_steps["tfidf"].fit_transform(texts)
+
+        solver, trials = choose_solver(features, labels, tolerance=0.0)
+        assert [trial.solver for trial in trials] == list(SOLVERS)
+        best = max(trial.accuracy for trial in trials if trial.converged)
+        chosen = next(trial for trial in trials if trial.solver == solver)
+        assert chosen.converged and chosen.accuracy == best
+
+        model.train(texts, labels)
+        classifier = model.pipeline.named_steps["classifier"]
+        assert getattr(classifier, "estimator", classifier).solver in SOLVERS
+        assert choose_solver(features[:20], labels[:20]) == ("lbfgs", [])
+
+    def test_auto_solver_ignores_small_time_differences(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a later solver must beat earlier ones by the margin to be chosen."""
+        seconds = {}
+
+        def fake_time_solver(solver: str, *args: Any) -> SolverTrial:
+            return SolverTrial(solver, None, seconds[solver], 0.9, 10, True)
+
+        monkeypatch.setattr(train_model, "time_solver", fake_time_solver)
+        features = np.eye(60)
+        labels = ["negative", "neutral", "positive"] * 20
+
+        seconds.update(lbfgs=0.050, saga=0.034, liblinear=0.035)
+        assert choose_solver(features, labels)[0] == "saga"
+        seconds.update(lbfgs=0.036, saga=0.034, liblinear=0.030)
+        assert choose_solver(features, labels)[0] == "lbfgs"
+        seconds.update(lbfgs=0.050, saga=0.034, liblinear=0.020)
+        assert choose_solver(features, labels)[0] == "liblinear"
+
+    def test_pick_solver(self) -> None:
+        """Test the solver rule on hand-built trials."""
+
+        def trials(*runs: tuple[float, float, bool]) -> list[SolverTrial]:
+            return [
+                SolverTrial(solver, None, seconds, accuracy, 10, converged)
+                for solver, (seconds, accuracy, converged) in zip(SOLVERS, runs, strict=True)
+            ]
+
+        # liblinear is 30% faster than lbfgs but only 18% faster than saga
+        assert pick_solver(trials((1.0, 0.9, True), (0.85, 0.9, True), (0.7, 0.9, True))) == (
+            "lbfgs"
+        )
+        assert pick_solver(trials((1.0, 0.9, True), (0.85, 0.9, True), (0.6, 0.9, True))) == (
+            "liblinear"
+        )
+        assert pick_solver(trials((1.0, 0.9, True), (0.7, 0.9, True), (0.6, 0.9, True))) == "saga"
+        # Less accurate or unconverged solvers are skipped however fast they are
+        assert pick_solver(trials((1.0, 0.9, True), (0.1, 0.8, True), (0.1, 0.9, False))) == (
+            "lbfgs"
+        )
+        assert pick_solver(trials((1.0, 0.9, False), (0.1, 0.9, False), (0.5, 0.9, False))) == (
+            "saga"
+        )
@@ -0,0 +1,97 @@
+"""
+Tests for the ONNX export and onnxruntime backend.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from onnx_pipeline import OnnxPipeline
+from seldon_model import SentimentClassifier
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def model() -> SentimentModel:
+    """Train a small three-class model on generated data."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+    return model
+
+
+@pytest.fixture(scope="module")
+def onnx_path(model: SentimentModel, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Export the trained model to ONNX."""
+    path = tmp_path_factory.mktemp("models") / "sentiment_model.onnx"
+    model.export_onnx(str(path))
+    return path
+
+
+class TestOnnxPipeline:
+    """Test cases for OnnxPipeline class."""
+
+    @pytest.fixture
+    def texts(self) -> list[str]:
+        """Texts covering stop words between n-grams, punctuation and non-ASCII input."""
+        samples = SentimentDataGenerator(num_samples=200, seed=7).generate_samples()
+        return [text for text, _ in samples] + [
+            "",
+            "the and of",
+            "LOVE love Love!!",
+            "Great!!!great quality, the best of the best",
+            "Don't buy it. It's not worth the money",
+            "éthe quality très_bien 123 x",
+        ]
+
+    def test_parity_with_sklearn(
+        self, model: SentimentModel, onnx_path: Path, texts: list[str]
+    ) -> None:
+        """Test that probabilities match the sklearn pipeline to float32 precision."""
+        pipeline = OnnxPipeline.load(str(onnx_path))
+        assert list(pipeline.classes_) == ["negative", "neutral", "positive"]
+        np.testing.assert_allclose(
+            pipeline.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-5
+        )
+        assert list(pipeline.predict(texts)) == list(model.pipeline.predict(texts))
+
+    def test_empty_batch(self, onnx_path: Path) -> None:
+        """Test that an empty batch returns no rows instead of failing in onnxruntime."""
+        assert OnnxPipeline.load(str(onnx_path)).predict_proba([]).shape == (0, 3)
+
+    def test_binary_parity(self, texts: list[str], tmp_path: Path) -> None:
+        """Test the sigmoid output of a two-class model."""
+        samples = [
+            (text, label)
+            for text, label in SentimentDataGenerator(num_samples=300, seed=1).generate_samples()
+            if label != "neutral"
+        ]
+        model = SentimentModel(max_features=300)
+        model.train([text for text, _ in samples], [label for _, label in samples])
+        model.export_onnx(str(tmp_path / "binary.onnx"))
+
+        pipeline = OnnxPipeline.load(str(tmp_path / "binary.onnx"))
+        np.testing.assert_allclose(
+            pipeline.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-5
+        )
+
+    def test_wrapper_serves_onnx(
+        self, model: SentimentModel, onnx_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that SentimentClassifier selects the onnxruntime backend for .onnx paths."""
+        monkeypatch.setenv("MODEL_PATH", str(onnx_path))
+        classifier = SentimentClassifier()
+        assert isinstance(classifier.model, OnnxPipeline)
+
+        texts = ["I absolutely love this laptop!", "Terrible camera. Complete waste of money."]
+        predictions = classifier.predict(np.array([[text] for text in texts]))
+        assert list(predictions) == list(model.pipeline.predict(texts))
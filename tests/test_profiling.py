@@ -0,0 +1,85 @@
+"""
+Tests for on-demand profiling.
+"""
+
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from profiling import start_profile
+
+
+def busy_work() -> list[str]:
+    """Allocate and compute something worth sampling."""
+    return [str(i) * 10 for i in range(200_000)]
+
+
+class TestProfileSession:
+    """Test cases for ProfileSession class."""
+
+    def test_session_writes_outputs(self, tmp_path: Path) -> None:
+        """Test that a session writes folded stacks, cProfile stats and allocation reports."""
+        session = start_profile(0.3, output_dir=str(tmp_path))
+        assert session is not None
+        retained = busy_work()
+        assert session.wait(timeout=10)
+
+        prefix = tmp_path / session.name
+        folded = Path(f"{prefix}.folded").read_text().splitlines()
+        assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+        assert pstats.Stats(f"{prefix}.prof").total_calls > 0
+        assert Path(f"{prefix}.alloc.folded").read_text()
+        assert "KiB" in Path(f"{prefix}.alloc.txt").read_text()
+        assert len(retained) == 200_000
+
+    def test_only_one_session_at_a_time(self, tmp_path: Path) -> None:
+        """Test that a second session is refused while one is active."""
+        session = start_profile(5, output_dir=str(tmp_path))
+        assert session is not None
+        try:
+            assert start_profile(5, output_dir=str(tmp_path)) is None
+        finally:
+            session.stop()
+            assert session.wait(timeout=10)
+
+        follow_up = start_profile(0.05, output_dir=str(tmp_path))
+        assert follow_up is not None
+        assert follow_up.wait(timeout=10)
+
+    def test_failed_write_releases_session(self, tmp_path: Path) -> None:
+        """Test that a session whose output cannot be written still frees the lock."""
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        session = start_profile(0.05, output_dir=str(blocker))
+        assert session is not None
+        assert session.wait(timeout=10)
+        assert not tracemalloc.is_tracing()
+
+        follow_up = start_profile(0.05, output_dir=str(tmp_path))
+        assert follow_up is not None
+        assert follow_up.wait(timeout=10)
+
+    def test_failed_start_stops_tracing(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a session that cannot start its sampler leaves nothing tracing."""
+
+        def refuse(self: threading.Thread) -> None:
+            raise RuntimeError("can't start new thread")
+
+        monkeypatch.setattr(threading.Thread, "start", refuse)
+        with pytest.raises(RuntimeError):
+            start_profile(5, output_dir=str(tmp_path))
+        assert not tracemalloc.is_tracing()
+        monkeypatch.undo()
+
+        session = start_profile(0.05, output_dir=str(tmp_path))
+        assert session is not None
+        assert session.wait(timeout=10)
@@ -0,0 +1,127 @@
+"""
+Tests for sampled request logging.
+"""
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from request_log import RequestLogger, read_records
+
+
+class TestRequestLogger:
+    """Test cases for RequestLogger."""
+
+    def test_records_are_readable_while_writing(self, tmp_path: Path) -> None:
+        """Test that flushed files are valid gzip JSONL before the logger is closed."""
+        request_log = RequestLogger("ui", str(tmp_path), flush_interval=0.01)
+        assert request_log.log(["Great!"], ["positive"], [0.9], latency_ms=12.5)
+        request_log.flush()
+
+        [path] = tmp_path.glob("ui-*.jsonl.gz")
+        with gzip.open(path, "rt") as f:
+            record = json.loads(f.readline())
+        assert record["service"] == "ui"
+        assert record["text"] == "Great!"
+        assert record["sentiment"] == "positive"
+        assert record["confidence"] == 0.9
+        assert record["latency_ms"] == 12.5
+        request_log.close()
+
+    def test_probabilities_expand_per_text(self, tmp_path: Path) -> None:
+        """Test that a batch of probabilities becomes one labeled record per text."""
+        request_log = RequestLogger("model", str(tmp_path))
+        probabilities = np.array([[0.8, 0.2], [0.3, 0.7]])
+        request_log.log(["a", "b"], probabilities, classes=["negative", "positive"])
+        request_log.log(["c"], np.array(["negative"]), method="predict")
+        request_log.close()
+
+        records = list(read_records([str(tmp_path)]))
+        assert [(r["text"], r["sentiment"]) for r in records] == [
+            ("a", "negative"),
+            ("b", "positive"),
+            ("c", "negative"),
+        ]
+        assert records[1]["confidence"] == 0.7
+        assert "confidence" not in records[2] and records[2]["method"] == "predict"
+
+    def test_sampling_and_dropping(self, tmp_path: Path) -> None:
+        """Test that unsampled requests are skipped and a full queue drops records."""
+        assert not RequestLogger("ui", None).log(["a"], ["positive"])
+        assert not RequestLogger("ui", str(tmp_path), sample_rate=0.0).log(["a"], ["positive"])
+
+        request_log = RequestLogger("ui", str(tmp_path), queue_size=1)
+        request_log.close()
+        assert request_log.log(["a"], ["positive"])
+        assert not request_log.log(["b"], ["positive"])
+        assert request_log.dropped == 1
+
+    def test_rotation_keeps_newest_files(self, tmp_path: Path) -> None:
+        """Test that files rotate by size and old ones are deleted."""
+        request_log = RequestLogger(
+            "ui", str(tmp_path), batch_size=1, flush_interval=0.0, max_bytes=1, backup_count=3
+        )
+        for i in range(6):
+            request_log.log([f"text {i}"], ["positive"])
+            request_log.flush()
+        request_log.close()
+
+        assert len(list(tmp_path.glob("ui-*.jsonl.gz"))) == 3
+        assert [r["text"] for r in read_records([str(tmp_path)])] == ["text 3", "text 4", "text 5"]
+
+    # Forking with the writer thread running is the case under test
+    @pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+    def test_forked_child_writes_its_own_files(self, tmp_path: Path) -> None:
+        """Test that a worker forked after the logger started runs its own writer."""
+        request_log = RequestLogger("model", str(tmp_path), flush_interval=0.01)
+        request_log.log(["parent"], ["positive"])
+        request_log.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                request_log.log(["child"], ["negative"])
+                request_log.flush()
+                status = 0 if request_log.written == 1 else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        request_log.close()
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert len(list(tmp_path.glob(f"model-*-{pid}.jsonl.gz"))) == 1
+        assert sorted(r["text"] for r in read_records([str(tmp_path)])) == ["child", "parent"]
+
+    def test_rotation_spares_other_processes(self, tmp_path: Path) -> None:
+        """Test that rotating only deletes files written by this process."""
+        sibling = tmp_path / "ui-20240101T000000000000Z-1.jsonl.gz"
+        sibling.write_bytes(gzip.compress(b""))
+        request_log = RequestLogger(
+            "ui", str(tmp_path), batch_size=1, flush_interval=0.0, max_bytes=1, backup_count=1
+        )
+        for i in range(3):
+            request_log.log([f"text {i}"], ["positive"])
+            request_log.flush()
+        request_log.close()
+        assert sibling.exists()
+        assert len(list(tmp_path.glob(f"ui-*-{os.getpid()}.jsonl.gz"))) == 1
+
+    def test_torn_member(self, tmp_path: Path) -> None:
+        """Test that a partially written batch ends the file's records without an error."""
+        request_log = RequestLogger("ui", str(tmp_path))
+        request_log.log(["kept"], ["positive"])
+        request_log.close()
+        [path] = tmp_path.glob("ui-*.jsonl.gz")
+        torn = gzip.compress(b'{"text": "lost"}\n')[:-6]
+        with open(path, "ab") as f:
+            f.write(torn)
+
+        assert [r["text"] for r in read_records([str(path)])] == ["kept"]
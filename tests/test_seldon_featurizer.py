@@ -0,0 +1,129 @@
+"""
+Tests for the featurizer transformer of the two-node inference graph.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from seldon_featurizer import FeatureCache, SentimentFeaturizer
+from seldon_model import SentimentClassifier
+from serving_pipeline import ServingPipeline
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Train a small model on generated data and save its serving archive."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+
+    path = tmp_path_factory.mktemp("models") / "sentiment_model.npz"
+    model.save_serving(str(path))
+    return path
+
+
+@pytest.fixture
+def texts() -> list[str]:
+    """Request texts, including an empty one."""
+    samples = SentimentDataGenerator(num_samples=20, seed=7).generate_samples()
+    return [text for text, _ in samples] + [""]
+
+
+class TestTwoNodeGraph:
+    """Test cases for SentimentFeaturizer feeding SentimentClassifier."""
+
+    @pytest.fixture
+    def nodes(
+        self, model_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> tuple[SentimentFeaturizer, SentimentClassifier]:
+        """Create the transformer and model nodes from the same archive."""
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        return SentimentFeaturizer(), SentimentClassifier()
+
+    def test_graph_matches_single_node(
+        self, nodes: tuple[SentimentFeaturizer, SentimentClassifier], texts: list[str]
+    ) -> None:
+        """Test that featurize -> JSON -> score matches the full pipeline."""
+        featurizer, classifier = nodes
+        request = np.array([[text] for text in texts])
+
+        # Round-trip through JSON as the Seldon executor would
+        payload = json.loads(json.dumps(featurizer.transform_input(request)))
+        np.testing.assert_allclose(
+            classifier.predict_proba(payload), classifier.predict_proba(request), atol=1e-6
+        )
+        assert list(classifier.predict(payload)) == list(classifier.predict(request))
+
+    def test_fingerprint_mismatch(
+        self, nodes: tuple[SentimentFeaturizer, SentimentClassifier], texts: list[str]
+    ) -> None:
+        """Test that rows from a different vocabulary are rejected."""
+        featurizer, classifier = nodes
+        payload = featurizer.transform_input(texts)
+        payload["tfidf_csr"]["fingerprint"] = "0" * 16
+        with pytest.raises(ValueError, match="do not match"):
+            classifier.predict(payload)
+
+    def test_cache_metrics(
+        self, nodes: tuple[SentimentFeaturizer, SentimentClassifier], texts: list[str]
+    ) -> None:
+        """Test that a repeated request is served from the cache and reported."""
+        featurizer, _ = nodes
+        featurizer.transform_input(texts)
+        first = featurizer.transform_input(texts)
+        metrics = {metric["key"]: metric["value"] for metric in featurizer.metrics()}
+        assert metrics["feature_cache_hits"] == len(texts)
+        assert metrics["feature_cache_misses"] == 0
+        assert featurizer.tags()["featurizer_cost"]["tokens"] == 0
+        assert first == featurizer.transform_input(texts)
+
+
+class TestFeatureCache:
+    """Test cases for FeatureCache class."""
+
+    def test_lru_eviction(self, model_path: Path, texts: list[str]) -> None:
+        """Test that the least recently used rows are evicted once over the byte budget."""
+        featurizer = ServingPipeline.load(str(model_path)).featurizer
+        # Distinct texts with the same terms, so every row costs the same bytes
+        texts = [f"{texts[0]} {i}" for i in range(4)]
+        cache = FeatureCache(featurizer, max_bytes=10**9)
+        cache.transform(texts[:1])
+        entry_bytes = cache.nbytes
+
+        cache = FeatureCache(featurizer, max_bytes=3 * entry_bytes)
+        cache.transform(texts[:3])
+        cache.transform(texts[:1])  # refresh texts[0]
+        cache.transform(texts[3:4])  # evicts texts[1]
+
+        _, hits = cache.transform([texts[0], texts[1]])
+        assert hits == 1
+        assert len(cache) == 3
+        assert cache.nbytes <= cache.max_bytes
+
+    def test_keys_are_digests(self, model_path: Path) -> None:
+        """Test that the cache holds fixed-size digests rather than the texts."""
+        cache = FeatureCache(ServingPipeline.load(str(model_path)).featurizer)
+        cache.transform(["great " * 10000])
+        assert [len(key) for key in cache._rows] == [16]
+
+    def test_rows_match_featurizer(self, model_path: Path, texts: list[str]) -> None:
+        """Test that cached and freshly computed rows assemble into the same matrix."""
+        featurizer = ServingPipeline.load(str(model_path)).featurizer
+        cache = FeatureCache(featurizer)
+        cache.transform(texts[::2])
+
+        rows, hits = cache.transform(texts)
+        expected = featurizer.transform(texts)
+        assert hits == len(texts[::2])
+        np.testing.assert_array_equal(rows.indptr, expected.indptr)
+        np.testing.assert_array_equal(rows.indices, expected.indices)
+        np.testing.assert_array_equal(rows.data, expected.data)
@@ -0,0 +1,334 @@
+"""
+Tests for the Seldon model wrapper.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import seldon_model
+from generate_data import SentimentDataGenerator
+from seldon_model import SentimentClassifier
+from serving_pipeline import ServingPipeline
+from tracing import Tracer
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Train a small model on generated data and save it."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    texts = [text for text, _ in samples]
+    labels = [label for _, label in samples]
+
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train(texts, labels)
+
+    path = tmp_path_factory.mktemp("models") / "sentiment_model.pkl"
+    model.save(str(path))
+    return path
+
+
+class TestSentimentClassifier:
+    """Test cases for SentimentClassifier class."""
+
+    @pytest.fixture
+    def classifier(self, model_path: Path, monkeypatch: pytest.MonkeyPatch) -> SentimentClassifier:
+        """Create a classifier loaded from the trained model."""
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        return SentimentClassifier()
+
+    def test_health_status(self, classifier: SentimentClassifier) -> None:
+        """Test health status after loading."""
+        assert classifier.health_status() == {"ready": True, "model_loaded": True}
+
+    def test_predict_input_formats(self, classifier: SentimentClassifier) -> None:
+        """Test that ndarray and list payloads give the same predictions."""
+        texts = ["I absolutely love this laptop!", "Terrible camera. Complete waste of money."]
+        from_list = classifier.predict([[text] for text in texts])
+        from_array = classifier.predict(np.array([[text] for text in texts]))
+        assert list(from_list) == list(from_array) == ["positive", "negative"]
+
+    def test_predict_proba(self, classifier: SentimentClassifier) -> None:
+        """Test probability output shape."""
+        probabilities = classifier.predict_proba(["The monitor is okay. Nothing special."])
+        assert probabilities.shape == (1, 3)
+        assert np.isclose(probabilities.sum(), 1.0)
+
+    def test_predict_traces_stages(
+        self, classifier: SentimentClassifier, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a propagated traceparent links per-stage spans to the caller's trace."""
+        path = tmp_path / "spans.jsonl"
+        monkeypatch.setattr(seldon_model, "tracer", Tracer("model", export_path=str(path)))
+        traceparent = f"00-{'a' * 32}-{'b' * 16}-01"
+
+        classifier.predict([["Great speaker!"]], meta={"tags": {"traceparent": traceparent}})
+
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        names = {span["name"] for span in spans}
+        assert names == {"model.predict", "model.decode_input", "model.tfidf", "model.classifier"}
+        assert all(span["traceId"] == "a" * 32 for span in spans)
+
+    def test_profile_trigger_tag(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a tagged request starts a profiling session when triggers are enabled."""
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("PROFILE_TRIGGER_ENABLED", "true")
+        monkeypatch.setenv("PROFILE_OUTPUT_DIR", str(tmp_path))
+        classifier = SentimentClassifier()
+
+        classifier.predict([["Great speaker!"]], meta={"tags": {"profile_seconds": 0.1}})
+
+        deadline = time.monotonic() + 10
+        while not list(tmp_path.glob("*.prof")) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert list(tmp_path.glob("*.folded"))
+        assert list(tmp_path.glob("*.prof"))
+
+    def test_profile_trigger_rejects_bad_durations(
+        self, model_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that invalid profile_seconds tags are ignored and long ones are clamped."""
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("PROFILE_TRIGGER_ENABLED", "true")
+        monkeypatch.setenv("PROFILE_MAX_SECONDS", "2")
+        started = []
+        monkeypatch.setattr(seldon_model, "start_profile", started.append)
+        classifier = SentimentClassifier()
+
+        for seconds in ("abc", "-1", "0", "nan", "inf", "1e9"):
+            meta = {"tags": {"profile_seconds": seconds}}
+            assert len(classifier.predict([["Great speaker!"]], meta=meta)) == 1
+        assert started == [2.0]
+
+    def test_serving_model_matches_pickle(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the .npz serving model gives the same output as the pickle."""
+        texts = [["I absolutely love this laptop!"], ["The mouse is okay. Nothing special."]]
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        from_pickle = SentimentClassifier()
+
+        npz_path = tmp_path / "sentiment_model.npz"
+        SentimentModel.load(str(model_path)).save_serving(str(npz_path))
+        monkeypatch.setenv("MODEL_PATH", str(npz_path))
+        from_npz = SentimentClassifier()
+
+        assert list(from_npz.predict(texts)) == list(from_pickle.predict(texts))
+        np.testing.assert_allclose(from_npz.predict_proba(texts), from_pickle.predict_proba(texts))
+
+    def test_long_input_cost_tags(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that oversized texts are capped and the request cost is tagged."""
+        npz_path = tmp_path / "sentiment_model.npz"
+        SentimentModel.load(str(model_path)).save_serving(str(npz_path))
+        monkeypatch.setenv("MODEL_PATH", str(npz_path))
+        monkeypatch.setenv("MAX_INPUT_CHARS", "2000")
+        monkeypatch.setenv("MAX_INPUT_TOKENS", "100")
+        classifier = SentimentClassifier()
+
+        classifier.predict([["great laptop " * 1000], ["Terrible camera."]])
+        cost = classifier.tags()["cost"]
+        assert cost["rows"] == 2
+        assert cost["truncated_chars"] == 1
+        assert cost["chars"] == 2000 + len("Terrible camera.")
+        assert cost["tokens"] == 100 + 2
+        assert cost["truncated_tokens"] == 1
+        assert cost["elapsed_ms"] >= 0
+
+    def test_explain_tag(self, classifier: SentimentClassifier) -> None:
+        """Test that an explain tag adds explanations without changing the predictions."""
+        texts = [["I absolutely love this laptop!"], ["Terrible camera, awful support."]]
+        expected = classifier.predict(texts)
+
+        predictions = classifier.predict(texts, meta={"tags": {"explain": "2"}})
+        assert list(predictions) == list(expected)
+        explanation = classifier.tags()["explanation"]
+        assert len(explanation) == 2
+        assert explanation[0]["positive"]["terms"][0] == "love"
+        assert all(len(terms["terms"]) <= 2 for terms in explanation[1].values())
+        json.dumps(classifier.tags())
+
+        classifier.predict(texts)
+        assert "explanation" not in classifier.tags()
+
+    def test_explain_tag_bad_values(self, classifier: SentimentClassifier) -> None:
+        """Test that malformed explain tags are ignored and numbers are clamped."""
+        texts = [["I absolutely love this laptop!"]]
+        expected = list(classifier.predict(texts))
+        for value in ("yes", "3.5"):
+            assert list(classifier.predict(texts, meta={"tags": {"explain": value}})) == expected
+            assert "explanation" not in classifier.tags()
+
+        classifier.predict(texts, meta={"tags": {"explain": "-3"}})
+        assert all(
+            len(terms["terms"]) == 1 for terms in classifier.tags()["explanation"][0].values()
+        )
+        classifier.predict(texts, meta={"tags": {"explain": "100000"}})
+        terms = classifier.tags()["explanation"][0]["positive"]["terms"]
+        assert 1 <= len(terms) <= classifier.explain_max_top_k
+
+    def test_explain_matches_serving_model(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that pickled and .npz models give the same explanations."""
+        texts = [["I absolutely love this laptop!"], ["The mouse is okay. Nothing special."]]
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        from_pickle = SentimentClassifier().explain(texts, top_k=3)
+
+        npz_path = tmp_path / "sentiment_model.npz"
+        SentimentModel.load(str(model_path)).save_serving(str(npz_path))
+        monkeypatch.setenv("MODEL_PATH", str(npz_path))
+        from_npz = SentimentClassifier().explain(texts, top_k=3)
+
+        assert from_npz["labels"] == from_pickle["labels"] == ["positive", "neutral"]
+        np.testing.assert_allclose(from_npz["probabilities"], from_pickle["probabilities"])
+        for npz_row, pickle_row in zip(
+            from_npz["explanations"], from_pickle["explanations"], strict=True
+        ):
+            for label in from_npz["classes"]:
+                assert npz_row[label]["terms"] == pickle_row[label]["terms"]
+
+    def test_float32_serving_model(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a float32 .npz model is scored in float32."""
+        texts = [["I absolutely love this laptop!"], ["The mouse is okay. Nothing special."]]
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        expected = SentimentClassifier().predict_proba(texts)
+
+        npz_path = tmp_path / "sentiment_model.npz"
+        pipeline = SentimentModel.load(str(model_path)).pipeline
+        ServingPipeline.from_sklearn(pipeline).astype("float32").save(str(npz_path))
+        monkeypatch.setenv("MODEL_PATH", str(npz_path))
+        probabilities = SentimentClassifier().predict_proba(texts)
+
+        assert probabilities.dtype == np.float32
+        np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+
+    def test_challengers_are_shadow_scored(
+        self, model_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that challengers score the champion's rows without changing the response."""
+        champion = SentimentModel.load(str(model_path))
+        champion.save_serving(str(tmp_path / "champion.npz"))
+        samples = SentimentDataGenerator(num_samples=100, seed=7).generate_samples()
+        challenger = SentimentModel()
+        challenger.share_vectorizer(champion.pipeline.named_steps["tfidf"])
+        challenger.train([text for text, _ in samples], [label for _, label in samples])
+        challenger.save_serving(str(tmp_path / "challenger.npz"))
+
+        texts = [["I absolutely love this laptop!"], ["Terrible. Broke after a day."]]
+        monkeypatch.setenv("MODEL_PATH", str(tmp_path / "champion.npz"))
+        expected = SentimentClassifier().predict_proba(texts)
+        monkeypatch.setenv("CHALLENGER_MODEL_PATHS", str(tmp_path / "challenger.npz"))
+        classifier = SentimentClassifier()
+
+        np.testing.assert_array_equal(classifier.predict_proba(texts), expected)
+        classifier.predict(texts, meta={"tags": {"explain": "true"}})
+        classifier.shadow.join()
+
+        stats = classifier.health_status()["challengers"]["challenger"]
+        assert stats["rows"] == 4
+        assert 0.0 <= stats["agreement"] <= 1.0
+
+        # Lane batches are shadowed too
+        monkeypatch.setenv("LANE_BOUNDS", "20")
+        monkeypatch.setenv("LANE_SLO_MS", "1000,1000")
+        classifier = SentimentClassifier()
+        np.testing.assert_array_equal(classifier.predict_proba(texts), expected)
+        classifier.lanes.close()
+        classifier.shadow.join()
+        assert classifier.health_status()["challengers"]["challenger"]["rows"] == 2
+
+    def test_requests_are_logged(
+        self, classifier: SentimentClassifier, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that scored texts are logged with their predicted label and confidence."""
+        from request_log import RequestLogger, read_records
+
+        request_log = RequestLogger("model", str(tmp_path))
+        monkeypatch.setattr(seldon_model, "request_log", request_log)
+        probabilities = classifier.predict_proba([["I love it!"], ["Awful."]])
+        request_log.close()
+
+        records = list(read_records([str(tmp_path)]))
+        assert [record["text"] for record in records] == ["I love it!", "Awful."]
+        assert [record["confidence"] for record in records] == list(probabilities.max(axis=1))
+        assert records[0]["method"] == "predict_proba"
+
+    def test_length_lanes(self, model_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that lane scheduling keeps predictions and reports per-lane metrics."""
+        texts = [["Great!"], ["Terrible. " * 40], ["It is okay, I guess."]]
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        expected = SentimentClassifier().predict_proba(texts)
+        monkeypatch.setenv("LANE_BOUNDS", "100")
+        monkeypatch.setenv("LANE_SLO_MS", "1000,5000")
+        classifier = SentimentClassifier()
+
+        np.testing.assert_allclose(classifier.predict_proba(texts), expected)
+        labels = classifier.model.classes_[expected.argmax(axis=1)]
+        assert list(classifier.predict(texts)) == list(labels)
+        metrics = classifier.metrics()
+        rows = {m["tags"]["lane"]: m["value"] for m in metrics if m["key"] == "lane_rows"}
+        assert rows == {"lane0": 2, "lane1": 1}
+        assert {m["type"] for m in metrics} == {"TIMER", "COUNTER"}
+
+        lanes = classifier.health_status()["lanes"]
+        assert lanes["lane0"]["requests"] == 2 and lanes["lane1"]["rows"] == 2
+        classifier.lanes.close()
+
+    def test_compact_encodings(self, classifier: SentimentClassifier) -> None:
+        """Test that ids and probabilities are returned with the labels in the tags."""
+        texts = [["I absolutely love this laptop!"], ["Terrible. Broke after a day."]]
+        labels = classifier.predict(texts)
+        assert "classes_" not in classifier.tags()
+
+        ids = classifier.predict(texts, meta={"tags": {"encoding": "ids"}})
+        classes = classifier.tags()["classes_"]
+        assert ids.dtype == np.int32
+        assert [classes[i] for i in ids] == list(labels)
+
+        probabilities = classifier.predict(texts, meta={"tags": {"encoding": "proba"}})
+        assert probabilities.shape == (2, len(classes))
+        assert probabilities.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(probabilities.argmax(axis=1), ids)
+
+        classifier.predict(texts)
+        assert "classes_" not in classifier.tags()
+        with pytest.raises(ValueError, match="encoding"):
+            classifier.predict(texts, meta={"tags": {"encoding": "utf-8"}})
+
+
+class TestModelImage:
+    """Test the files Dockerfile.seldon copies into the model image."""
+
+    def test_image_modules_import(self, tmp_path: Path) -> None:
+        """Test that both Seldon components import from the copied files alone."""
+        root = Path(__file__).parent.parent
+        for line in (root / "Dockerfile.seldon").read_text().splitlines():
+            if line.startswith("COPY src/"):
+                _, source, target = line.split()
+                (tmp_path / Path(target).name).write_bytes((root / source).read_bytes())
+
+        code = (
+            "import sys; sys.path[:] = [p for p in sys.path if not p.endswith('src')]; "
+            "import SentimentClassifier, SentimentFeaturizer, serving_pipeline, seldon_payload, "
+            "onnx_pipeline; SentimentClassifier.SentimentClassifier; "
+            "SentimentFeaturizer.SentimentFeaturizer"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
@@ -2,7 +2,9 @@
 Tests for FastAPI application.
 """
 
+import json
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
@@ -47,3 +49,323 @@ class TestFastAPIApp:
         response = client.post("/analyze", data={"text": ""})
         assert response.status_code == 200
         assert "Please enter some text" in response.text
+
+    def test_home_page_is_cacheable(self, client: TestClient) -> None:
+        """Test that the pre-rendered home page supports ETag revalidation."""
+        response = client.get("/")
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        cached = client.get("/", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+    def test_stylesheet_is_compressed(self, client: TestClient) -> None:
+        """Test that the stylesheet is served gzip-compressed with long-lived caching."""
+        response = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "immutable" in response.headers["cache-control"]
+        assert ".container" in response.text
+
+    def test_encoding_negotiation(self, client: TestClient) -> None:
+        """Test that q-values are honoured and each encoding has its own ETag."""
+        plain = client.get("/", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in plain.headers
+        compressed = client.get("/", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert client.get("/", headers={"Accept-Encoding": "*"}).headers["content-encoding"]
+        assert plain.headers["etag"] != compressed.headers["etag"]
+
+        cached = client.get(
+            "/",
+            headers={
+                "Accept-Encoding": "identity",
+                "If-None-Match": f'W/"other", W/{plain.headers["etag"]}',
+            },
+        )
+        assert cached.status_code == 304
+        stale = client.get(
+            "/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]},
+        )
+        assert stale.status_code == 200
+
+    def test_analyze_empty_text_json(self, client: TestClient) -> None:
+        """Test analyze endpoint with empty text and a JSON Accept header."""
+        response = client.post(
+            "/analyze", data={"text": ""}, headers={"Accept": "application/json"}
+        )
+        assert response.status_code == 400
+        assert "Please enter some text" in response.json()["error"]
+
+    def test_analyze_json_skips_rendering(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the JSON variant of analyze returns the raw prediction."""
+        import sentiment_app_server
+
+        async def fake_call_seldon_api(text: str, explain: bool = False) -> dict:
+            return {"sentiment": "positive", "text": text, "confidence": 0.9}
+
+        monkeypatch.setattr(sentiment_app_server, "call_seldon_api", fake_call_seldon_api)
+        response = client.post(
+            "/analyze", data={"text": "Great!"}, headers={"Accept": "application/json"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"sentiment": "positive", "text": "Great!", "confidence": 0.9}
+
+    def test_analyze_rejects_long_text(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that texts over ANALYZE_MAX_CHARS get 413 without calling the model."""
+        import sentiment_app_server
+
+        monkeypatch.setattr(sentiment_app_server, "ANALYZE_MAX_CHARS", 100)
+        headers = {"Accept": "application/json"}
+        response = client.post("/analyze", data={"text": "a" * 101}, headers=headers)
+        assert response.status_code == 413
+        assert "too long" in response.json()["error"]
+
+        # Bodies that cannot fit the limit are refused before the form is parsed
+        response = client.post("/analyze", data={"text": "a" * 10**6}, headers=headers)
+        assert response.status_code == 413
+
+    def test_analyze_explain_option(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the explain box asks for and renders the top terms."""
+        import sentiment_app_server
+
+        requests = []
+
+        async def fake_call_seldon_api(text: str, explain: bool = False) -> dict:
+            requests.append(explain)
+            explanation = {"positive": {"terms": ["great", "love"], "weights": [0.9, 0.4]}}
+            return {
+                "sentiment": "positive",
+                "text": text,
+                "confidence": 0.9,
+                "explanation": explanation,
+            }
+
+        monkeypatch.setattr(sentiment_app_server, "call_seldon_api", fake_call_seldon_api)
+        response = client.post("/analyze", data={"text": "Great!", "explain": "on"})
+        assert requests == [True]
+        assert "great" in response.text and "+0.900" in response.text
+        assert "checked" in response.text
+
+    async def test_call_seldon_api_explanation(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the explain tag is sent and the explanation read from the meta tags."""
+        import httpx
+
+        import sentiment_app_server
+
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(json.loads(request.content))
+            explanation = [{"positive": {"terms": ["great"], "weights": [0.9]}}]
+            return httpx.Response(
+                200,
+                json={
+                    "data": {"ndarray": ["positive"]},
+                    "meta": {"tags": {"explanation": explanation}},
+                },
+            )
+
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(sentiment_app_server, "get_http_client", lambda: mock_client)
+
+        result = await sentiment_app_server.call_seldon_api("Great!", explain=True)
+        assert sent[0]["meta"]["tags"]["explain"] == "true"
+        assert result["explanation"] == {"positive": {"terms": ["great"], "weights": [0.9]}}
+
+        result = await sentiment_app_server.call_seldon_api("Great!")
+        assert "meta" not in sent[1]
+        assert "explanation" not in result
+        await mock_client.aclose()
+
+    def test_decode_seldon_response(self) -> None:
+        """Test that label, id and probability responses decode to the same rows."""
+        import sentiment_app_server
+
+        decode = sentiment_app_server.decode_seldon_response
+        classes = {"meta": {"tags": {"classes_": ["negative", "neutral", "positive"]}}}
+        expected = [
+            {"sentiment": "positive", "confidence": 0.0},
+            {"sentiment": "negative", "confidence": 0.0},
+        ]
+
+        assert decode({"data": {"ndarray": ["positive", "negative"]}}) == expected
+        assert decode({"data": {"tensor": {"shape": [2], "values": [2, 0]}}, **classes}) == expected
+        assert decode({"data": {"ndarray": [2, 0]}, **classes}) == expected
+
+        tensor = {"shape": [2, 3], "values": [0.1, 0.2, 0.7, 0.6, 0.3, 0.1]}
+        rows = decode({"data": {"tensor": tensor}, **classes})
+        assert [row["sentiment"] for row in rows] == ["positive", "negative"]
+        assert [row["confidence"] for row in rows] == [0.7, 0.6]
+        assert decode({"data": {"ndarray": [[0.1, 0.2, 0.7], [0.6, 0.3, 0.1]]}, **classes}) == rows
+
+    async def test_call_seldon_batch_encoding(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a compact encoding sends a tensor request and decodes the tensor reply."""
+        import httpx
+
+        import sentiment_app_server
+
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(json.loads(request.content))
+            tensor = {"shape": [2, 2], "values": [0.2, 0.8, 0.9, 0.1]}
+            tags = {"classes_": ["negative", "positive"]}
+            return httpx.Response(200, json={"data": {"tensor": tensor}, "meta": {"tags": tags}})
+
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(sentiment_app_server, "get_http_client", lambda: mock_client)
+        monkeypatch.setattr(sentiment_app_server, "SELDON_RESPONSE_ENCODING", "proba")
+
+        rows = await sentiment_app_server.call_seldon_batch(["good", "bad"])
+        assert sent[0]["data"] == {"tensor": {"shape": [2, 1], "values": ["good", "bad"]}}
+        assert sent[0]["meta"]["tags"]["encoding"] == "proba"
+        assert rows == [
+            {"sentiment": "positive", "confidence": 0.8},
+            {"sentiment": "negative", "confidence": 0.9},
+        ]
+        await mock_client.aclose()
+
+    def test_lifespan_manages_shared_client(self) -> None:
+        """Test that the Seldon connection pool is opened and closed with the app."""
+        import sentiment_app_server
+
+        with TestClient(app):
+            client = sentiment_app_server.get_http_client()
+            assert client is sentiment_app_server.get_http_client()
+        assert client.is_closed
+
+    def test_production_server_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that production mode enables workers, uvloop and httptools from env."""
+        from sentiment_app_server import server_config_from_env
+
+        monkeypatch.setenv("FASTAPI_MODE", "production")
+        monkeypatch.setenv("FASTAPI_WORKERS", "3")
+        monkeypatch.setenv("FASTAPI_KEEP_ALIVE", "75")
+        monkeypatch.setenv("FASTAPI_BACKLOG", "4096")
+
+        config = server_config_from_env()
+        assert config["workers"] == 3
+        assert config["loop"] == "uvloop"
+        assert config["http"] == "httptools"
+        assert config["timeout_keep_alive"] == 75
+        assert config["backlog"] == 4096
+
+    def test_development_server_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the default mode stays single-process."""
+        from sentiment_app_server import server_config_from_env
+
+        monkeypatch.delenv("FASTAPI_MODE", raising=False)
+        assert "workers" not in server_config_from_env()
+
+
+class TestBatchJobs:
+    """Test cases for the /jobs batch API."""
+
+    @pytest.fixture
+    def client(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+        """Client whose job runner scores in memory and stores jobs under tmp_path."""
+        import sentiment_app_server
+        from batch_jobs import BatchJobRunner, JobStore
+
+        async def fake_seldon_batch(texts: list[str]) -> list[dict]:
+            return [
+                {"sentiment": "positive" if "good" in text else "negative", "confidence": 0.0}
+                for text in texts
+            ]
+
+        runner = BatchJobRunner(JobStore(str(tmp_path)), fake_seldon_batch, chunk_size=2)
+        monkeypatch.setattr(sentiment_app_server, "job_runner", runner)
+        monkeypatch.setattr(sentiment_app_server, "BATCH_JOB_POLL_INTERVAL", 0.01)
+        # Entering the client keeps one event loop alive for the background jobs
+        with TestClient(app) as client:
+            yield client
+
+    def test_submit_and_stream_jsonl(self, client: TestClient) -> None:
+        """Test that a JSON submission is scored and streamed as JSON lines."""
+        response = client.post("/jobs", json=["good", "bad", "so good"])
+        assert response.status_code == 202
+        job = response.json()
+        assert job["n_texts"] == 3
+        assert response.headers["location"] == f"/jobs/{job['job_id']}"
+
+        lines = [json.loads(line) for line in client.get(job["links"]["results"]).iter_lines()]
+        rows = sorted((line for line in lines if "index" in line), key=lambda row: row["index"])
+        assert [row["sentiment"] for row in rows] == ["positive", "negative", "positive"]
+        assert lines[-1]["progress"] == {"status": "succeeded", "done": 3, "total": 3}
+
+        status = client.get(f"/jobs/{job['job_id']}").json()
+        assert status["status"] == "succeeded"
+        assert status["progress"] == 1.0
+
+    def test_upload_and_stream_events(self, client: TestClient) -> None:
+        """Test that an uploaded file is scored and streamed as server-sent events."""
+        files = {"file": ("reviews.csv", b"text,sentiment\ngood,positive\nbad,negative\n")}
+        job = client.post("/jobs", files=files).json()
+
+        body = client.get(
+            f"/jobs/{job['job_id']}/results", headers={"Accept": "text/event-stream"}
+        ).text
+        events = [block.split("\n", 1) for block in body.strip().split("\n\n")]
+        names = [name.removeprefix("event: ") for name, _ in events]
+        assert "results" in names and names[-1] == "done"
+        assert json.loads(events[-1][1].removeprefix("data: "))["status"] == "succeeded"
+
+    def test_rejects_invalid_submissions(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test the validation of job submissions and unknown job ids."""
+        import sentiment_app_server
+
+        assert client.post("/jobs", json={"texts": []}).status_code == 400
+        assert client.post("/jobs", json=[1, 2]).status_code == 400
+        monkeypatch.setattr(sentiment_app_server, "BATCH_JOB_MAX_TEXTS", 2)
+        assert client.post("/jobs", json=["a", "b", "c"]).status_code == 413
+        assert client.get("/jobs/0123abcd").status_code == 404
+        assert client.get("/jobs/0123abcd/results").status_code == 404
+
+    def test_delete(self, client: TestClient) -> None:
+        """Test that a deleted job is gone."""
+        job = client.post("/jobs", json=["good"]).json()
+        assert client.delete(f"/jobs/{job['job_id']}").status_code == 204
+        assert client.get(f"/jobs/{job['job_id']}").status_code == 404
+
+
+class TestRequestLog:
+    """Test cases for logging analyzed texts."""
+
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """Create a test client."""
+        return TestClient(app)
+
+    def test_analyze_is_logged(
+        self, client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an analyzed text and its prediction reach the request log."""
+        import sentiment_app_server
+        from request_log import RequestLogger, read_records
+
+        async def fake_call_seldon_api(text: str, explain: bool = False) -> dict:
+            return {"sentiment": "positive", "text": text, "confidence": 0.9}
+
+        request_log = RequestLogger("ui", str(tmp_path))
+        monkeypatch.setattr(sentiment_app_server, "request_log", request_log)
+        monkeypatch.setattr(sentiment_app_server, "call_seldon_api", fake_call_seldon_api)
+        client.post("/analyze", data={"text": "Great!"}, headers={"Accept": "application/json"})
+        request_log.close()
+
+        [record] = read_records([str(tmp_path)])
+        assert (record["text"], record["sentiment"], record["confidence"]) == (
+            "Great!",
+            "positive",
+            0.9,
+        )
+        assert record["latency_ms"] >= 0
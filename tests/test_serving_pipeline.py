@@ -0,0 +1,245 @@
+"""
+Tests for the serving-only pipeline.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from serving_pipeline import BufferPool, ServingPipeline, SparseRows, track_cost
+from train_model import SentimentModel
+
+
+@pytest.fixture(scope="module")
+def model() -> SentimentModel:
+    """Train a small three-class model on generated data."""
+    samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+    model = SentimentModel(max_features=500, random_state=42)
+    model.train([text for text, _ in samples], [label for _, label in samples])
+    return model
+
+
+class TestServingPipeline:
+    """Test cases for ServingPipeline class."""
+
+    @pytest.fixture
+    def texts(self) -> list[str]:
+        """Texts covering in- and out-of-vocabulary terms, stop words and empty input."""
+        samples = SentimentDataGenerator(num_samples=60, seed=7).generate_samples()
+        return [text for text, _ in samples] + ["", "the and of", "zzz qqq", "LOVE love Love!!"]
+
+    def test_parity_with_sklearn(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test that probabilities and labels match the sklearn pipeline."""
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        np.testing.assert_allclose(
+            serving.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-12
+        )
+        assert list(serving.predict(texts)) == list(model.pipeline.predict(texts))
+
+    def test_save_load_roundtrip(
+        self, model: SentimentModel, texts: list[str], tmp_path: Path
+    ) -> None:
+        """Test that the exported archive reproduces the sklearn pipeline."""
+        path = tmp_path / "model.npz"
+        model.save_serving(str(path))
+
+        loaded = ServingPipeline.load(str(path))
+        assert list(loaded.classes_) == ["negative", "neutral", "positive"]
+        np.testing.assert_allclose(
+            loaded.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-12
+        )
+
+    def test_binary_parity(self, texts: list[str]) -> None:
+        """Test the sigmoid path of a two-class model."""
+        samples = [
+            (text, label)
+            for text, label in SentimentDataGenerator(num_samples=300, seed=1).generate_samples()
+            if label != "neutral"
+        ]
+        model = SentimentModel(max_features=300, ngram_range=(1, 2))
+        model.train([text for text, _ in samples], [label for _, label in samples])
+
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        np.testing.assert_allclose(
+            serving.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-12
+        )
+        assert list(serving.predict(texts)) == list(model.pipeline.predict(texts))
+
+    def test_one_vs_rest_parity(self, texts: list[str]) -> None:
+        """Test a liblinear model, fit as one binary model per class."""
+        samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+        model = SentimentModel(max_features=500, solver="liblinear", precision="float32")
+        model.train([text for text, _ in samples], [label for _, label in samples])
+
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        assert serving.scorer.coef_t.dtype == np.float32
+        assert not serving.scorer.multinomial
+        np.testing.assert_allclose(
+            serving.predict_proba(texts), model.pipeline.predict_proba(texts), atol=1e-6
+        )
+        assert list(serving.predict(texts)) == list(model.pipeline.predict(texts))
+
+
+def to_dense(rows: SparseRows) -> np.ndarray:
+    """Expand CSR rows into a dense matrix."""
+    dense = np.zeros((rows.n_rows, rows.n_features))
+    for i in range(rows.n_rows):
+        start, end = rows.indptr[i], rows.indptr[i + 1]
+        dense[i, rows.indices[start:end]] = rows.data[start:end]
+    return dense
+
+
+class TestLongInputs:
+    """Test cases for the token cap and streaming featurization of long texts."""
+
+    @pytest.fixture
+    def texts(self) -> list[str]:
+        """Short reviews plus one long document made of many of them."""
+        samples = SentimentDataGenerator(num_samples=60, seed=7).generate_samples()
+        short = [text for text, _ in samples]
+        return short + [" ".join(short * 5)]
+
+    def test_streaming_matches_single_pass(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test that windowed featurization gives the same rows as one pass."""
+        featurizer = ServingPipeline.from_sklearn(model.pipeline).featurizer
+        expected = to_dense(featurizer.transform(texts))
+
+        featurizer.window_chars = 40
+        np.testing.assert_allclose(to_dense(featurizer.transform(texts)), expected, atol=1e-12)
+
+    def test_token_cap(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test that only the first max_tokens tokens are featurized, in either mode."""
+        featurizer = ServingPipeline.from_sklearn(model.pipeline).featurizer
+        featurizer.max_tokens = 50
+        capped = to_dense(featurizer.transform(texts[-1:]))
+
+        featurizer.window_chars = 40
+        with track_cost() as cost:
+            streamed = to_dense(featurizer.transform(texts[-1:]))
+        np.testing.assert_allclose(streamed, capped, atol=1e-12)
+        assert cost.to_dict() == {
+            "texts": 1,
+            "chars": len(texts[-1]),
+            "tokens": 50,
+            "truncated": 1,
+        }
+
+
+class TestExplain:
+    """Test cases for the coefficient-contribution explanations."""
+
+    @pytest.fixture
+    def texts(self) -> list[str]:
+        """Reviews plus texts with fewer terms than top_k."""
+        samples = SentimentDataGenerator(num_samples=40, seed=11).generate_samples()
+        return [text for text, _ in samples] + ["", "zzz qqq", "love"]
+
+    def test_matches_brute_force(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test that each class gets its largest term contributions, in order."""
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        rows = serving.featurizer.transform(texts)
+        probabilities, columns, weights = serving.scorer.explain(rows, top_k=3)
+
+        np.testing.assert_allclose(probabilities, serving.scorer.predict_proba(rows), atol=1e-12)
+        dense = to_dense(rows)
+        coef = model.pipeline.named_steps["classifier"].coef_
+        for i in range(len(texts)):
+            present = np.flatnonzero(dense[i])
+            for c in range(coef.shape[0]):
+                expected = np.sort(dense[i, present] * coef[c, present])[::-1][:3]
+                n = len(expected)
+                np.testing.assert_allclose(weights[i, c, :n], expected, atol=1e-12)
+                np.testing.assert_allclose(
+                    dense[i, columns[i, c, :n]] * coef[c, columns[i, c, :n]], expected, atol=1e-12
+                )
+                assert (columns[i, c, n:] == -1).all()
+
+    def test_pipeline_explanations(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test the per-text mapping of class label to terms and weights."""
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        probabilities, explanations = serving.explain(texts, top_k=2)
+
+        np.testing.assert_allclose(probabilities, serving.predict_proba(texts), atol=1e-12)
+        assert len(explanations) == len(texts)
+        assert set(explanations[0]) == {"negative", "neutral", "positive"}
+        assert explanations[-3]["positive"] == {"terms": [], "weights": []}
+        assert explanations[-1]["positive"]["terms"] == ["love"]
+        for explanation in explanations:
+            for contributions in explanation.values():
+                assert len(contributions["terms"]) == len(contributions["weights"]) <= 2
+                assert contributions["weights"] == sorted(contributions["weights"], reverse=True)
+
+        with pytest.raises(ValueError, match="top_k"):
+            serving.explain(texts, top_k=0)
+
+    def test_binary_explanations(self) -> None:
+        """Test that the negative class of a two-class model mirrors the positive one."""
+        samples = [
+            (text, label)
+            for text, label in SentimentDataGenerator(num_samples=300, seed=1).generate_samples()
+            if label != "neutral"
+        ]
+        model = SentimentModel(max_features=300)
+        model.train([text for text, _ in samples], [label for _, label in samples])
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+
+        probabilities, explanations = serving.explain(["Great laptop, awful battery."], top_k=10)
+        np.testing.assert_allclose(
+            probabilities, model.pipeline.predict_proba(["Great laptop, awful battery."])
+        )
+        positive, negative = explanations[0]["positive"], explanations[0]["negative"]
+        assert sorted(positive["terms"]) == sorted(negative["terms"])
+        np.testing.assert_allclose(negative["weights"], [-w for w in positive["weights"][::-1]])
+
+
+class TestPrecision:
+    """Test cases for float32 models and reused scoring buffers."""
+
+    @pytest.fixture
+    def texts(self) -> list[str]:
+        """Held-out reviews plus empty input."""
+        samples = SentimentDataGenerator(num_samples=60, seed=7).generate_samples()
+        return [text for text, _ in samples] + [""]
+
+    def test_float32_end_to_end(self, texts: list[str], tmp_path: Path) -> None:
+        """Test that a float32 model stays float32 through export and matches sklearn."""
+        samples = SentimentDataGenerator(num_samples=300, seed=42).generate_samples()
+        model = SentimentModel(max_features=500, random_state=42, precision="float32")
+        model.train([text for text, _ in samples], [label for _, label in samples])
+        path = tmp_path / "model.npz"
+        model.save_serving(str(path))
+
+        loaded = ServingPipeline.load(str(path))
+        assert loaded.dtype == np.float32
+        assert loaded.scorer.coef_t.dtype == np.float32
+        probabilities = loaded.predict_proba(texts)
+        assert probabilities.dtype == np.float32
+        np.testing.assert_allclose(probabilities, model.pipeline.predict_proba(texts), atol=1e-6)
+
+    def test_astype(self, model: SentimentModel, texts: list[str]) -> None:
+        """Test that casting a float64 model to float32 keeps its probabilities."""
+        serving = ServingPipeline.from_sklearn(model.pipeline)
+        single = serving.astype("float32")
+        assert serving.dtype == np.float64
+        assert single.featurizer.transform(texts).data.dtype == np.float32
+        np.testing.assert_allclose(
+            single.predict_proba(texts), serving.predict_proba(texts), atol=1e-6
+        )
+
+    def test_buffer_pool(self) -> None:
+        """Test that buffers are reused for equal or smaller arrays but not oversized ones."""
+        pool = BufferPool(max_elements=100)
+        first = pool.get("scores", (10, 3), np.float32)
+        smaller = pool.get("scores", (4, 3), np.float32)
+        assert smaller.shape == (4, 3)
+        assert np.shares_memory(first, smaller)
+        assert not np.shares_memory(first, pool.get("scores", (10, 3), np.float64))
+        assert not np.shares_memory(
+            pool.get("big", (50, 3), np.float32), pool.get("big", (50, 3), np.float32)
+        )
@@ -0,0 +1,107 @@
+"""
+Tests for the content-addressed stage cache.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generate_data import SentimentDataGenerator
+from stage_cache import StageCache, code_digest, file_digest
+from train_model import SentimentModel, fit_stages
+
+
+class TestStageCache:
+    """Test cases for StageCache."""
+
+    def test_key_depends_on_stage_and_params(self) -> None:
+        """Test that keys ignore dict order but change with any value or the stage."""
+        key = StageCache.key("split", {"seed": 42, "test_size": 0.2})
+        assert key == StageCache.key("split", {"test_size": 0.2, "seed": 42})
+        assert key != StageCache.key("split", {"seed": 43, "test_size": 0.2})
+        assert key != StageCache.key("dataset", {"seed": 42, "test_size": 0.2})
+        assert StageCache.key("features", {"dtype": np.float32}) != StageCache.key(
+            "features", {"dtype": np.float64}
+        )
+
+    def test_computes_once(self, tmp_path: Path) -> None:
+        """Test that a stored output is loaded instead of recomputed, also by a new cache."""
+        calls = []
+
+        def compute() -> dict:
+            calls.append(1)
+            return {"rows": [1, 2, 3]}
+
+        cache = StageCache(str(tmp_path))
+        key = cache.key("dataset", {"n": 3})
+        assert cache.get_or_compute("dataset", key, compute) == {"rows": [1, 2, 3]}
+        assert cache.get_or_compute("dataset", key, compute) == {"rows": [1, 2, 3]}
+        assert StageCache(str(tmp_path)).get_or_compute("dataset", key, compute) == {
+            "rows": [1, 2, 3]
+        }
+        assert len(calls) == 1
+        assert cache.misses == ["dataset"] and cache.hits == ["dataset"]
+        assert [path.name for path in (tmp_path / "dataset").iterdir()] == [f"{key}.joblib"]
+
+    def test_disabled(self, tmp_path: Path) -> None:
+        """Test that a disabled cache always recomputes and stores nothing."""
+        cache = StageCache(str(tmp_path / "cache"), enabled=False)
+        for _ in range(2):
+            cache.get_or_compute("dataset", "k", lambda: 1)
+        assert cache.misses == ["dataset", "dataset"]
+        assert not (tmp_path / "cache").exists()
+
+    def test_digests(self, tmp_path: Path) -> None:
+        """Test that digests follow file contents, not names."""
+        a, b = tmp_path / "a.py", tmp_path / "b.py"
+        a.write_text("x = 1\n")
+        b.write_text("x = 1\n")
+        assert file_digest(str(a)) == file_digest(str(b))
+        before = code_digest([str(a), str(b)])
+        b.write_text("x = 2\n")
+        assert code_digest([str(a), str(b)]) != before
+
+
+class TestFitStages:
+    """Test cases for incremental training."""
+
+    @pytest.fixture
+    def data_path(self, tmp_path: Path) -> str:
+        """Write a generated dataset."""
+        path = str(tmp_path / "sentiment_data.csv")
+        SentimentDataGenerator(num_samples=300, seed=42).save_to_csv(path)
+        return path
+
+    def test_reuses_unchanged_stages(self, data_path: str, tmp_path: Path) -> None:
+        """Test that only the stages downstream of a changed parameter are recomputed."""
+        cache = StageCache(str(tmp_path / "cache"))
+        model = SentimentModel(max_features=500, random_state=42)
+        X_test, _, features = fit_stages(model, cache, data_path)
+        assert cache.misses == ["dataset", "split", "features", "classifier"]
+
+        cache = StageCache(str(tmp_path / "cache"))
+        rerun = SentimentModel(max_features=500, random_state=42)
+        _, _, rerun_features = fit_stages(rerun, cache, data_path)
+        assert cache.hits == ["dataset", "split", "features", "classifier"]
+        assert np.array_equal(
+            rerun.pipeline.predict_proba(X_test), model.pipeline.predict_proba(X_test)
+        )
+        assert (rerun_features != features).nnz == 0
+
+        cache = StageCache(str(tmp_path / "cache"))
+        smaller = SentimentModel(max_features=100, random_state=42)
+        fit_stages(smaller, cache, data_path)
+        assert cache.hits == ["dataset", "split"]
+        assert cache.misses == ["features", "classifier"]
+        assert len(smaller.pipeline.named_steps["tfidf"].vocabulary_) == 100
+
+        uncached = SentimentModel(max_features=100, random_state=42)
+        fit_stages(uncached, StageCache(str(tmp_path / "none"), enabled=False), data_path)
+        assert np.array_equal(
+            uncached.pipeline.predict_proba(X_test), smaller.pipeline.predict_proba(X_test)
+        )
@@ -0,0 +1,89 @@
+"""
+Tests for span-based tracing.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tracing import Tracer, parse_traceparent
+
+
+def read_spans(path: Path) -> list[dict]:
+    """Read exported span records."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestTracer:
+    """Test cases for Tracer class."""
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        """Test that spans are no-ops without an export path."""
+        tracer = Tracer("test")
+        with tracer.span("stage") as span:
+            assert span is None
+        assert tracer.current_traceparent() is None
+
+    def test_nested_spans_share_trace(self, tmp_path: Path) -> None:
+        """Test that child spans inherit the trace ID and parent span ID."""
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer("test", export_path=str(path))
+        with tracer.span("parent") as parent:
+            with tracer.span("child", rows=3):
+                pass
+
+        spans = {span["name"]: span for span in read_spans(path)}
+        assert spans["child"]["traceId"] == spans["parent"]["traceId"]
+        assert spans["child"]["parentSpanId"] == parent.span_id
+        assert spans["child"]["attributes"] == {"rows": 3}
+        assert spans["child"]["endTimeUnixNano"] >= spans["child"]["startTimeUnixNano"]
+
+    def test_propagated_traceparent(self, tmp_path: Path) -> None:
+        """Test that a remote traceparent becomes the parent of a new root span."""
+        path = tmp_path / "spans.jsonl"
+        caller = Tracer("caller", export_path=str(tmp_path / "caller.jsonl"))
+        callee = Tracer("callee", export_path=str(path))
+
+        with caller.span("request") as request_span:
+            traceparent = caller.current_traceparent()
+        with callee.span("handler", traceparent=traceparent):
+            pass
+
+        (span,) = read_spans(path)
+        assert span["traceId"] == request_span.trace_id
+        assert span["parentSpanId"] == request_span.span_id
+        assert span["resource"]["service.name"] == "callee"
+
+    def test_unsampled_traceparent_is_not_recorded(self, tmp_path: Path) -> None:
+        """Test that the caller's sampling decision is honoured."""
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer("test", export_path=str(path))
+        with tracer.span("handler", traceparent=f"00-{'a' * 32}-{'b' * 16}-00") as span:
+            assert span is None
+        assert path.read_text() == ""
+
+    def test_unsampled_trace_has_no_descendants(self, tmp_path: Path) -> None:
+        """Test that spans under an unsampled root or traceparent are not sampled again."""
+        path = tmp_path / "spans.jsonl"
+        unsampled = f"00-{'a' * 32}-{'b' * 16}-00"
+        for tracer, traceparent in (
+            (Tracer("test", export_path=str(path), sample_rate=0.0), None),
+            (Tracer("test", export_path=str(path)), unsampled),
+        ):
+            with tracer.span("root", traceparent=traceparent) as root:
+                assert root is None
+                tracer.sample_rate = 1.0
+                with tracer.span("child") as child:
+                    assert child is None
+                assert tracer.current_traceparent().endswith("-00")
+        assert path.read_text() == ""
+        assert tracer.current_traceparent() is None
+
+    def test_parse_traceparent(self) -> None:
+        """Test parsing valid and malformed traceparent values."""
+        assert parse_traceparent(f"00-{'a' * 32}-{'b' * 16}-01") == ("a" * 32, "b" * 16, True)
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(None) is None